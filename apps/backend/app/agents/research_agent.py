@@ -301,7 +301,7 @@ Your synthesis should demonstrate critical thinking and scholarly rigor."""
             system_content += f"\n\nAvailable research sources:\n{papers_context}"
 
         if uploaded_context:
-            system_content += f"\n\nUploaded document content:\n{uploaded_context[:3000]}"
+            system_content += f"\n\nUploaded document content:\n{uploaded_context}"
 
         # Map history directly since Agno's `input` can accept list of Dicts or Message objects
         messages = [Message(role=m["role"], content=m["content"]) for m in history[-8:]]
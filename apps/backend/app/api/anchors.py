@@ -14,7 +14,6 @@ An optional ANCHOR_WEBHOOK_URL can be set to POST the hash to an external notary
 """
 
 import hashlib
-import httpx
 from datetime import datetime
 from typing import List, Optional
 
@@ -27,6 +26,7 @@ from app.db.session import get_db
 from app.models.database import DraftAnchor
 from app.core.security import get_current_user
 from app.core.config import settings
+from app.core.http_client import http_clients
 from app.core.logger import get_logger
 
 logger = get_logger("anchors")
@@ -77,14 +77,14 @@ async def _post_to_notary(content_hash: str, anchor_id: str) -> Optional[str]:
     if not settings.ANCHOR_WEBHOOK_URL:
         return None
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                settings.ANCHOR_WEBHOOK_URL,
-                json={"hash": content_hash, "anchor_id": anchor_id, "service": "tafiti_ai"},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("reference") or data.get("tx_id") or str(resp.status_code)
+        resp = await http_clients.get(settings.ANCHOR_WEBHOOK_URL).post(
+            settings.ANCHOR_WEBHOOK_URL,
+            json={"hash": content_hash, "anchor_id": anchor_id, "service": "tafiti_ai"},
+            timeout=10,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("reference") or data.get("tx_id") or str(resp.status_code)
     except Exception as e:
         logger.warning(f"External notary webhook failed: {e}")
         return None
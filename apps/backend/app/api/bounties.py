@@ -13,12 +13,12 @@ from sqlalchemy.orm import aliased
 from datetime import datetime, timedelta
 from typing import List, Optional
 from pydantic import BaseModel, Field
-import httpx
 
 from app.db.session import get_db
 from app.models.database import Bounty, BountySubmission, User, Notification
 from app.core.security import get_current_user
 from app.core.config import settings
+from app.core.http_client import http_clients
 from app.core.logger import get_logger
 
 logger = get_logger("bounties")
@@ -98,16 +98,12 @@ async def _initiate_paystack_payment(bounty: Bounty, user_email: str) -> Optiona
         "callback_url": f"{settings.FRONTEND_URL}/bounties/{bounty.id}?funded=true",
     }
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                "https://api.paystack.co/transaction/initialize",
-                json=payload,
-                headers=headers,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            if data.get("status"):
-                return data["data"]["authorization_url"]
+        url = "https://api.paystack.co/transaction/initialize"
+        resp = await http_clients.get(url).post(url, json=payload, headers=headers, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("status"):
+            return data["data"]["authorization_url"]
     except Exception as e:
         logger.error(f"Paystack init failed for bounty {bounty.id}: {e}")
     return None
@@ -192,13 +188,10 @@ async def verify_bounty_funding(
 
     headers = {"Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}"}
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                f"https://api.paystack.co/transaction/verify/{reference}",
-                headers=headers,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        url = f"https://api.paystack.co/transaction/verify/{reference}"
+        resp = await http_clients.get(url).get(url, headers=headers, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Paystack verification failed: {e}")
 
@@ -13,7 +13,7 @@ from app.models.schemas import (
     VectorSearchRequest, VectorSearchResult, PaperBase
 )
 from app.core.security import get_current_user
-from app.services.vector_service import vector_store
+from app.services.vector_service import EmbeddingQueueFull, vector_store
 from app.core.logger import get_logger
 
 logger = get_logger("queries_api")
@@ -60,7 +60,7 @@ async def create_saved_query(
         vector_id = f"query_{saved_query.id}_{current_user['user_id']}"
         logger.info(f"Adding query to vector store with ID: {vector_id}")
         
-        vector_store.add_query(
+        await vector_store.add_query(
             query_id=vector_id,
             query_text=query_data.query,
             answer=query_data.answer,
@@ -78,6 +78,14 @@ async def create_saved_query(
         logger.info(f"Successfully created and indexed saved query {saved_query.id}")
         
         return saved_query
+    except EmbeddingQueueFull as e:
+        logger.warning(f"Embedding pool saturated, rejecting saved query: {e}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Indexing is busy, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         logger.error(f"Failed to create saved query: {str(e)}\n{traceback.format_exc()}")
         await db.rollback()
@@ -148,6 +156,14 @@ async def update_saved_query(
         setattr(query, field, value)
     
     await db.commit()
+
+    # Keep the search result title/tags in sync; the embedded text is unchanged
+    if query.vector_id and ({"title", "tags"} & update_data.keys()):
+        await vector_store.update_query_metadata(
+            query.vector_id,
+            {"title": query.title, "tags": ",".join(query.tags or [])}
+        )
+
     await db.refresh(query)
     return query
 
@@ -170,7 +186,7 @@ async def delete_saved_query(
         raise HTTPException(status_code=404, detail="Query not found")
     
     if query.vector_id:
-        vector_store.delete_query(query.vector_id)
+        await vector_store.delete_query(query.vector_id)
     
     await db.delete(query)
     await db.commit()
@@ -204,7 +220,7 @@ async def vector_search(
     search_request: VectorSearchRequest,
     current_user: dict = Depends(get_current_user)
 ):
-    results = vector_store.search_similar(
+    results = await vector_store.search_similar(
         query=search_request.query,
         k=search_request.k,
         user_id=current_user["user_id"]
@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from app.services.recommendation_service import recommendation_service
 from app.services.discovery_service import discovery_service
 from app.core.security import get_current_user
+from app.core.quotas import compute_quota
 from app.core.logger import logger
 from app.models.schemas import PaperBase, UserDiscoveryResponse
 from app.models.database import User
@@ -24,7 +25,8 @@ class TopicResponse(BaseModel):
 @router.post("/recommendations", response_model=List[TopicResponse])
 async def get_recommendations(
     request: RecommendationRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    _quota: None = Depends(compute_quota(3))
 ):
     """
     Get personalized research topic recommendations.
@@ -14,17 +14,9 @@ from app.models.schemas import (
     CitationGraphResponse
 )
 from app.models.schemas_chat import ChatResearchRequest
-from app.services.openalex_service import (
-    get_openalex_service,
-    get_semantic_scholar_service,
-    get_arxiv_service,
-    get_core_service,
-    get_elsevier_service,
-    get_pubmed_service,
-    get_doaj_service,
-    get_ajol_service,
-    get_africarxiv_service,
-)
+from app.services.openalex_service import get_openalex_service
+from app.services.providers import prefetch_searches, provider_registry
+from app.services.search_stream import record_search_history, search_events, timed_search
 from app.agents.research_agent import get_research_agent
 from app.models.schemas import DeepResearchRequest, DeepResearchResponse, DeepResearchStatusResponse
 from app.agents.deep_research_agent import get_deep_research_agent
@@ -35,6 +27,9 @@ from app.agents.critic_agent import validated_synthesis, ValidatedSynthesis
 from app.services.vector_service import vector_store
 from app.core.security import get_current_user
 from app.core.subscription import require_trial_or_active
+from app.core.config import settings
+from app.core.quotas import compute_quota
+from app.core.deadline import DeadlineExceeded
 from app.models.database import ResearchSession, SearchHistory
 import time
 from app.core.logger import get_logger
@@ -42,66 +37,48 @@ from app.core.logger import get_logger
 logger = get_logger("research_api")
 router = APIRouter()
 
+async def _source_searches(search_request: PaperSearchRequest) -> List[tuple]:
+    """
+    Build the (label, coroutine) pairs for the multi-source fan-out.
+    All sources' cache entries are fetched up front in a single round trip.
+    """
+    per_source = max(5, search_request.limit // 2)
+    query = search_request.query
+
+    calls = []
+    for provider in provider_registry.enabled():
+        if provider.primary:
+            kwargs = {"limit": search_request.limit, "filters": search_request.filters}
+        else:
+            kwargs = {"limit": per_source}
+        calls.append((provider, query, kwargs))
+
+    coros = await prefetch_searches(calls)
+    return [(provider.name, coro) for (provider, _, _), coro in zip(calls, coros)]
+
+
 @router.post("/search", response_model=PaperSearchResponse)
 async def search_papers(
     request: Request,
     search_request: PaperSearchRequest,
     current_user: dict = Depends(get_current_user),
+    _quota: None = Depends(compute_quota(1)),
     db: AsyncSession = Depends(get_db)
 ):
     start_time = time.time()
-    http = request.app.state.http_client
-    per_source = max(5, search_request.limit // 2)
+    deadline_at = time.perf_counter() + settings.SEARCH_DEADLINE_SECONDS
+    sources = await _source_searches(search_request)
 
-    # Instantiate all nine source services
-    openalex    = get_openalex_service(client=http)
-    s2          = get_semantic_scholar_service(client=http)
-    arxiv       = get_arxiv_service(client=http)
-    core        = get_core_service(client=http)
-    elsevier    = get_elsevier_service(client=http)
-    pubmed      = get_pubmed_service(client=http)
-    doaj        = get_doaj_service(client=http)
-    ajol        = get_ajol_service(client=http)
-    africarxiv  = get_africarxiv_service(client=http)
-
-    # Fan-out: all nine sources run fully in parallel
-    (
-        oa_results, s2_results, arxiv_results,
-        core_results, elsevier_results, pubmed_results,
-        doaj_results, ajol_results, africarxiv_results,
-    ) = await asyncio.gather(
-        openalex.search_papers(
-            query=search_request.query,
-            limit=search_request.limit,
-            filters=search_request.filters,
-        ),
-        s2.search_papers(query=search_request.query, limit=per_source),
-        arxiv.search_papers(query=search_request.query, limit=per_source),
-        core.search_papers(query=search_request.query, limit=per_source),
-        elsevier.search_papers(query=search_request.query, limit=per_source),
-        pubmed.search_papers(query=search_request.query, limit=per_source),
-        doaj.search_papers(query=search_request.query, limit=per_source),
-        ajol.search_papers(query=search_request.query, limit=per_source),
-        africarxiv.search_papers(query=search_request.query, limit=per_source),
-        return_exceptions=True,
+    # Fan-out: every enabled source runs fully in parallel, each within its budget
+    results = await asyncio.gather(
+        *(timed_search(label, coro, deadline_at) for label, coro in sources)
     )
 
-    # Merge: OpenAlex first (highest quality metadata), then deduplicate by ID
-    papers: list = oa_results if isinstance(oa_results, list) else []
-    seen_ids = {p.id for p in papers}
-    source_counts: dict = {
-        "openalex": len(oa_results) if isinstance(oa_results, list) else 0,
-    }
-    for label, batch in (
-        ("s2", s2_results),
-        ("arxiv", arxiv_results),
-        ("core", core_results),
-        ("elsevier", elsevier_results),
-        ("pubmed", pubmed_results),
-        ("doaj", doaj_results),
-        ("ajol", ajol_results),
-        ("africarxiv", africarxiv_results),
-    ):
+    # Merge in source order (OpenAlex first), then deduplicate by ID
+    papers: list = []
+    seen_ids = set()
+    source_counts: dict = {}
+    for label, batch, _ in results:
         count = 0
         if isinstance(batch, list):
             for p in batch:
@@ -109,6 +86,8 @@ async def search_papers(
                     papers.append(p)
                     seen_ids.add(p.id)
                     count += 1
+        elif isinstance(batch, DeadlineExceeded):
+            logger.warning(f"{label} source dropped: {batch}")
         elif isinstance(batch, Exception):
             logger.warning(f"{label} source error: {batch}")
         source_counts[label] = count
@@ -120,18 +99,7 @@ async def search_papers(
         + f" = {len(papers)} total"
     )
 
-    # Record search history
-    try:
-        history = SearchHistory(
-            user_id=current_user["user_id"],
-            query=search_request.query,
-            results_count=len(papers)
-        )
-        db.add(history)
-        await db.commit()
-    except Exception as e:
-        logger.error(f"Failed to record search history: {e}")
-        await db.rollback()
+    await record_search_history(db, current_user["user_id"], search_request.query, len(papers))
 
     return PaperSearchResponse(
         papers=papers,
@@ -139,12 +107,46 @@ async def search_papers(
         from_cache=False
     )
 
+
+@router.post("/search/stream")
+async def search_papers_stream(
+    request: Request,
+    search_request: PaperSearchRequest,
+    current_user: dict = Depends(get_current_user),
+    _quota: None = Depends(compute_quota(1)),
+):
+    """
+    Streaming variant of /search. Emits one SSE event per source as soon as it
+    finishes, carrying only papers not already sent by a faster source:
+
+        data: {"source": "s2", "papers": [...], "count": 7, "received": 9, "elapsed_ms": 412.3}
+        data: {"source": "core", "error": "deadline of 6.00s exceeded", "elapsed_ms": 6001.8}
+        data: {"summary": {"total": 42, "source_counts": {...}, "timings_ms": {...}, "elapsed_ms": ...}}
+        data: [DONE]
+    """
+    start_time = time.time()
+    deadline_at = time.perf_counter() + settings.SEARCH_DEADLINE_SECONDS
+    sources = await _source_searches(search_request)
+    tasks = [asyncio.create_task(timed_search(label, coro, deadline_at)) for label, coro in sources]
+
+    return StreamingResponse(
+        search_events(tasks, search_request.query, current_user["user_id"], start_time),
+        media_type="text/event-stream"
+    )
+
+@router.get("/sources")
+async def list_search_sources(current_user: dict = Depends(get_current_user)):
+    """Registered paper sources with their enabled/configured state and per-worker metrics."""
+    return provider_registry.status()
+
+
 @router.post("/synthesize", response_model=SynthesisResponse)
 async def synthesize(
     request: Request,
     synth_request: SynthesisRequest,
     current_user: dict = Depends(get_current_user),
     _trial: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(5)),
     db: AsyncSession = Depends(get_db),
 ):
     if not synth_request.papers:
@@ -162,11 +164,8 @@ async def synthesize(
     # to enrich the synthesis context beyond what the user explicitly selected.
     rag_context = ""
     try:
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, vector_store.index_papers, synth_request.papers)
-        rag_context = await loop.run_in_executor(
-            None, vector_store.retrieve_rag_context, synth_request.query
-        )
+        await vector_store.index_papers(synth_request.papers)
+        rag_context = await vector_store.retrieve_rag_context(synth_request.query)
     except Exception as rag_err:
         logger.warning(f"RAG enrichment skipped: {rag_err}")
 
@@ -209,6 +208,7 @@ async def synthesize_validated(
     synth_request: SynthesisRequest,
     current_user: dict = Depends(get_current_user),
     _trial: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(10)),
 ):
     """
     Drafter + Critic multi-agent synthesis.
@@ -242,6 +242,7 @@ async def synthesize_streaming(
     synth_request: SynthesisRequest,
     current_user: dict = Depends(get_current_user),
     _trial: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(5)),
 ):
     if not synth_request.papers:
         raise HTTPException(status_code=400, detail="No papers provided")
@@ -254,11 +255,8 @@ async def synthesize_streaming(
     # RAG enrichment (best-effort, non-blocking)
     rag_context = ""
     try:
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, vector_store.index_papers, synth_request.papers)
-        rag_context = await loop.run_in_executor(
-            None, vector_store.retrieve_rag_context, synth_request.query
-        )
+        await vector_store.index_papers(synth_request.papers)
+        rag_context = await vector_store.retrieve_rag_context(synth_request.query)
     except Exception as rag_err:
         logger.warning(f"RAG enrichment skipped (stream): {rag_err}")
 
@@ -300,6 +298,7 @@ async def collaborate_synthesis(
     synth_request: SynthesisRequest,
     current_user: dict = Depends(get_current_user),
     _trial: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(10)),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -360,7 +359,7 @@ async def get_paper_details(
     request: Request,
     current_user: dict = Depends(get_current_user)
 ):
-    openalex = get_openalex_service(client=request.app.state.http_client)
+    openalex = get_openalex_service()
     paper = await openalex.get_paper_details(paper_id)
     
     if not paper:
@@ -375,7 +374,7 @@ async def get_related_papers(
     limit: int = 5,
     current_user: dict = Depends(get_current_user)
 ):
-    openalex = get_openalex_service(client=request.app.state.http_client)
+    openalex = get_openalex_service()
     papers = await openalex.get_related_papers(paper_id, limit=limit)
     return papers
 
@@ -393,7 +392,7 @@ async def get_citation_graph(
     - references: papers it cites (ancestors/past)
     - cited_by: papers that cite it (descendants/future impact)
     """
-    openalex = get_openalex_service(client=request.app.state.http_client)
+    openalex = get_openalex_service()
     data = await openalex.get_citation_graph(
         paper_id=paper_id,
         refs_limit=refs_limit,
@@ -416,6 +415,7 @@ async def explain_paper_impact(
     request: Request,
     current_user: dict = Depends(get_current_user),
     _gate: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(5)),
     db: AsyncSession = Depends(get_db)
 ):
     from app.models.database import User
@@ -427,7 +427,7 @@ async def explain_paper_impact(
     career_field = user.career_field if user and user.career_field else "Academic Research"
     
     # Get paper details
-    openalex = get_openalex_service(client=request.app.state.http_client)
+    openalex = get_openalex_service()
     paper = await openalex.get_paper_details(paper_id)
     if not paper:
         raise HTTPException(status_code=404, detail="Paper not found")
@@ -446,6 +446,7 @@ async def chat_research_streaming(
     chat_request: ChatResearchRequest,
     current_user: dict = Depends(get_current_user),
     _gate: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(5)),
     db: AsyncSession = Depends(get_db)
 ):
     agent = get_research_agent(
@@ -476,6 +477,28 @@ async def chat_research_streaming(
                 authors=p.authors
             ))
 
+    # Uploaded documents: only the chunks relevant to this turn reach the prompt.
+    # Raw text is cut to the same budget (~4 characters per token).
+    uploaded_context = (chat_request.uploaded_text or "")[:settings.DOCUMENT_CHAT_CONTEXT_TOKENS * 4]
+    if chat_request.document_ids:
+        project_id = chat_request.project_id
+        if project_id is not None:
+            from app.models.database import ProjectMember
+            from sqlalchemy import select
+
+            membership = await db.execute(
+                select(ProjectMember).where(
+                    ProjectMember.project_id == project_id,
+                    ProjectMember.user_id == current_user["user_id"]
+                )
+            )
+            if not membership.scalar_one_or_none():
+                raise HTTPException(status_code=403, detail="Not a member of this project")
+        uploaded_context = await vector_store.retrieve_document_context(
+            current_user["user_id"], chat_request.document_ids, chat_request.query,
+            project_id=project_id,
+        ) or uploaded_context
+
     async def generate():
         logger.info(f"Starting chat research for: {chat_request.query}")
         history_dicts = [{"role": m.role, "content": m.content} for m in chat_request.history]
@@ -485,7 +508,7 @@ async def chat_research_streaming(
                 query=chat_request.query,
                 history=history_dicts,
                 local_papers=local_papers,
-                uploaded_context=chat_request.uploaded_text or ""
+                uploaded_context=uploaded_context
             ):
                 yield f"data: {json.dumps({'content': chunk})}\n\n"
         except Exception as e:
@@ -504,6 +527,7 @@ async def run_gap_analysis(
     gap_request: GapAnalysisRequest,
     current_user: dict = Depends(get_current_user),
     _trial: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(5)),
 ):
     """
     Analyzes a research corpus and identifies scholarly gaps:
@@ -567,6 +591,7 @@ async def start_deep_research(
     dr_request: DeepResearchRequest,
     current_user: dict = Depends(get_current_user),
     _trial: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(20)),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -679,6 +704,7 @@ async def validate_deep_research(
     interaction_id: str,
     current_user: dict = Depends(get_current_user),
     _trial: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(5)),
     db: AsyncSession = Depends(get_db),
 ):
     """
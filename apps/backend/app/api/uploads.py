@@ -1,9 +1,10 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import hashlib
 import io
 import pypdf
 import tempfile
@@ -13,11 +14,13 @@ from google import genai
 
 from app.db.session import get_db
 from app.services.pinata_service import get_pinata_service
+from app.services.vector_service import vector_store
 from app.core.security import get_current_user
 from app.core.subscription import require_trial_or_active
 from app.core.logger import get_logger
 from app.core.config import settings
-from app.models.database import UploadedFile
+from app.core.quotas import compute_quota
+from app.models.database import UploadedFile, ProjectMember
 
 logger = get_logger("uploads_api")
 router = APIRouter()
@@ -39,13 +42,26 @@ class UploadHistoryItem(BaseModel):
 @router.post("/pdf")
 async def upload_research_pdf(
     file: UploadFile = File(...),
+    project_id: Optional[int] = None,
     current_user: dict = Depends(get_current_user),
     _gate: dict = Depends(require_trial_or_active),
+    _quota: None = Depends(compute_quota(5)),
     db: AsyncSession = Depends(get_db),
 ):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
+    # Sharing the indexed document with a project requires membership
+    if project_id is not None:
+        membership = await db.execute(
+            select(ProjectMember).where(
+                ProjectMember.project_id == project_id,
+                ProjectMember.user_id == current_user["user_id"]
+            )
+        )
+        if not membership.scalar_one_or_none():
+            raise HTTPException(status_code=403, detail="Not a member of this project")
+
     try:
         content = await file.read()
 
@@ -133,7 +149,19 @@ async def upload_research_pdf(
         pinata = get_pinata_service()
         cid = await pinata.upload_file(content, file.filename)
 
-        # 3. Record in DB
+        # 3. Chunk + embed into the user's document collection so chat can
+        # retrieve the relevant passages by document id instead of resending text
+        document_id = cid or hashlib.sha256(content).hexdigest()
+        chunks_indexed = 0
+        if text.strip():
+            try:
+                chunks_indexed = await vector_store.index_document(
+                    current_user["user_id"], document_id, file.filename, text, project_id=project_id
+                )
+            except Exception as e:
+                logger.error(f"Document indexing failed for {file.filename}: {str(e)}")
+
+        # 4. Record in DB
         record = UploadedFile(
             user_id=current_user["user_id"],
             filename=file.filename,
@@ -146,6 +174,8 @@ async def upload_research_pdf(
         return {
             "filename": file.filename,
             "cid": cid,
+            "document_id": document_id,
+            "chunks_indexed": chunks_indexed,
             "extracted_text": text[:5000],
             "full_text_length": len(text),
         }
@@ -1,16 +1,93 @@
 import redis.asyncio as aioredis
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Iterable, Tuple
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+import asyncio
 import json
+import time
+import uuid
 from functools import wraps
 import hashlib
 
 from app.core.config import settings
+from app.core.deadline import detach
+from app.core.serialization import get_codec
+
+# Entries written with a stale window are wrapped as {_FRESH_UNTIL: epoch, "value": ...}
+_FRESH_UNTIL = "__fresh_until__"
+
+# Workers announce delete/clear_pattern/set here so peers drop their L1 copies
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Keys per SCAN/SSCAN page and per UNLINK call — small enough never to stall Redis
+_BATCH_SIZE = 500
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+class LocalCache:
+    """
+    Bounded per-worker LRU with a short TTL, holding decoded values.
+    Values are shared between callers — treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key → (expires_at monotonic, value, fresh_until epoch or None)
+        self._data: "OrderedDict[str, Tuple[float, Any, Optional[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value, fresh_until = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value, fresh_until
+
+    def set(self, key: str, value: Any, fresh_until: Optional[float], ttl: float):
+        self._data[key] = (time.monotonic() + min(ttl, self.ttl), value, fresh_until)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear_pattern(self, pattern: str):
+        for key in [k for k in self._data if fnmatchcase(k, pattern)]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
 
 
 class RedisCache:
+    """
+    Two-tier cache: a per-worker LocalCache (L1) in front of Redis (L2).
+    L1 is only used while Redis is connected; invalidations travel over
+    Redis pub/sub so every worker drops its L1 copy on set/delete/clear_pattern.
+    Values are encoded with the configured codec (app.core.serialization) and
+    go through `raw`, a bytes-mode connection; `redis` decodes responses to str
+    and is what other modules use for locks, counters and scripts.
+    """
+
     def __init__(self):
         self.redis: Optional[aioredis.Redis] = None
+        self.raw: Optional[aioredis.Redis] = None
         self.enabled = bool(settings.REDIS_URL)
+        self.local = LocalCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_TTL)
+        self.counters: Dict[str, int] = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+        self._instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
     
     async def connect(self):
         if self.enabled:
@@ -19,56 +96,256 @@ class RedisCache:
                 encoding="utf-8",
                 decode_responses=True
             )
+            self.raw = await aioredis.from_url(settings.REDIS_URL)
+            if settings.CACHE_L1_ENABLED:
+                self._listener = asyncio.create_task(self._listen_for_invalidations())
     
     async def disconnect(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self.local.clear()
         if self.redis:
             await self.redis.close()
+        if self.raw:
+            await self.raw.close()
+
+    @property
+    def _l1_enabled(self) -> bool:
+        return settings.CACHE_L1_ENABLED and self.redis is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier hit/miss counters for this worker."""
+        return {**self.counters, "l1_entries": len(self.local)}
+
+    async def _publish_invalidation(self, keys: Optional[list] = None, pattern: Optional[str] = None):
+        if not self._l1_enabled:
+            return
+        try:
+            await self.redis.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"origin": self._instance_id, "keys": keys or [], "pattern": pattern}),
+            )
+        except Exception as e:
+            print(f"Redis publish error: {e}")
+
+    def _apply_invalidation(self, message: str):
+        data = json.loads(message)
+        if data.get("origin") == self._instance_id:
+            return
+        for key in data.get("keys") or []:
+            self.local.delete(key)
+        if data.get("pattern"):
+            self.local.clear_pattern(data["pattern"])
+
+    async def _listen_for_invalidations(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Redis invalidation listener error: {e}")
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+            # Invalidations may have been missed while disconnected
+            self.local.clear()
+            await asyncio.sleep(1)
     
     async def get(self, key: str) -> Optional[Any]:
-        if not self.redis:
-            return None
+        value, _ = await self.get_entry(key)
+        return value
+
+    async def get_entry(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Return (value, is_stale). Stale entries are past their soft TTL but not yet expired."""
+        entries = await self.get_many_entries([key])
+        return entries[key]
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Values of the keys that are cached (one MGET for everything L1 doesn't hold)."""
+        entries = await self.get_many_entries(keys)
+        return {key: value for key, (value, _) in entries.items() if value is not None}
+
+    async def get_many_entries(self, keys: Iterable[str]) -> Dict[str, Tuple[Optional[Any], bool]]:
+        """get_entry() for several keys in a single Redis round trip; misses map to (None, False)."""
+        keys = list(dict.fromkeys(keys))
+        entries: Dict[str, Tuple[Optional[Any], bool]] = {key: (None, False) for key in keys}
+        if not self.redis or not keys:
+            return entries
+
+        now = time.time()
+        missing = keys
+        if self._l1_enabled:
+            missing = []
+            for key in keys:
+                entry = self.local.get(key)
+                if entry is None:
+                    missing.append(key)
+                    continue
+                value, fresh_until = entry
+                entries[key] = (value, fresh_until is not None and now >= fresh_until)
+            self.counters["l1_hits"] += len(keys) - len(missing)
+            self.counters["l1_misses"] += len(missing)
+        if not missing:
+            return entries
         
         try:
-            value = await self.redis.get(key)
-            if value:
-                return json.loads(value)
+            codec = get_codec()
+            for key, raw in zip(missing, await self.raw.mget(missing)):
+                if not raw:
+                    self.counters["l2_misses"] += 1
+                    continue
+                self.counters["l2_hits"] += 1
+                value, fresh_until = self._unwrap(codec.loads(raw))
+                if self._l1_enabled:
+                    self.local.set(key, value, fresh_until, settings.CACHE_L1_TTL)
+                entries[key] = (value, fresh_until is not None and now >= fresh_until)
         except Exception as e:
             print(f"Redis get error: {e}")
-        return None
+        return entries
+
+    @staticmethod
+    def _unwrap(data: Any) -> Tuple[Any, Optional[float]]:
+        if isinstance(data, dict) and _FRESH_UNTIL in data:
+            return data["value"], data[_FRESH_UNTIL]
+        return data, None
     
-    async def set(self, key: str, value: Any, ttl: int = None):
-        if not self.redis:
+    async def set(self, key: str, value: Any, ttl: int = None, stale_ttl: int = None, tags: Iterable[str] = ()):
+        """
+        Store `value` for `ttl` seconds. With `stale_ttl`, the entry is kept for
+        another `stale_ttl` seconds past that and reported as stale by get_entry().
+        `tags` register the key for invalidate_tags() (e.g. "provider:s2", "user:<id>").
+        """
+        await self.set_many({key: value}, ttl=ttl, stale_ttl=stale_ttl, tags=tags)
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: int = None,
+        stale_ttl: int = None,
+        tags: Iterable[str] = (),
+    ):
+        """set() for several keys sharing ttl/tags, written in one pipelined round trip."""
+        if not self.redis or not items:
             return
         
         try:
             ttl = ttl or settings.CACHE_TTL
-            await self.redis.setex(
-                key,
-                ttl,
-                json.dumps(value, default=str)
-            )
+            fresh_until = None
+            if stale_ttl:
+                fresh_until = time.time() + ttl
+            hard_ttl = ttl + (stale_ttl or 0)
+            codec = get_codec()
+            tags = list(tags)
+
+            payloads = {}
+            for key, value in items.items():
+                if fresh_until is not None:
+                    value = {_FRESH_UNTIL: fresh_until, "value": value}
+                payloads[key] = codec.dumps(value)
+
+            if len(payloads) == 1 and not tags:
+                [(key, payload)] = payloads.items()
+                await self.raw.set(key, payload, ex=hard_ttl)
+            else:
+                pipe = self.raw.pipeline(transaction=False)
+                for key, payload in payloads.items():
+                    pipe.set(key, payload, ex=hard_ttl)
+                for tag in tags:
+                    pipe.sadd(_tag_key(tag), *payloads)
+                    pipe.expire(_tag_key(tag), max(hard_ttl, settings.CACHE_TAG_TTL))
+                await pipe.execute()
+
+            if self._l1_enabled:
+                # Keep L1 identical to what other workers will decode from Redis
+                for key, payload in payloads.items():
+                    self.local.set(key, self._unwrap(codec.loads(payload))[0], fresh_until, hard_ttl)
+                await self._publish_invalidation(keys=list(payloads))
         except Exception as e:
             print(f"Redis set error: {e}")
+
+    async def try_lock(self, key: str, ttl: float) -> bool:
+        """Best-effort cross-worker lock that simply expires; True without Redis."""
+        if not self.redis:
+            return True
+        try:
+            return bool(await self.redis.set(f"lock:{key}", "1", nx=True, px=int(ttl * 1000)))
+        except Exception as e:
+            print(f"Redis lock error: {e}")
+            return True
     
     async def delete(self, key: str):
         if not self.redis:
             return
         
+        self.local.delete(key)
         try:
             await self.redis.delete(key)
         except Exception as e:
             print(f"Redis delete error: {e}")
+        await self._publish_invalidation(keys=[key])
     
     async def clear_pattern(self, pattern: str):
+        """
+        Delete keys matching a glob pattern. Walks the keyspace incrementally
+        with SCAN — prefer tags (invalidate_tags) for anything hot.
+        """
         if not self.redis:
             return
         
+        self.local.clear_pattern(pattern)
         try:
-            keys = await self.redis.keys(pattern)
-            if keys:
-                await self.redis.delete(*keys)
+            batch = []
+            async for key in self.redis.scan_iter(match=pattern, count=_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= _BATCH_SIZE:
+                    await self.redis.unlink(*batch)
+                    batch = []
+            if batch:
+                await self.redis.unlink(*batch)
         except Exception as e:
             print(f"Redis clear pattern error: {e}")
+        await self._publish_invalidation(pattern=pattern)
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key registered under the given tags; cost is O(keys affected)."""
+        if not self.redis:
+            return 0
+
+        removed = 0
+        for tag in tags:
+            tag_key = _tag_key(tag)
+            try:
+                batch = []
+                async for key in self.redis.sscan_iter(tag_key, count=_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= _BATCH_SIZE:
+                        removed += await self._unlink_batch(batch)
+                        batch = []
+                if batch:
+                    removed += await self._unlink_batch(batch)
+                await self.redis.unlink(tag_key)
+            except Exception as e:
+                print(f"Redis invalidate tag error: {e}")
+        return removed
+
+    async def _unlink_batch(self, keys: list) -> int:
+        for key in keys:
+            self.local.delete(key)
+        removed = await self.redis.unlink(*keys)
+        await self._publish_invalidation(keys=keys)
+        return removed
     
     def make_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate cache key from prefix and arguments"""
@@ -82,23 +359,31 @@ class RedisCache:
 cache = RedisCache()
 
 
-def cached(prefix: str, ttl: int = None):
-    """Decorator for caching function results"""
+def cached(prefix: str, ttl: int = None, stale_ttl: int = None):
+    """
+    Decorator for caching function results.
+    With `stale_ttl`, results older than `ttl` are still returned immediately
+    while a single background call refreshes them (stale-while-revalidate).
+    """
     def decorator(func):
+        async def refresh(cache_key, args, kwargs):
+            result = await func(*args, **kwargs)
+            await cache.set(cache_key, result, ttl, stale_ttl=stale_ttl)
+            return result
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
             cache_key = cache.make_key(prefix, *args, **kwargs)
             
             # Try to get from cache
-            cached_value = await cache.get(cache_key)
+            cached_value, stale = await cache.get_entry(cache_key)
             if cached_value is not None:
+                if stale and await cache.try_lock(f"refresh:{cache_key}", settings.CACHE_REFRESH_LOCK_SECONDS):
+                    detach(asyncio.create_task(refresh(cache_key, args, kwargs)))
                 return cached_value
             
             # Call function and cache result
-            result = await func(*args, **kwargs)
-            await cache.set(cache_key, result, ttl)
-            
-            return result
+            return await refresh(cache_key, args, kwargs)
         return wrapper
     return decorator
@@ -44,13 +44,36 @@ def process_batch_synthesis(queries: list, papers: list, user_id: int):
 
 
 @celery_app.task(name="cleanup_old_vectors")
-def cleanup_old_vectors(days: int = 90):
-    """Clean up old vector embeddings"""
+def cleanup_old_vectors(days: int = None):
+    """Delete shared-corpus paper vectors not indexed or used for `days` days"""
+    from app.services.vector_service import VectorStore
     from datetime import datetime, timedelta
-    
+    import asyncio
+
+    days = days or settings.PAPER_VECTOR_RETENTION_DAYS
+
+    async def cleanup():
+        store = VectorStore()
+        try:
+            return await store.cleanup_stale_papers(days)
+        finally:
+            await store.aclose()
+
+    deleted = asyncio.run(cleanup())
     cutoff = datetime.utcnow() - timedelta(days=days)
-    # Implementation depends on metadata structure
-    return {"status": "completed", "cutoff": cutoff.isoformat()}
+    return {"status": "completed", "cutoff": cutoff.isoformat(), "deleted": deleted}
+
+
+@celery_app.task(name="reindex_vectors", bind=True)
+def reindex_vectors(self, namespaces: list = None, batch_size: int = None, fresh: bool = False):
+    """Re-embed the vector store into new collections and swap aliases (resumable)"""
+    from app.services.reindex import NAMESPACES, reindex
+    import asyncio
+
+    def progress(namespace: str, done: int, total: int):
+        self.update_state(state="PROGRESS", meta={"namespace": namespace, "done": done, "total": total})
+
+    return asyncio.run(reindex(namespaces or NAMESPACES, batch_size, fresh, progress=progress))
 
 
 @celery_app.task(name="export_user_data")
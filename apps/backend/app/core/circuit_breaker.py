@@ -0,0 +1,210 @@
+"""
+Per-upstream circuit breaker.
+
+    breaker = CircuitBreaker("s2")
+    if not await breaker.allow():
+        return []                      # known-dead source: skip it
+    try:
+        result = await call_upstream()
+    except Exception as e:
+        if is_upstream_failure(e):
+            await breaker.record_failure(retry_after_seconds(e), trip=is_rate_limited(e))
+        raise
+    await breaker.record_success()
+
+States: closed → (failure rate over the sliding window ≥ threshold) → open →
+(open period elapsed) → half-open → one probe call → closed or open again.
+Each consecutive trip doubles the open period up to CIRCUIT_MAX_OPEN_SECONDS,
+and a 429/503 with Retry-After opens the breaker for exactly that long.
+The open-until timestamp is mirrored in Redis so every worker backs off together.
+"""
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Optional, Tuple
+
+import httpx
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# How long a worker trusts its last read of the shared Redis state
+_SHARED_STATE_TTL = 1.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit for {name} is open (retry in {retry_in:.1f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Seconds requested by a 429/503 Retry-After header, if any."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    if exc.response.status_code not in (429, 503):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Timeouts, connection errors, 5xx and 429 count against a source; 4xx do not."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate: Optional[float] = None,
+        window_seconds: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        max_open_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate if failure_rate is not None else settings.CIRCUIT_FAILURE_RATE
+        self.window_seconds = window_seconds if window_seconds is not None else settings.CIRCUIT_WINDOW_SECONDS
+        self.min_calls = min_calls if min_calls is not None else settings.CIRCUIT_MIN_CALLS
+        self.open_seconds = open_seconds if open_seconds is not None else settings.CIRCUIT_OPEN_SECONDS
+        self.max_open_seconds = (
+            max_open_seconds if max_open_seconds is not None else settings.CIRCUIT_MAX_OPEN_SECONDS
+        )
+
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._open_until = 0.0
+        self._tripped = False
+        self._consecutive_trips = 0
+        self._probe_started = 0.0
+        self._shared_checked_at = 0.0
+
+    @property
+    def redis_key(self) -> str:
+        return f"circuit:{self.name}:open_until"
+
+    @property
+    def state(self) -> str:
+        if not self._tripped:
+            return CLOSED
+        return OPEN if time.time() < self._open_until else HALF_OPEN
+
+    async def _sync_shared_state(self, now: float):
+        if not cache.redis or now - self._shared_checked_at < _SHARED_STATE_TTL:
+            return
+        self._shared_checked_at = now
+        try:
+            value = await cache.redis.get(self.redis_key)
+        except Exception as e:
+            logger.debug(f"Circuit state read failed for {self.name}: {e}")
+            return
+        if value and float(value) > self._open_until:
+            # Another worker tripped the breaker
+            self._open_until = float(value)
+            self._tripped = True
+
+    async def allow(self) -> bool:
+        """True if a call may go out now. In half-open only one probe is let through."""
+        now = time.time()
+        await self._sync_shared_state(now)
+
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+
+        # Half-open: admit a single probe; if it never reports back
+        # (e.g. it was cancelled) admit another after the open period.
+        if now - self._probe_started < self.open_seconds:
+            return False
+        self._probe_started = now
+        return True
+
+    def retry_in(self) -> float:
+        return max(0.0, self._open_until - time.time())
+
+    def _prune(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    async def record_success(self):
+        now = time.time()
+        self._outcomes.append((now, True))
+        self._prune(now)
+        if self._tripped:
+            logger.info(f"Circuit for {self.name} closed after successful probe")
+            self._tripped = False
+            self._consecutive_trips = 0
+            self._probe_started = 0.0
+            self._outcomes.clear()
+            if cache.redis:
+                try:
+                    await cache.redis.delete(self.redis_key)
+                except Exception as e:
+                    logger.debug(f"Circuit state reset failed for {self.name}: {e}")
+
+    async def record_failure(self, retry_after: Optional[float] = None, trip: bool = False):
+        """Record a failed call; `trip` (e.g. a 429) opens the breaker immediately."""
+        now = time.time()
+        if self.state == OPEN:
+            # Stragglers from before the trip must not stretch the open period
+            return
+        self._outcomes.append((now, False))
+        self._prune(now)
+
+        if trip or retry_after is not None or self.state == HALF_OPEN:
+            await self._trip(now, retry_after)
+            return
+
+        total = len(self._outcomes)
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if total >= self.min_calls and failures / total >= self.failure_rate:
+            await self._trip(now)
+
+    async def _trip(self, now: float, retry_after: Optional[float] = None):
+        if retry_after is not None:
+            duration = retry_after
+        else:
+            duration = min(self.open_seconds * (2 ** self._consecutive_trips), self.max_open_seconds)
+        self._consecutive_trips += 1
+        self._tripped = True
+        self._probe_started = 0.0
+        self._open_until = now + duration
+        self._outcomes.clear()
+        logger.warning(f"Circuit for {self.name} opened for {duration:.1f}s")
+
+        if cache.redis and duration > 0:
+            try:
+                await cache.redis.set(self.redis_key, self._open_until, px=int(duration * 1000))
+            except Exception as e:
+                logger.debug(f"Circuit state write failed for {self.name}: {e}")
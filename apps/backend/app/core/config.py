@@ -23,6 +23,21 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL: int = 3600
+    # Stale-while-revalidate: search results are served for this long past their
+    # TTL while one background refresh (per CACHE_REFRESH_LOCK_SECONDS) renews them
+    SEARCH_CACHE_STALE_TTL: int = 21600
+    CACHE_REFRESH_LOCK_SECONDS: float = 30.0
+    # Per-worker in-process L1 in front of Redis; peers are invalidated via pub/sub
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_ENTRIES: int = 2048
+    CACHE_L1_TTL: float = 30.0
+    # Cache value encoding: "json" | "orjson" | "msgpack", optionally zstd-compressed
+    # above CACHE_COMPRESS_MIN_BYTES (entries stay readable after switching)
+    CACHE_SERIALIZER: str = "orjson"
+    CACHE_COMPRESSION: Optional[str] = None
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
+    # Lifetime of tag → member-key sets used by cache.invalidate_tags()
+    CACHE_TAG_TTL: int = 172800
     
     # LLM Providers
     OPENAI_API_KEY: Optional[str] = None
@@ -36,9 +51,33 @@ class Settings(BaseSettings):
     # Vector Database
     QDRANT_URL: Optional[str] = None
     QDRANT_API_KEY: Optional[str] = None
-    QDRANT_COLLECTION: str = "research_queries"
+    QDRANT_COLLECTION: str = "research_queries"  # private saved queries (tenant: user_id)
+    QDRANT_PAPERS_COLLECTION: str = "papers"  # shared paper corpus for RAG
+    QDRANT_DOCUMENTS_COLLECTION: str = "documents"  # uploaded documents (tenant: user_id, shared via project_id)
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "torch"  # torch | onnx | onnx-int8 (see benchmark_embedding_backends.py)
+    EMBEDDING_ONNX_INT8_FILE: str = "onnx/model_quint8_avx2.onnx"  # quantized weights in the model repo
+    EMBEDDING_BATCH_SIZE: int = 64  # texts per forward pass in VectorStore.embed
+    EMBEDDING_WORKERS: int = 2  # threads in the dedicated encode pool
+    EMBEDDING_MAX_PENDING: int = 16  # encode jobs queued or running before callers wait
+    EMBEDDING_QUEUE_TIMEOUT_SECONDS: float = 10.0  # wait for a slot before EmbeddingQueueFull
+    EMBEDDING_MICROBATCH_MAX_SIZE: int = 32  # texts coalesced from concurrent small requests
+    EMBEDDING_MICROBATCH_MAX_WAIT_MS: float = 5.0  # how long a request waits for company (0 disables)
+    VECTOR_WARMUP_ON_STARTUP: bool = True  # load model + check collection in the background at boot; /ready waits for it
+    VECTOR_WARMUP_RETRY_SECONDS: float = 2.0  # first retry delay after a failed warm-up, doubled each time
+    VECTOR_WARMUP_RETRY_MAX_SECONDS: float = 60.0
     VECTOR_SEARCH_K: int = 5
+    # Hybrid RAG retrieval (dense + BM25 → reciprocal rank fusion → MMR)
+    RAG_CANDIDATES: int = 30  # pool size fetched from each of the dense and keyword searches
+    RAG_RRF_K: int = 60
+    RAG_MMR_LAMBDA: float = 0.7  # 1.0 = pure relevance, lower = more diverse context
+    # Uploaded documents (chunked into QDRANT_DOCUMENTS_COLLECTION, retrieved by document id in chat)
+    DOCUMENT_CHUNK_TOKENS: int = 200  # below all-MiniLM-L6-v2's 256 word-piece limit
+    DOCUMENT_CHUNK_OVERLAP: int = 40
+    DOCUMENT_CHAT_CONTEXT_TOKENS: int = 800  # prompt budget for document context; chunks = budget // DOCUMENT_CHUNK_TOKENS
+    # Vector maintenance (app/services/reindex.py, cleanup_old_vectors task)
+    REINDEX_BATCH_SIZE: int = 256  # rows / points embedded per batch
+    PAPER_VECTOR_RETENTION_DAYS: int = 90  # shared corpus papers unused this long are deleted
     
     # OpenAlex
     OPENALEX_EMAIL: str
@@ -46,6 +85,54 @@ class Settings(BaseSettings):
     OPENALEX_API_KEY: Optional[str] = None
     MAX_PAPERS_PER_QUERY: int = 50
     DEFAULT_PAPERS_LIMIT: int = 10
+    # Fire a duplicate OpenAlex request once the first exceeds ~its p95 (None disables hedging)
+    OPENALEX_HEDGE_AFTER_SECONDS: Optional[float] = 2.5
+
+    # Paper sources queried by /research/search, in fan-out order (None = all registered)
+    SEARCH_PROVIDERS: Optional[list[str]] = [
+        "openalex", "s2", "arxiv", "core", "elsevier",
+        "pubmed", "doaj", "ajol", "africarxiv",
+    ]
+
+    # Per-source circuit breaker: open when ≥ CIRCUIT_FAILURE_RATE of the calls in the
+    # window failed; the open period doubles on each consecutive trip up to the max
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_WINDOW_SECONDS: float = 60.0
+    CIRCUIT_MIN_CALLS: int = 5
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    CIRCUIT_MAX_OPEN_SECONDS: float = 600.0
+
+    # Outbound pacing: each source waits for a token-bucket slot (shared via Redis)
+    # before calling its upstream; searches that would wait longer are skipped
+    OUTBOUND_RATE_LIMIT_ENABLED: bool = True
+    OUTBOUND_RATE_LIMIT_MAX_WAIT_SECONDS: float = 3.0
+
+    # Multi-source search deadlines — results that miss their budget are dropped
+    # from the response but still land in the cache for the next caller
+    SEARCH_DEADLINE_SECONDS: float = 8.0
+    SEARCH_DEFAULT_PROVIDER_BUDGET: float = 6.0
+    SEARCH_PROVIDER_BUDGETS: dict[str, float] = {
+        "openalex": 7.0,
+        "pubmed": 5.0,
+        "ajol": 4.0,
+    }
+
+    # Single-flight: identical concurrent provider searches share one upstream call;
+    # other workers wait up to SINGLE_FLIGHT_WAIT_SECONDS for the leader's cached result
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: float = 25.0
+    SINGLE_FLIGHT_WAIT_SECONDS: float = 10.0
+    SINGLE_FLIGHT_POLL_SECONDS: float = 0.1
+
+    # Outbound HTTP: one pooled client per upstream host (HTTP/2 when `h2` is installed)
+    HTTP_TIMEOUT_SECONDS: float = 15.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_MAX_KEEPALIVE_PER_HOST: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_HOST_MAX_CONNECTIONS: dict[str, int] = {
+        "api.openalex.org": 40,
+        "export.arxiv.org": 4,
+        "www.ajol.info": 4,
+    }
 
     # Google / Gemini
     GOOGLE_API_KEY: Optional[str] = None
@@ -112,6 +199,16 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
+    # Tiered quotas (app.core.quotas): every request spends 1 "requests" unit;
+    # LLM / upstream-heavy routes also spend their declared "compute" cost
+    QUOTA_PERIODS: dict[str, int] = {"requests": 60, "compute": 3600}
+    QUOTA_LIMITS: dict[str, dict[str, int]] = {
+        "anonymous": {"requests": 30, "compute": 30},
+        "free": {"requests": 60, "compute": 120},
+        "trialing": {"requests": 60, "compute": 300},
+        "active": {"requests": 300, "compute": 2000},
+        "superuser": {"requests": 1000, "compute": 10000},
+    }
     
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
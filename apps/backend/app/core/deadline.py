@@ -0,0 +1,113 @@
+"""
+Deadline helpers for latency-sensitive fan-outs.
+
+    result = await run_with_budget(provider.search_papers(q), budget=4.0)
+    response = await hedged(lambda: client.get(url), hedge_after=2.5)
+
+run_with_budget() never cancels work that misses its budget: the task keeps
+running in the background so whatever it writes to the cache is ready for the
+next caller. hedged() fires a duplicate attempt once the first one has been
+slower than `hedge_after` (≈ the upstream's p95) and returns whichever wins.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from app.core.logger import get_logger
+
+logger = get_logger("deadline")
+
+# Strong references to detached tasks so they are not garbage-collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an awaited call does not finish within its budget."""
+
+    def __init__(self, budget: float):
+        super().__init__(f"deadline of {budget:.2f}s exceeded")
+        self.budget = budget
+
+
+def _log_background_result(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.debug(f"Background task {task.get_name()} failed: {exc}")
+
+
+def detach(task: asyncio.Task) -> asyncio.Task:
+    """Let a task finish on its own, logging (not raising) any failure."""
+    _background_tasks.add(task)
+    task.add_done_callback(_log_background_result)
+    return task
+
+
+async def run_with_budget(coro: Awaitable[Any], budget: Optional[float], name: str = "") -> Any:
+    """
+    Await `coro` for at most `budget` seconds.
+    On timeout the underlying task is detached (not cancelled) and DeadlineExceeded is raised.
+    """
+    if budget is None:
+        return await coro
+
+    task = asyncio.ensure_future(coro)
+    if name:
+        task.set_name(name)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=max(budget, 0.0))
+    except asyncio.CancelledError:
+        # Our caller went away (e.g. client disconnect) — don't leak the work
+        task.cancel()
+        raise
+
+    if task in done:
+        return task.result()
+
+    detach(task)
+    raise DeadlineExceeded(budget)
+
+
+async def hedged(
+    attempt: Callable[[], Awaitable[Any]],
+    hedge_after: Optional[float],
+    name: str = "",
+    may_hedge: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> Any:
+    """
+    Run `attempt()`; if it hasn't finished after `hedge_after` seconds, start a
+    second identical attempt and return the first successful result.
+    The losing attempt is cancelled. If both fail, the last error is raised.
+    `may_hedge()` is awaited before the second attempt goes out; if it returns
+    False (e.g. no outbound rate-limit slot is free) the first attempt is awaited alone.
+    """
+    if not hedge_after or hedge_after <= 0:
+        return await attempt()
+
+    first = asyncio.ensure_future(attempt())
+    second: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if first in done:
+            return first.result()
+
+        if may_hedge is not None and not await may_hedge():
+            logger.debug(f"Not hedging {name or ''}: no capacity for a second attempt")
+            return await first
+
+        logger.info(f"Hedging slow request {name or ''} after {hedge_after:.2f}s")
+        second = asyncio.ensure_future(attempt())
+        pending = {first, second}
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in (first, second):
+            if task is not None and not task.done():
+                task.cancel()
@@ -0,0 +1,98 @@
+"""
+Process-wide pooled httpx clients.
+
+    from app.core.http_client import http_clients
+
+    client = http_clients.get("https://api.openalex.org/works")
+    response = await client.get(url, params=params)
+
+One AsyncClient is kept per upstream host so connection limits apply per host
+(a slow AJOL can't starve OpenAlex of sockets) and TCP/TLS connections are
+reused across requests. HTTP/2 is negotiated when the `h2` package is installed.
+Never close a client obtained here — `http_clients.aclose()` runs in the FastAPI
+lifespan. Clients are bound to the event loop that created them, so code that
+runs its own loop (Celery tasks, CLI scripts) transparently gets fresh ones.
+"""
+import asyncio
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("http_client")
+
+try:
+    import h2  # noqa: F401 — presence enables HTTP/2 in httpx
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+_DEFAULT_HOST = "*"
+
+
+def _host_of(url_or_host: Optional[str]) -> str:
+    if not url_or_host:
+        return _DEFAULT_HOST
+    if "://" not in url_or_host:
+        return url_or_host.lower()
+    return (urlsplit(url_or_host).hostname or _DEFAULT_HOST).lower()
+
+
+class HTTPClientManager:
+    def __init__(self):
+        self._clients: Dict[Tuple[str, int], Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+    def _limits_for(self, host: str) -> httpx.Limits:
+        max_connections = settings.HTTP_HOST_MAX_CONNECTIONS.get(
+            host, settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        )
+        return httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_connections, settings.HTTP_MAX_KEEPALIVE_PER_HOST),
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        )
+
+    def _drop_dead_loops(self):
+        for key, (_, loop) in list(self._clients.items()):
+            if loop.is_closed():
+                # Its connections died with the loop; nothing left to close
+                del self._clients[key]
+
+    def get(self, url_or_host: Optional[str] = None, timeout: Optional[float] = None) -> httpx.AsyncClient:
+        """
+        Pooled client for the host of `url_or_host` (a shared default client when omitted).
+        `timeout` only applies when the client for that host is first created.
+        """
+        loop = asyncio.get_running_loop()
+        host = _host_of(url_or_host)
+        key = (host, id(loop))
+
+        entry = self._clients.get(key)
+        if entry is not None and not entry[0].is_closed:
+            return entry[0]
+
+        self._drop_dead_loops()
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout or settings.HTTP_TIMEOUT_SECONDS),
+            limits=self._limits_for(host),
+            http2=_HTTP2_AVAILABLE,
+            follow_redirects=True,
+        )
+        self._clients[key] = (client, loop)
+        logger.debug(f"Created pooled HTTP client for {host} (http2={_HTTP2_AVAILABLE})")
+        return client
+
+    async def aclose(self):
+        """Close every client that belongs to the running loop."""
+        loop = asyncio.get_running_loop()
+        for key, (client, client_loop) in list(self._clients.items()):
+            if client_loop is loop:
+                await client.aclose()
+                del self._clients[key]
+        self._drop_dead_loops()
+
+
+http_clients = HTTPClientManager()
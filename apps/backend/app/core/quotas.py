@@ -0,0 +1,154 @@
+"""
+Tiered, cost-weighted request quotas.
+
+Every API request spends one unit of the caller's "requests" budget
+(`request_quota`, attached to the routers in main.py). Routes that call LLMs
+or fan out to upstream APIs additionally declare a compute cost (plain search,
+mostly served from cache, costs 1; LLM routes 5–20):
+
+    @router.post("/synthesize/validated")
+    async def endpoint(..., _quota: None = Depends(compute_quota(10))):
+
+Budgets per tier (anonymous / free / trialing / active / superuser) live in
+settings.QUOTA_LIMITS over the periods in settings.QUOTA_PERIODS. Remaining
+budget is reported as X-RateLimit-* headers on every response (copied from
+request.state by the middleware in main.py) and on 429s.
+"""
+import math
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi import HTTPException, Request
+from sqlalchemy import select
+
+from app.core.cache import LocalCache, cache
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.rate_limit import RateLimitResult, rate_limit_identity, rate_limiter
+
+logger = get_logger("quotas")
+
+ANONYMOUS = "anonymous"
+FREE = "free"
+TRIALING = "trialing"
+ACTIVE = "active"
+SUPERUSER = "superuser"
+
+# Tier lookups hit the DB; cache them briefly (subscription changes apply within a minute).
+# The in-process copy also covers deployments running without Redis.
+_TIER_CACHE_TTL = 60
+_local_tiers = LocalCache(max_entries=10_000, ttl=_TIER_CACHE_TTL)
+
+
+def tier_for(user: Any) -> str:
+    """Quota tier of a User row (None → free)."""
+    if user is None:
+        return FREE
+    if user.is_superuser:
+        return SUPERUSER
+    if user.subscription_status == "active":
+        return ACTIVE
+    if (
+        user.subscription_status == "trialing"
+        and user.trial_ends_at is not None
+        and user.trial_ends_at > datetime.utcnow()
+    ):
+        return TRIALING
+    return FREE
+
+
+async def _user_tier(user_id: str) -> str:
+    cache_key = f"quota:tier:{user_id}"
+    local = _local_tiers.get(cache_key)
+    if local is not None:
+        return local[0]
+    tier = await cache.get(cache_key)
+    if tier:
+        _local_tiers.set(cache_key, tier, None, _TIER_CACHE_TTL)
+        return tier
+    from app.db.session import AsyncSessionLocal
+    from app.models.database import User
+
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User).where(User.id == user_id))
+            tier = tier_for(result.scalar_one_or_none())
+    except Exception as e:
+        logger.error(f"Tier lookup failed for {user_id}: {e}")
+        return FREE
+    _local_tiers.set(cache_key, tier, None, _TIER_CACHE_TTL)
+    await cache.set(cache_key, tier, ttl=_TIER_CACHE_TTL)
+    return tier
+
+
+async def caller_tier(request: Request) -> str:
+    cached = getattr(request.state, "quota_tier", None)
+    if cached:
+        return cached
+    identity = await rate_limit_identity(request)
+    if identity.startswith("user:"):
+        tier = await _user_tier(identity[len("user:"):])
+    else:
+        tier = ANONYMOUS
+    request.state.quota_tier = tier
+    return tier
+
+
+def _headers(bucket: str, result: RateLimitResult) -> Dict[str, str]:
+    suffix = bucket.capitalize()
+    return {
+        f"X-RateLimit-Limit-{suffix}": str(result.limit),
+        f"X-RateLimit-Remaining-{suffix}": str(result.remaining),
+        f"X-RateLimit-Reset-{suffix}": str(math.ceil(result.reset_after)),
+    }
+
+
+async def spend(request: Request, bucket: str, cost: float) -> RateLimitResult:
+    """
+    Charge `cost` units of `bucket` to the caller, raising 429 when the budget is
+    exhausted and 403 when `cost` is larger than the tier's whole budget.
+    """
+    tier = await caller_tier(request)
+    identity = await rate_limit_identity(request)
+    limits = settings.QUOTA_LIMITS.get(tier) or settings.QUOTA_LIMITS[FREE]
+    limit = limits[bucket]
+    period = settings.QUOTA_PERIODS[bucket]
+
+    if cost > limit:
+        # No amount of waiting admits this: the cost is more than the tier's whole budget
+        logger.info(f"Cost {cost} exceeds the whole '{bucket}' budget of {tier} ({limit})")
+        raise HTTPException(
+            status_code=403,
+            detail=f"This action costs {cost:g} {bucket} units but your plan allows {limit} "
+                   f"per {period}s. Upgrade your plan to use it.",
+            headers={"X-RateLimit-Tier": tier},
+        )
+
+    result = await rate_limiter.hit(f"{identity}:{bucket}", limit, period, cost)
+
+    headers = getattr(request.state, "quota_headers", {})
+    headers.update(_headers(bucket, result))
+    headers["X-RateLimit-Tier"] = tier
+    request.state.quota_headers = headers
+
+    if not result.allowed:
+        retry_after = max(1, math.ceil(result.retry_after))
+        logger.info(f"Quota '{bucket}' exhausted for {identity} ({tier}), cost {cost}")
+        raise HTTPException(
+            status_code=429,
+            detail=f"{bucket.capitalize()} quota exceeded for your plan. Try again in {retry_after}s.",
+            headers={**headers, "Retry-After": str(retry_after)},
+        )
+    return result
+
+
+async def request_quota(request: Request):
+    """Router-level dependency: one unit of the per-tier request budget."""
+    await spend(request, "requests", 1)
+
+
+def compute_quota(cost: float):
+    """Route-level dependency for routes that spend LLM tokens or upstream API calls."""
+    async def dependency(request: Request):
+        await spend(request, "compute", cost)
+    return dependency
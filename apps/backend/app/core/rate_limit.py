@@ -1,16 +1,119 @@
-from fastapi import HTTPException, Request
-import time
-from collections import defaultdict
+"""
+Inbound rate limiting (GCRA — generic cell rate algorithm).
+
+    result = await rate_limiter.hit("user:abc:search", limit=60, period=60, cost=1)
+    if not result.allowed:
+        raise HTTPException(429, headers={"Retry-After": str(math.ceil(result.retry_after))})
+
+Each key stores a single "theoretical arrival time" (TAT). A request of
+`cost` units advances the TAT by cost × period/limit and is admitted while
+the TAT stays within one period of now — so `limit` units may be spent in a
+burst and then refill smoothly, with no fixed-window edge effects. The Redis
+path is one atomic Lua call (Redis server time, TTL set in the same call);
+without Redis the same algorithm runs on an in-process dict of TATs.
+
+Both paths work in whole milliseconds: the emission interval is period/limit
+rounded up and the burst tolerance is exactly `limit` intervals, so
+`remaining` is plain integer division and never loses a unit to rounding.
+"""
 import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+from fastapi import HTTPException, Request
 
 from app.core.cache import cache
+from app.core.logger import get_logger
+from app.core.security import verify_token
+
+logger = get_logger("rate_limit")
+
+# KEYS[1] TAT key; ARGV (integer ms): emission interval, burst tolerance, increment
+# Returns {allowed (0/1), remaining units, retry_after ms, reset_after ms}
+_GCRA_LUA = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local increment = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + increment
+local allow_at = new_tat - period
+if allow_at > now then
+    local remaining = math.floor((period - (tat - now)) / interval)
+    return {0, remaining, allow_at - now, tat - now}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.max(1, new_tat - now))
+local remaining = math.floor((period - (new_tat - now)) / interval)
+return {1, remaining, 0, new_tat - now}
+"""
+
+
+def _gcra_params(limit: int, period: float, cost: float):
+    """(emission interval, burst tolerance, increment) in whole milliseconds."""
+    interval = max(1, math.ceil(period * 1000 / limit))
+    return interval, interval * limit, max(1, round(cost * interval))
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float   # seconds until the request would be admitted (0 if allowed)
+    reset_after: float   # seconds until the full budget is available again
 
 
 class RateLimiter:
     def __init__(self):
-        self.requests = defaultdict(list)
+        # In-memory fallback: key → theoretical arrival time (monotonic ms)
+        self._tats: Dict[str, int] = {}
         self.cleanup_task = None
-    
+        self._script = None
+        self._script_redis = None
+
+    def _get_script(self):
+        if self._script is None or self._script_redis is not cache.redis:
+            self._script = cache.redis.register_script(_GCRA_LUA)
+            self._script_redis = cache.redis
+        return self._script
+
+    def _hit_local(self, key: str, limit: int, period: float, cost: float) -> RateLimitResult:
+        interval, period, increment = _gcra_params(limit, period, cost)
+        now = time.monotonic_ns() // 1_000_000
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + increment
+        allow_at = new_tat - period
+        if allow_at > now:
+            remaining = (period - (tat - now)) // interval
+            return RateLimitResult(False, limit, max(remaining, 0), (allow_at - now) / 1000, (tat - now) / 1000)
+        self._tats[key] = new_tat
+        remaining = (period - (new_tat - now)) // interval
+        return RateLimitResult(True, limit, max(remaining, 0), 0.0, (new_tat - now) / 1000)
+
+    async def hit(self, key: str, limit: int, period: float, cost: float = 1) -> RateLimitResult:
+        """Spend `cost` units of a `limit`-per-`period` budget; nothing is spent if denied."""
+        if cache.redis:
+            try:
+                allowed, remaining, retry_ms, reset_ms = await self._get_script()(
+                    keys=[f"ratelimit:{key}"],
+                    args=list(_gcra_params(limit, period, cost)),
+                )
+                return RateLimitResult(
+                    bool(allowed), limit, max(int(remaining), 0), retry_ms / 1000, reset_ms / 1000
+                )
+            except Exception as e:
+                logger.debug(f"Redis rate limiter unavailable, using local: {e}")
+        return self._hit_local(key, limit, period, cost)
+
     async def is_allowed(
         self,
         identifier: str,
@@ -18,49 +121,18 @@ class RateLimiter:
         window_seconds: int
     ) -> bool:
         """Check if request is allowed under rate limit"""
-        now = time.time()
-        
-        # Get from Redis if available
-        if cache.redis:
-            key = f"ratelimit:{identifier}"
-            count = await cache.redis.incr(key)
-            
-            if count == 1:
-                await cache.redis.expire(key, window_seconds)
-            
-            return count <= max_requests
-        
-        # Fallback to in-memory
-        request_times = self.requests[identifier]
-        cutoff = now - window_seconds
-        
-        # Remove old requests
-        self.requests[identifier] = [
-            req_time for req_time in request_times
-            if req_time > cutoff
-        ]
-        
-        # Check limit
-        if len(self.requests[identifier]) >= max_requests:
-            return False
-        
-        self.requests[identifier].append(now)
-        return True
-    
+        result = await self.hit(f"{identifier}:{max_requests}/{window_seconds}", max_requests, window_seconds)
+        return result.allowed
+
     async def cleanup_old_entries(self):
         """Periodic cleanup of old entries"""
         while True:
             await asyncio.sleep(3600)  # Clean every hour
-            now = time.time()
-            
-            keys_to_delete = []
-            for identifier, request_times in self.requests.items():
-                if not request_times or now - request_times[-1] > 86400:
-                    keys_to_delete.append(identifier)
-            
-            for key in keys_to_delete:
-                del self.requests[key]
-    
+            now = time.monotonic_ns() // 1_000_000
+            # A TAT in the past means the full budget is available again
+            for key in [k for k, tat in self._tats.items() if tat <= now]:
+                del self._tats[key]
+
     def start_cleanup(self):
         """Start cleanup task"""
         if not self.cleanup_task:
@@ -70,24 +142,46 @@ class RateLimiter:
 rate_limiter = RateLimiter()
 
 
+async def rate_limit_identity(request: Request) -> str:
+    """
+    Stable per-caller identifier: the verified user id for authenticated
+    requests, the client IP otherwise (including invalid tokens). A verified
+    user is kept on request.state, where get_current_user picks it up, so
+    the token is checked once per request.
+    """
+    cached = getattr(request.state, "rate_limit_identity", None)
+    if cached:
+        return cached
+
+    identifier = f"ip:{request.client.host if request.client else 'unknown'}"
+    user = getattr(request.state, "current_user", None)
+    auth_header = request.headers.get("Authorization")
+    if user is None and auth_header and auth_header.startswith("Bearer "):
+        try:
+            user = await verify_token(auth_header[7:])
+            request.state.current_user = user
+        except HTTPException:
+            pass
+    if user is not None:
+        identifier = f"user:{user['user_id']}"
+
+    request.state.rate_limit_identity = identifier
+    return identifier
+
+
 async def check_rate_limit(
     request: Request,
     max_requests: int = 60,
     window_seconds: int = 60
 ):
     """FastAPI dependency for rate limiting"""
-    # Get identifier (IP or user ID)
-    identifier = request.client.host
-    
-    # Check if user is authenticated
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        # Use user ID if authenticated (extract from token)
-        identifier = f"user:{auth_header[-10:]}"
-    
-    if not await rate_limiter.is_allowed(identifier, max_requests, window_seconds):
+    identifier = await rate_limit_identity(request)
+    result = await rate_limiter.hit(
+        f"{identifier}:{max_requests}/{window_seconds}", max_requests, window_seconds
+    )
+    if not result.allowed:
         raise HTTPException(
             status_code=429,
             detail="Too many requests. Please try again later.",
-            headers={"Retry-After": str(window_seconds)}
+            headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))}
         )
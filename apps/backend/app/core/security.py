@@ -1,11 +1,11 @@
-from fastapi import HTTPException, Security, status
+from fastapi import HTTPException, Request, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import httpx
 from jose import jwt, JWTError
 import time
 import traceback
 
 from app.core.config import settings
+from app.core.http_client import http_clients
 from app.core.logger import get_logger
 
 logger = get_logger("security")
@@ -26,26 +26,32 @@ async def get_jwks():
     if now < jwks_cache["expires"]:
         return jwks_cache["keys"]
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(CLERK_JWKS_URL)
-            if response.status_code == 200:
-                jwks_cache["keys"] = response.json().get("keys", [])
-                jwks_cache["expires"] = now + 3600 # Cache for 1 hour
-                return jwks_cache["keys"]
-        except Exception as e:
-            logger.error(f"Error fetching JWKS: {e}")
+    try:
+        response = await http_clients.get(CLERK_JWKS_URL).get(CLERK_JWKS_URL)
+        if response.status_code == 200:
+            jwks_cache["keys"] = response.json().get("keys", [])
+            jwks_cache["expires"] = now + 3600 # Cache for 1 hour
+            return jwks_cache["keys"]
+    except Exception as e:
+        logger.error(f"Error fetching JWKS: {e}")
     return []
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+    # The request quota dependency may already have verified this token
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing authentication credentials",
         )
-    
-    token = credentials.credentials
-    
+    user = await verify_token(credentials.credentials)
+    request.state.current_user = user
+    return user
+
+
+async def verify_token(token: str) -> dict:
     # Verify Clerk JWT
     jwks = await get_jwks()
     try:
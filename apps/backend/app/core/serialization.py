@@ -0,0 +1,133 @@
+"""
+Cache value serializers.
+
+    codec = get_codec()                 # from CACHE_SERIALIZER / CACHE_COMPRESSION
+    payload = codec.dumps([p.model_dump() for p in papers])
+    papers = codec.loads(payload)
+
+Payloads other than plain JSON carry a 3-byte header (0x00, serializer code,
+compression code) so entries written with one setting stay readable after the
+setting changes, and plain-JSON entries written before this module existed
+are still decoded. orjson, msgpack and zstandard are optional: a configured
+but missing package falls back to stdlib JSON / no compression with a warning.
+"""
+import json
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("serialization")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_MAGIC = b"\x00"
+_NO_COMPRESSION = b"-"
+_ZSTD = b"z"
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode()
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+# name → (header code, dumps, loads, available)
+_SERIALIZERS: Dict[str, tuple] = {
+    "json": (b"j", _json_dumps, json.loads, True),
+    "orjson": (b"o", _orjson_dumps, orjson.loads if orjson else None, orjson is not None),
+    "msgpack": (b"m", _msgpack_dumps, _msgpack_loads, msgpack is not None),
+}
+_LOADERS: Dict[bytes, Callable[[bytes], Any]] = {
+    code: loads for code, _, loads, available in _SERIALIZERS.values() if available
+}
+
+
+def available_serializers() -> list:
+    return [name for name, (_, _, _, available) in _SERIALIZERS.items() if available]
+
+
+class Codec:
+    def __init__(self, serializer: str = "json", compression: Optional[str] = None, compress_min_bytes: int = 1024):
+        if serializer not in _SERIALIZERS:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        if not _SERIALIZERS[serializer][3]:
+            logger.warning(f"Cache serializer '{serializer}' is not installed — using json")
+            serializer = "json"
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed — cache compression disabled")
+            compression = None
+        elif compression not in (None, "zstd"):
+            raise ValueError(f"Unknown cache compression: {compression}")
+
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self._code, self._dumps, _, _ = _SERIALIZERS[serializer]
+        # zstd contexts are not thread-safe but the event loop is single-threaded
+        self._compressor = zstandard.ZstdCompressor(level=3) if compression else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    @property
+    def name(self) -> str:
+        return f"{self.serializer}+{self.compression}" if self.compression else self.serializer
+
+    def dumps(self, value: Any) -> bytes:
+        body = self._dumps(value)
+        compressed = self._compressor is not None and len(body) >= self.compress_min_bytes
+        if compressed:
+            body = self._compressor.compress(body)
+        elif self.serializer == "json":
+            # Plain JSON stays header-less so it is readable by anything
+            return body
+        return _MAGIC + self._code + (_ZSTD if compressed else _NO_COMPRESSION) + body
+
+    def loads(self, data: bytes) -> Any:
+        if not data.startswith(_MAGIC):
+            return json.loads(data)
+        code, compression, body = data[1:2], data[2:3], data[3:]
+        if compression == _ZSTD:
+            if self._decompressor is None:
+                raise ValueError("zstd-compressed cache entry but zstandard is not installed")
+            body = self._decompressor.decompress(body)
+        loads = _LOADERS.get(code)
+        if loads is None:
+            raise ValueError(f"Cache entry uses unavailable serializer {code!r}")
+        return loads(body)
+
+
+_codec: Optional[Codec] = None
+
+
+def get_codec() -> Codec:
+    global _codec
+    if _codec is None:
+        _codec = Codec(
+            settings.CACHE_SERIALIZER,
+            settings.CACHE_COMPRESSION,
+            settings.CACHE_COMPRESS_MIN_BYTES,
+        )
+    return _codec
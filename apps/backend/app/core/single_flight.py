@@ -0,0 +1,154 @@
+"""
+Single-flight request coalescing.
+
+    papers, shared = await single_flight.do(
+        cache_key,
+        lambda: fetch_from_upstream(),
+        load_cached=lambda: read_cache(cache_key),
+    )
+
+Concurrent callers with the same key share one execution of `fn`:
+
+* within a worker, followers await the leader's task (cancelling a follower
+  never cancels the shared fetch);
+* across workers, the leader holds a Redis lock `singleflight:{key}` and the
+  other workers poll `load_cached` until the leader's result lands in the
+  cache, falling back to running `fn` themselves if the lock disappears
+  without a cached result or they wait longer than SINGLE_FLIGHT_WAIT_SECONDS.
+
+Without Redis only the in-process half applies.
+"""
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("single_flight")
+
+T = TypeVar("T")
+
+# Delete the lock only if we still own it
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _consume_result(task: asyncio.Task):
+    # Mark failures as retrieved when every follower has gone away
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    def __init__(self, namespace: str = "singleflight"):
+        self.namespace = namespace
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._release_script = None
+        self._release_redis = None
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _acquire(self, key: str, token: str) -> bool:
+        """True if this worker leads `key` (always True without Redis)."""
+        if not cache.redis:
+            return True
+        try:
+            return bool(await cache.redis.set(
+                self._lock_key(key), token, nx=True,
+                px=int(settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS * 1000),
+            ))
+        except Exception as e:
+            logger.debug(f"Single-flight lock unavailable for {key}: {e}")
+            return True
+
+    async def _release(self, key: str, token: str):
+        if not cache.redis:
+            return
+        try:
+            if self._release_script is None or self._release_redis is not cache.redis:
+                self._release_script = cache.redis.register_script(_RELEASE_LUA)
+                self._release_redis = cache.redis
+            await self._release_script(keys=[self._lock_key(key)], args=[token])
+        except Exception as e:
+            logger.debug(f"Single-flight lock release failed for {key}: {e}")
+
+    async def _lock_held(self, key: str) -> bool:
+        try:
+            return bool(await cache.redis.exists(self._lock_key(key)))
+        except Exception:
+            return False
+
+    async def _await_remote(
+        self, key: str, load_cached: Callable[[], Awaitable[Optional[T]]]
+    ) -> Optional[T]:
+        """Poll for another worker's result; None means we should fetch ourselves."""
+        give_up_at = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+        while time.monotonic() < give_up_at:
+            await asyncio.sleep(settings.SINGLE_FLIGHT_POLL_SECONDS)
+            value = await load_cached()
+            if value is not None:
+                return value
+            if not await self._lock_held(key):
+                # Leader finished (or died) without caching anything
+                return await load_cached()
+        logger.debug(f"Gave up waiting for remote single-flight leader of {key}")
+        return None
+
+    async def _lead(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        load_cached: Optional[Callable[[], Awaitable[Optional[T]]]],
+    ) -> Tuple[T, bool]:
+        token = uuid.uuid4().hex
+        if load_cached is None or await self._acquire(key, token):
+            try:
+                return await fn(), False
+            finally:
+                if load_cached is not None:
+                    await self._release(key, token)
+
+        value = await self._await_remote(key, load_cached)
+        if value is not None:
+            return value, True
+        return await fn(), False
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        load_cached: Optional[Callable[[], Awaitable[Optional[T]]]] = None,
+    ) -> Tuple[T, bool]:
+        """
+        Run `fn` once per key across concurrent callers. Returns (value, shared),
+        where shared is True when the value came from another caller's execution.
+        Pass `load_cached` (returning None on a miss) to coalesce across workers.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            value, _ = await asyncio.shield(task)
+            return value, True
+
+        def _forget(done: asyncio.Task):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task = asyncio.ensure_future(self._lead(key, fn, load_cached))
+        self._inflight[key] = task
+        task.add_done_callback(_forget)
+        task.add_done_callback(_consume_result)
+        return await asyncio.shield(task)
+
+
+single_flight = SingleFlight()
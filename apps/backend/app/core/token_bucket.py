@@ -0,0 +1,122 @@
+"""
+Outbound token-bucket pacing for upstream APIs.
+
+    bucket = TokenBucket("pubmed", rate=3, capacity=3, identity=settings.PUBMED_API_KEY)
+    await bucket.acquire(tokens=2)     # sleeps until 2 requests may go out
+
+Buckets are shared across workers through Redis (one atomic Lua call per
+acquire, using Redis server time so worker clocks don't matter) and fall back
+to per-process state when Redis is unavailable. Tokens are *reserved*: a caller
+that has to wait takes its tokens immediately (the balance goes negative) and
+sleeps, so concurrent callers queue up behind each other instead of stampeding
+when the bucket refills.
+"""
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.cache import cache
+from app.core.logger import get_logger
+
+logger = get_logger("token_bucket")
+
+# KEYS[1] bucket key; ARGV: rate (tokens/s), capacity, tokens requested, max wait (ms, -1 = unbounded)
+# Returns the wait in ms before the reserved tokens may be used, or -wait if
+# that exceeds max wait (nothing is reserved in that case).
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) / 1000 * rate)
+
+local wait = 0
+if tokens < requested then
+    wait = math.ceil((requested - tokens) / rate * 1000)
+    if max_wait >= 0 and wait > max_wait then
+        return -wait
+    end
+end
+
+tokens = tokens - requested
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + wait + 1000)
+return wait
+"""
+
+# In-process fallback state: key → (tokens, updated_at)
+_local_buckets: Dict[str, Tuple[float, float]] = {}
+_script = None
+_script_redis = None
+
+
+class UpstreamRateLimited(Exception):
+    """Raised when pacing a request would take longer than the caller allows."""
+
+    def __init__(self, name: str, wait: float):
+        super().__init__(f"{name} outbound rate limit: next slot in {wait:.2f}s")
+        self.name = name
+        self.wait = wait
+
+
+def _get_script():
+    global _script, _script_redis
+    if _script is None or _script_redis is not cache.redis:
+        _script = cache.redis.register_script(_TOKEN_BUCKET_LUA)
+        _script_redis = cache.redis
+    return _script
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, capacity: float, identity: Optional[str] = None):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        # Separate buckets per API key — limits are enforced per key upstream
+        suffix = hashlib.sha1(identity.encode()).hexdigest()[:12] if identity else "anon"
+        self.key = f"tokenbucket:{name}:{suffix}"
+
+    def _reserve_local(self, tokens: float, max_wait_ms: float) -> float:
+        now = time.monotonic() * 1000
+        balance, updated = _local_buckets.get(self.key, (self.capacity, now))
+        balance = min(self.capacity, balance + (now - updated) / 1000 * self.rate)
+
+        wait = 0.0
+        if balance < tokens:
+            wait = math.ceil((tokens - balance) / self.rate * 1000)
+            if max_wait_ms >= 0 and wait > max_wait_ms:
+                return -wait
+        _local_buckets[self.key] = (balance - tokens, now)
+        return wait
+
+    async def _reserve(self, tokens: float, max_wait_ms: float) -> float:
+        if cache.redis:
+            try:
+                return float(await _get_script()(
+                    keys=[self.key],
+                    args=[self.rate, self.capacity, tokens, max_wait_ms],
+                ))
+            except Exception as e:
+                logger.debug(f"Redis token bucket unavailable for {self.name}, using local: {e}")
+        return self._reserve_local(tokens, max_wait_ms)
+
+    async def acquire(self, tokens: float = 1, max_wait: Optional[float] = None) -> float:
+        """
+        Wait until `tokens` requests may be sent. Returns the seconds waited.
+        Raises UpstreamRateLimited (without consuming tokens) if the wait would exceed `max_wait`.
+        """
+        max_wait_ms = -1 if max_wait is None else max_wait * 1000
+        wait_ms = await self._reserve(tokens, max_wait_ms)
+        if wait_ms < 0:
+            raise UpstreamRateLimited(self.name, -wait_ms / 1000)
+        if wait_ms > 0:
+            await asyncio.sleep(wait_ms / 1000)
+        return wait_ms / 1000
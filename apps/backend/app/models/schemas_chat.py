@@ -9,7 +9,9 @@ class ChatResearchRequest(BaseModel):
     query: str
     history: List[ChatMessage] = []
     source_ids: List[str] = [] # User selected paper IDs from library
-    uploaded_text: Optional[str] = None # Text extracted from uploaded files
+    document_ids: List[str] = [] # Uploaded document IDs (CID) — relevant chunks are retrieved server-side
+    project_id: Optional[int] = None # Also match documents shared with this project (membership required)
+    uploaded_text: Optional[str] = None # Raw extracted text; only used when no document_ids are given
     provider: Optional[str] = None
     model: Optional[str] = None
 
@@ -0,0 +1,58 @@
+"""
+Token-aware, overlapping text chunking for document indexing.
+
+    chunks = chunk_text(text, tokenizer=model.tokenizer, max_tokens=200, overlap=40)
+
+With a Hugging Face fast tokenizer, windows are measured in the embedding
+model's own word-pieces (via offset mappings), so no chunk is silently
+truncated at the model's max sequence length. Without one, whitespace-
+separated words stand in for tokens. Each window starts `max_tokens -
+overlap` tokens after the previous one, so a sentence cut at a boundary is
+seen whole by at least one chunk.
+"""
+import re
+from typing import Any, List, Optional, Tuple
+
+_WORD = re.compile(r"\S+")
+
+
+def _token_spans(text: str, tokenizer: Optional[Any]) -> List[Tuple[int, int]]:
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(
+                text,
+                add_special_tokens=False,
+                return_offsets_mapping=True,
+                truncation=False,
+                verbose=False,
+            )
+            return [tuple(span) for span in encoded["offset_mapping"]]
+        except Exception:
+            # Slow tokenizers don't provide offsets; fall back to words
+            pass
+    return [m.span() for m in _WORD.finditer(text)]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = 200,
+    overlap: int = 40,
+    tokenizer: Optional[Any] = None,
+) -> List[str]:
+    if overlap >= max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+    text = re.sub(r"[ \t]+", " ", text).strip()
+    spans = _token_spans(text, tokenizer)
+    if not spans:
+        return []
+
+    chunks = []
+    step = max_tokens - overlap
+    for start in range(0, len(spans), step):
+        window = spans[start:start + max_tokens]
+        chunk = text[window[0][0]:window[-1][1]].strip()
+        if chunk:
+            chunks.append(chunk)
+        if start + max_tokens >= len(spans):
+            break
+    return chunks
@@ -2,6 +2,7 @@ import asyncio
 from typing import List, Optional
 from datetime import datetime
 from app.services.openalex_service import get_openalex_service, get_semantic_scholar_service
+from app.services.providers import prefetch_searches
 from app.models.schemas import PaperBase, UserDiscoveryResponse
 from app.models.database import User, SearchHistory
 from app.core.logger import get_logger
@@ -128,36 +129,32 @@ class DiscoveryService:
         except Exception as e:
             logger.error(f"Failed to fetch search history for user {user_id}: {e}")
 
-        # Build parallel search tasks
-        tasks = []
+        # Build parallel searches: (provider, query, search kwargs)
+        calls = []
 
         # Query 1: OpenAlex — career field + primary expertise
         if career_field and expertise_areas:
             q1 = f"{career_field} {expertise_areas[0]}"
-            tasks.append(self.openalex.search_papers(query=q1, limit=per_query_limit))
+            calls.append((self.openalex, q1, {"limit": per_query_limit}))
         elif career_field:
-            tasks.append(self.openalex.search_papers(query=career_field, limit=per_query_limit))
+            calls.append((self.openalex, career_field, {"limit": per_query_limit}))
 
         # Query 2: OpenAlex — secondary expertise areas
         if len(expertise_areas) > 1:
             q2 = " ".join(expertise_areas[1:4])
-            tasks.append(self.openalex.search_papers(query=q2, limit=per_query_limit))
+            calls.append((self.openalex, q2, {"limit": per_query_limit}))
 
         # Query 3: Semantic Scholar — career field (complementary source, strong CS/AI coverage)
         s2_query = f"{career_field or ''} {expertise_areas[0] if expertise_areas else ''}".strip()
         if s2_query:
-            tasks.append(self.s2.search_papers(query=s2_query, limit=per_query_limit))
+            calls.append((self.s2, s2_query, {"limit": per_query_limit}))
 
         # Query 4: recent search history keywords
         if recent_queries:
             q3 = " ".join(recent_queries[:3])
-            tasks.append(self.openalex.search_papers(
-                query=q3,
-                limit=per_query_limit,
-                sort="publication_date:desc"
-            ))
+            calls.append((self.openalex, q3, {"limit": per_query_limit, "sort": "publication_date:desc"}))
 
-        if not tasks:
+        if not calls:
             # Fallback: no profile data, return general recent research
             return await self.openalex.search_papers(
                 query="research",
@@ -165,7 +162,8 @@ class DiscoveryService:
                 sort="publication_date:desc"
             )
 
-        # Run all searches concurrently
+        # One cache round trip for every sub-query, then run the misses concurrently
+        tasks = await prefetch_searches(calls)
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # Merge and deduplicate
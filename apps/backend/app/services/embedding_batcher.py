@@ -0,0 +1,89 @@
+"""
+Dynamic micro-batching for embedding requests.
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=32, max_wait_ms=5)
+    vectors = await batcher.submit(["a query"])     # (1, dim) array
+
+Concurrent callers that each embed a few texts (similarity search, RAG
+retrieval, saving a query) are queued for at most `max_wait_ms`, or until
+`max_batch_size` texts are waiting, then encoded together in one forward
+pass; each caller gets back exactly the rows for its own texts. A failed
+batch fails every request in it. Requests that are already large enough to
+fill a batch should bypass the batcher and call the encoder directly.
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.logger import get_logger
+
+logger = get_logger("embedding_batcher")
+
+Encoder = Callable[[List[str]], Awaitable[np.ndarray]]
+
+
+class EmbeddingBatcher:
+    def __init__(self, encode: Encoder, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: List[Tuple[List[str], asyncio.Future]] = []
+        self._queued_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((texts, future))
+        self._queued_texts += len(texts)
+        self.requests += 1
+
+        if self._queued_texts >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, size = [], 0
+        while self._queue and (not batch or size + len(self._queue[0][0]) <= self.max_batch_size):
+            texts, future = self._queue.pop(0)
+            batch.append((texts, future))
+            size += len(texts)
+        self._queued_texts -= size
+
+        if self._queue:
+            # Whatever didn't fit starts a new window rather than waiting for the next submit
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[List[str], asyncio.Future]]):
+        live = [(texts, future) for texts, future in batch if not future.done()]
+        if not live:
+            return
+        self.batches += 1
+        try:
+            vectors = await self.encode([text for texts, _ in live for text in texts])
+        except Exception as e:
+            logger.warning(f"Embedding batch of {len(live)} requests failed: {e}")
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for texts, future in live:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(texts)])
+            offset += len(texts)
@@ -0,0 +1,116 @@
+"""
+Hybrid sparse + dense ranking for RAG context.
+
+Papers in the corpus carry two vectors: the dense embedding and a sparse
+BM25 vector of their title + abstract (bm25_document_vector). Qdrant applies
+each term's IDF over the whole collection at query time (Modifier.IDF), so a
+sparse query with bm25_query_vector returns the corpus' best keyword matches
+by Okapi BM25. VectorStore.retrieve_rag_context takes the top candidates
+from both searches, then:
+
+    fused = reciprocal_rank_fusion([dense_ids_in_order, bm25_ids_in_order])
+    chosen = mmr(candidate_ids, fused, vectors, k=5)
+
+Exact-term matches such as gene names, drug names and acronyms rank through
+BM25 even when the embedding model smooths them away, and MMR stops
+near-duplicate abstracts from taking several context slots.
+"""
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[\w][\w\-]*")
+
+# Typical title + abstract length in terms, for BM25 length normalisation
+AVG_DOCUMENT_TERMS = 120
+
+SparseVector = Tuple[List[int], List[float]]  # (indices, values)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were which with what how why does do can we our their these those into "
+    "between among about than there".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased terms without stopwords. Hyphenated terms (IL-6, COVID-19) are
+    kept whole and also split, so "IL-6" matches both "IL-6" and "IL 6".
+    """
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        terms.append(token)
+        if "-" in token:
+            terms.extend(part for part in token.split("-") if part and part not in _STOPWORDS)
+    return terms
+
+
+def term_index(term: str) -> int:
+    """Sparse dimension of a term. Hash collisions merge the weights of two terms."""
+    return zlib.crc32(term.encode())
+
+
+def bm25_document_vector(
+    text: str,
+    k1: float = 1.5,
+    b: float = 0.75,
+    avg_len: float = AVG_DOCUMENT_TERMS,
+) -> SparseVector:
+    """
+    Term-frequency half of Okapi BM25 per term of `text`:
+    tf·(k1+1) / (tf + k1·(1−b+b·len/avg_len)). Its dot product with
+    bm25_query_vector, once Qdrant weights each term by IDF, is the BM25 score.
+    """
+    terms = tokenize(text)
+    counts = Counter(term_index(term) for term in terms)
+    norm = k1 * (1 - b + b * len(terms) / avg_len)
+    indices = sorted(counts)
+    return indices, [counts[i] * (k1 + 1) / (counts[i] + norm) for i in indices]
+
+
+def bm25_query_vector(query: str) -> SparseVector:
+    """Each distinct query term with weight 1."""
+    indices = sorted({term_index(term) for term in tokenize(query)})
+    return indices, [1.0] * len(indices)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60) -> Dict[Hashable, float]:
+    """Σ 1/(k + rank) over the rankings each id appears in (rank starts at 1)."""
+    fused: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+def mmr(
+    candidates: Sequence[Hashable],
+    relevance: Dict[Hashable, float],
+    vectors: Dict[Hashable, np.ndarray],
+    k: int,
+    lambda_: float = 0.7,
+) -> List[Hashable]:
+    """
+    Maximal marginal relevance: repeatedly pick the candidate maximising
+    λ·relevance − (1−λ)·max cosine similarity to what's already picked.
+    Relevance is rescaled to [0, 1]; vectors are assumed L2-normalized.
+    """
+    if not candidates:
+        return []
+    top = max(relevance[c] for c in candidates) or 1.0
+    remaining = list(candidates)
+    chosen: List[Hashable] = []
+    while remaining and len(chosen) < k:
+        def score(c):
+            redundancy = max((float(vectors[c] @ vectors[s]) for s in chosen), default=0.0)
+            return lambda_ * relevance[c] / top - (1 - lambda_) * redundancy
+        best = max(remaining, key=score)
+        chosen.append(best)
+        remaining.remove(best)
+    return chosen
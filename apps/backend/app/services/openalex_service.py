@@ -1,28 +1,34 @@
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
 
 from app.core.config import settings
 from app.models.schemas import PaperBase
 from app.core.logger import get_logger
-from app.core.cache import cache
+from app.core.deadline import hedged
+from app.services.providers import BaseProvider, provider_registry
 
 logger = get_logger("openalex")
 
-class OpenAlexService:
+class OpenAlexService(BaseProvider):
+    name = "openalex"
+    cache_prefix = "openalex"
+    primary = True
+    swallow_errors = False
+    rate_limit = (10.0, 10.0)  # polite pool: 10 req/s
+    logger = logger
+
     def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        super().__init__(client)
         self.base_url = settings.OPENALEX_API_URL
         self.email = settings.OPENALEX_EMAIL
         self.api_key = settings.OPENALEX_API_KEY
-        self.timeout = 15.0
-        self._client = client
-    
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            # Fallback if no shared client is provided (mostly for tests or CLI)
-            return httpx.AsyncClient(timeout=self.timeout)
-        return self._client
+
+    def rate_limit_identity(self) -> Optional[str]:
+        return self.api_key or self.email
+
+    def upstream_url(self) -> Optional[str]:
+        return self.base_url
 
     def _reconstruct_abstract(self, inverted_index: Dict[str, List[int]]) -> Optional[str]:
         if not inverted_index:
@@ -83,13 +89,34 @@ class OpenAlexService:
         filters: Optional[Dict[str, Any]] = None,
         sort: Optional[str] = None
     ) -> List[PaperBase]:
-        # Try to get from cache
-        cache_key = cache.make_key("openalex:search", query, limit, filters=filters, sort=sort)
-        cached_results = await cache.get(cache_key)
-        if cached_results:
-            logger.info(f"OpenAlex cache hit for '{query}'")
-            return [PaperBase(**p) for p in cached_results]
+        return await super().search_papers(query, limit, filters=filters, sort=sort)
+
+    def search_cache_key(
+        self,
+        query: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: Optional[str] = None
+    ) -> str:
+        return self.cache_key(query, limit, filters=filters, sort=sort)
+
+    async def search_prefetched(
+        self,
+        entry: Tuple[Any, bool],
+        query: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: Optional[str] = None
+    ) -> List[PaperBase]:
+        return await super().search_prefetched(entry, query, limit, filters=filters, sort=sort)
 
+    async def _fetch(
+        self,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: Optional[str] = None
+    ) -> List[PaperBase]:
         params = {
             "search": query,
             "per_page": min(limit, settings.MAX_PAPERS_PER_QUERY),
@@ -120,28 +147,24 @@ class OpenAlexService:
         if filter_parts:
             params["filter"] = ",".join(filter_parts)
 
-        try:
+        async def attempt() -> httpx.Response:
             response = await self.client.get(f"{self.base_url}/works", params=params)
+            # Raise inside the attempt so a fast 429/5xx loses to a slower 200
             response.raise_for_status()
-            data = response.json()
-
-            papers = []
-            for work in data.get('results', []):
-                # Use minimal parser to avoid dropping papers without abstracts
-                paper = self._parse_work_minimal(work)
-                if paper:
-                    papers.append(paper)
-
-            logger.info(f"OpenAlex search for '{query}' returned {len(papers)} papers")
-
-            # Save to cache (TTL: 1 hour)
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
+            return response
+
+        # Hedged: a second identical request is fired if the first is slower than ~p95,
+        # but only when the outbound bucket has a slot free for it
+        response = await hedged(
+            attempt,
+            hedge_after=settings.OPENALEX_HEDGE_AFTER_SECONDS,
+            name=f"openalex:{query}",
+            may_hedge=self._pace_now,
+        )
+        data = response.json()
 
-            return papers
-        except Exception as e:
-            logger.error(f"OpenAlex search failed: {str(e)}")
-            raise
+        # Use minimal parser to avoid dropping papers without abstracts
+        return [p for work in data.get('results', []) if (p := self._parse_work_minimal(work))]
 
     async def get_paper_details(self, paper_id: str) -> Optional[Dict[str, Any]]:
         params = {"mailto": self.email}
@@ -312,7 +335,7 @@ def get_openalex_service(client: Optional[httpx.AsyncClient] = None) -> OpenAlex
 
 s2_logger = get_logger("semantic_scholar")
 
-class SemanticScholarService:
+class SemanticScholarService(BaseProvider):
     """
     Free-tier Semantic Scholar Academic Graph API.
     No API key required for basic usage (100 req/5 min).
@@ -321,14 +344,13 @@ class SemanticScholarService:
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
     FIELDS = "paperId,title,year,citationCount,abstract,authors"
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "s2"
+    cache_prefix = "s2"
+    rate_limit = (100 / 300, 5.0)  # 100 req / 5 min shared free tier
+    logger = s2_logger
 
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=15.0)
-        return self._client
+    def upstream_url(self) -> Optional[str]:
+        return self.BASE_URL
 
     def _parse_s2_paper(self, paper: Dict[str, Any]) -> Optional[PaperBase]:
         """Convert a Semantic Scholar paper dict to PaperBase."""
@@ -350,40 +372,23 @@ class SemanticScholarService:
             authors=authors,
         )
 
-    async def search_papers(
-        self,
-        query: str,
-        limit: int = 10,
-    ) -> List[PaperBase]:
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
         """Search Semantic Scholar for papers matching query."""
-        cache_key = f"s2:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
-
         params = {
             "query": query,
             "limit": min(limit, 50),
             "fields": self.FIELDS,
         }
-        try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/paper/search",
-                params=params,
-            )
-            response.raise_for_status()
-            data = response.json()
-            papers = [
-                p for item in data.get("data", [])
-                if (p := self._parse_s2_paper(item))
-            ]
-            s2_logger.info(f"Semantic Scholar '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            s2_logger.warning(f"Semantic Scholar search failed for '{query}': {e}")
-            return []
+        response = await self.client.get(
+            f"{self.BASE_URL}/paper/search",
+            params=params,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return [
+            p for item in data.get("data", [])
+            if (p := self._parse_s2_paper(item))
+        ]
 
 
 _s2_singleton: Optional[SemanticScholarService] = None
@@ -401,7 +406,7 @@ def get_semantic_scholar_service(client: Optional[httpx.AsyncClient] = None) ->
 
 arxiv_logger = get_logger("arxiv")
 
-class ArxivService:
+class ArxivService(BaseProvider):
     """
     arXiv API client using the public Atom feed endpoint.
     No API key required. Best for CS, Physics, Math, and quantitative biology.
@@ -409,14 +414,13 @@ class ArxivService:
     """
     SEARCH_URL = "https://export.arxiv.org/api/query"
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "arxiv"
+    cache_prefix = "arxiv"
+    rate_limit = (1 / 3, 1.0)
+    logger = arxiv_logger
 
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=15.0)
-        return self._client
+    def upstream_url(self) -> Optional[str]:
+        return self.SEARCH_URL
 
     def _parse_atom_entry(self, entry: Dict[str, Any]) -> Optional[PaperBase]:
         """Parse a single Atom feed <entry> element (already converted to dict)."""
@@ -446,13 +450,8 @@ class ArxivService:
             authors=authors,
         )
 
-    async def search_papers(self, query: str, limit: int = 10) -> List[PaperBase]:
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
         """Search arXiv using the public query API."""
-        cache_key = f"arxiv:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
-
         params = {
             "search_query": f"all:{query}",
             "start": 0,
@@ -460,39 +459,31 @@ class ArxivService:
             "sortBy": "relevance",
             "sortOrder": "descending",
         }
-        try:
-            response = await self.client.get(self.SEARCH_URL, params=params)
-            response.raise_for_status()
+        response = await self.client.get(self.SEARCH_URL, params=params)
+        response.raise_for_status()
 
-            import xml.etree.ElementTree as ET
-            ns = {
-                "atom": "http://www.w3.org/2005/Atom",
-                "arxiv": "http://arxiv.org/schemas/atom",
+        import xml.etree.ElementTree as ET
+        ns = {
+            "atom": "http://www.w3.org/2005/Atom",
+            "arxiv": "http://arxiv.org/schemas/atom",
+        }
+        root = ET.fromstring(response.text)
+        papers: List[PaperBase] = []
+        for entry_el in root.findall("atom:entry", ns):
+            entry: Dict[str, Any] = {
+                "id": (entry_el.find("atom:id", ns) or {}).text or "",
+                "title": (entry_el.find("atom:title", ns) or {}).text or "",
+                "summary": (entry_el.find("atom:summary", ns) or {}).text or "",
+                "published": (entry_el.find("atom:published", ns) or {}).text or "",
+                "authors": [
+                    {"name": (a.find("atom:name", ns) or {}).text or ""}
+                    for a in entry_el.findall("atom:author", ns)
+                ],
             }
-            root = ET.fromstring(response.text)
-            papers: List[PaperBase] = []
-            for entry_el in root.findall("atom:entry", ns):
-                entry: Dict[str, Any] = {
-                    "id": (entry_el.find("atom:id", ns) or {}).text or "",
-                    "title": (entry_el.find("atom:title", ns) or {}).text or "",
-                    "summary": (entry_el.find("atom:summary", ns) or {}).text or "",
-                    "published": (entry_el.find("atom:published", ns) or {}).text or "",
-                    "authors": [
-                        {"name": (a.find("atom:name", ns) or {}).text or ""}
-                        for a in entry_el.findall("atom:author", ns)
-                    ],
-                }
-                paper = self._parse_atom_entry(entry)
-                if paper:
-                    papers.append(paper)
-
-            arxiv_logger.info(f"arXiv '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            arxiv_logger.warning(f"arXiv search failed for '{query}': {e}")
-            return []
+            paper = self._parse_atom_entry(entry)
+            if paper:
+                papers.append(paper)
+        return papers
 
 
 _arxiv_singleton: Optional[ArxivService] = None
@@ -510,7 +501,7 @@ def get_arxiv_service(client: Optional[httpx.AsyncClient] = None) -> ArxivServic
 
 core_logger = get_logger("core_api")
 
-class COREService:
+class COREService(BaseProvider):
     """
     CORE Aggregator API v3 (https://core.ac.uk/services/api).
     Aggregates open-access papers from thousands of repositories worldwide,
@@ -519,14 +510,13 @@ class COREService:
     Rate limit: 10 req/min (free), 150 req/min (premium).
     """
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "core"
+    cache_prefix = "core"
+    rate_limit = (10 / 60, 2.0)
+    logger = core_logger
 
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=15.0)
-        return self._client
+    def upstream_url(self) -> Optional[str]:
+        return settings.CORE_API_URL
 
     def _parse_paper(self, item: Dict[str, Any]) -> Optional[PaperBase]:
         title = (item.get("title") or "").strip()
@@ -554,37 +544,26 @@ class COREService:
             authors=authors,
         )
 
-    async def search_papers(self, query: str, limit: int = 10) -> List[PaperBase]:
-        if not settings.CORE_API_KEY:
-            core_logger.warning("CORE_API_KEY not set — skipping CORE search")
-            return []
+    def is_configured(self) -> bool:
+        return bool(settings.CORE_API_KEY)
 
-        cache_key = f"core:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
+    def rate_limit_identity(self) -> Optional[str]:
+        return settings.CORE_API_KEY
 
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
         headers = {"Authorization": f"Bearer {settings.CORE_API_KEY}"}
         payload = {"q": query, "limit": min(limit, 25), "offset": 0}
-        try:
-            response = await self.client.post(
-                f"{settings.CORE_API_URL}/search/works",
-                json=payload,
-                headers=headers,
-            )
-            response.raise_for_status()
-            data = response.json()
-            papers = [
-                p for item in data.get("results", [])
-                if (p := self._parse_paper(item))
-            ]
-            core_logger.info(f"CORE '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            core_logger.warning(f"CORE search failed for '{query}': {e}")
-            return []
+        response = await self.client.post(
+            f"{settings.CORE_API_URL}/search/works",
+            json=payload,
+            headers=headers,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return [
+            p for item in data.get("results", [])
+            if (p := self._parse_paper(item))
+        ]
 
 
 _core_singleton: Optional[COREService] = None
@@ -602,7 +581,7 @@ def get_core_service(client: Optional[httpx.AsyncClient] = None) -> COREService:
 
 elsevier_logger = get_logger("elsevier")
 
-class ElsevierService:
+class ElsevierService(BaseProvider):
     """
     Elsevier Scopus Search API (https://dev.elsevier.com/documentation/ScopusSearchAPI.wadl).
     Requires a free Elsevier Developer API key from https://dev.elsevier.com.
@@ -610,14 +589,13 @@ class ElsevierService:
     Rate limit: 20,000 req/week (free institutional key).
     """
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "elsevier"
+    cache_prefix = "scopus"
+    rate_limit = (9.0, 9.0)  # Scopus Search throttles at 9 req/s per key
+    logger = elsevier_logger
 
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=15.0)
-        return self._client
+    def upstream_url(self) -> Optional[str]:
+        return settings.SCOPUS_API_URL
 
     def _parse_entry(self, entry: Dict[str, Any]) -> Optional[PaperBase]:
         title = (entry.get("dc:title") or "").strip()
@@ -649,16 +627,13 @@ class ElsevierService:
             authors=authors,
         )
 
-    async def search_papers(self, query: str, limit: int = 10) -> List[PaperBase]:
-        if not settings.ELSEVIER_API_KEY:
-            elsevier_logger.warning("ELSEVIER_API_KEY not set — skipping Scopus search")
-            return []
+    def is_configured(self) -> bool:
+        return bool(settings.ELSEVIER_API_KEY)
 
-        cache_key = f"scopus:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
+    def rate_limit_identity(self) -> Optional[str]:
+        return settings.ELSEVIER_API_KEY
 
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
         headers = {
             "X-ELS-APIKey": settings.ELSEVIER_API_KEY,
             "Accept": "application/json",
@@ -671,28 +646,20 @@ class ElsevierService:
             "count": min(limit, 25),
             "field": "dc:identifier,dc:title,dc:creator,dc:description,prism:coverDate,citedby-count",
         }
-        try:
-            response = await self.client.get(
-                settings.SCOPUS_API_URL,
-                params=params,
-                headers=headers,
-            )
-            response.raise_for_status()
-            data = response.json()
-            entries = (
-                data.get("search-results", {}).get("entry") or []
-            )
-            papers = [
-                p for entry in entries
-                if (p := self._parse_entry(entry))
-            ]
-            elsevier_logger.info(f"Scopus '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            elsevier_logger.warning(f"Scopus search failed for '{query}': {e}")
-            return []
+        response = await self.client.get(
+            settings.SCOPUS_API_URL,
+            params=params,
+            headers=headers,
+        )
+        response.raise_for_status()
+        data = response.json()
+        entries = (
+            data.get("search-results", {}).get("entry") or []
+        )
+        return [
+            p for entry in entries
+            if (p := self._parse_entry(entry))
+        ]
 
 
 _elsevier_singleton: Optional[ElsevierService] = None
@@ -710,7 +677,7 @@ def get_elsevier_service(client: Optional[httpx.AsyncClient] = None) -> Elsevier
 
 pubmed_logger = get_logger("pubmed")
 
-class PubMedService:
+class PubMedService(BaseProvider):
     """
     NCBI E-utilities API for PubMed (https://www.ncbi.nlm.nih.gov/home/develop/api/).
     No API key required for basic use (3 req/s); provide PUBMED_API_KEY for 10 req/s.
@@ -719,14 +686,22 @@ class PubMedService:
     Two-step: esearch (get IDs) → efetch (get abstracts in XML).
     """
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "pubmed"
+    cache_prefix = "pubmed"
+    timeout = 20.0
+    requests_per_search = 2  # esearch + efetch
+    logger = pubmed_logger
+
+    def upstream_url(self) -> Optional[str]:
+        return settings.PUBMED_API_URL
 
     @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=20.0)
-        return self._client
+    def rate_limit(self):
+        rate = 10.0 if settings.PUBMED_API_KEY else 3.0
+        return (rate, rate)
+
+    def rate_limit_identity(self) -> Optional[str]:
+        return settings.PUBMED_API_KEY
 
     def _base_params(self) -> Dict[str, str]:
         params: Dict[str, str] = {"retmode": "json"}
@@ -818,24 +793,11 @@ class PubMedService:
                 continue
         return papers
 
-    async def search_papers(self, query: str, limit: int = 10) -> List[PaperBase]:
-        cache_key = f"pubmed:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
-
-        try:
-            pmids = await self._esearch(query, limit)
-            if not pmids:
-                return []
-            papers = await self._efetch(pmids)
-            pubmed_logger.info(f"PubMed '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            pubmed_logger.warning(f"PubMed search failed for '{query}': {e}")
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
+        pmids = await self._esearch(query, limit)
+        if not pmids:
             return []
+        return await self._efetch(pmids)
 
 
 _pubmed_singleton: Optional[PubMedService] = None
@@ -853,7 +815,7 @@ def get_pubmed_service(client: Optional[httpx.AsyncClient] = None) -> PubMedServ
 
 doaj_logger = get_logger("doaj")
 
-class DOAJService:
+class DOAJService(BaseProvider):
     """
     DOAJ Article Search API (https://doaj.org/api/docs).
     No API key required. Indexes thousands of open-access journals, including
@@ -861,14 +823,13 @@ class DOAJService:
     Rate limit: ~2 req/s (polite use).
     """
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "doaj"
+    cache_prefix = "doaj"
+    rate_limit = (2.0, 2.0)
+    logger = doaj_logger
 
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=15.0)
-        return self._client
+    def upstream_url(self) -> Optional[str]:
+        return settings.DOAJ_API_URL
 
     def _parse_result(self, result: Dict[str, Any]) -> Optional[PaperBase]:
         bibjson = result.get("bibjson") or {}
@@ -904,33 +865,20 @@ class DOAJService:
             authors=authors,
         )
 
-    async def search_papers(self, query: str, limit: int = 10) -> List[PaperBase]:
-        cache_key = f"doaj:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
-
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
         params = {
             "q": query,
             "pageSize": min(limit, 25),
             "page": 1,
             "sort": "relevance",
         }
-        try:
-            response = await self.client.get(settings.DOAJ_API_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            papers = [
-                p for result in data.get("results", [])
-                if (p := self._parse_result(result))
-            ]
-            doaj_logger.info(f"DOAJ '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            doaj_logger.warning(f"DOAJ search failed for '{query}': {e}")
-            return []
+        response = await self.client.get(settings.DOAJ_API_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+        return [
+            p for result in data.get("results", [])
+            if (p := self._parse_result(result))
+        ]
 
 
 _doaj_singleton: Optional[DOAJService] = None
@@ -948,7 +896,7 @@ def get_doaj_service(client: Optional[httpx.AsyncClient] = None) -> DOAJService:
 
 ajol_logger = get_logger("ajol")
 
-class AJOLService:
+class AJOLService(BaseProvider):
     """
     African Journals Online (https://www.ajol.info) via OAI-PMH 2.0 protocol.
     No API key required. The largest platform for African-published peer-reviewed
@@ -956,14 +904,14 @@ class AJOLService:
     OAI-PMH ListRecords endpoint is used; results are filtered by keyword match.
     """
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "ajol"
+    cache_prefix = "ajol"
+    rate_limit = (1.0, 2.0)
+    timeout = 20.0
+    logger = ajol_logger
 
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=20.0)
-        return self._client
+    def upstream_url(self) -> Optional[str]:
+        return settings.AJOL_OAI_URL
 
     def _parse_oai_record(self, record_el: Any, ns: Dict[str, str]) -> Optional[PaperBase]:
 
@@ -1012,17 +960,12 @@ class AJOLService:
             authors=authors,
         )
 
-    async def search_papers(self, query: str, limit: int = 10) -> List[PaperBase]:
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
         """
         AJOL does not support full-text search via OAI-PMH directly.
         We use ListRecords with a recent date range and filter by keyword in title/abstract.
         For precise topic search, this is best-effort.
         """
-        cache_key = f"ajol:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
-
         import xml.etree.ElementTree as ET
 
         ns = {
@@ -1035,31 +978,23 @@ class AJOLService:
             "metadataPrefix": "oai_dc",
             "from": "2020-01-01",  # Recent 5 years for relevance
         }
-        try:
-            response = await self.client.get(settings.AJOL_OAI_URL, params=params)
-            response.raise_for_status()
-            root = ET.fromstring(response.text)
-
-            query_lower = query.lower()
-            papers: List[PaperBase] = []
-            for record_el in root.findall(".//oai:record", ns):
-                paper = self._parse_oai_record(record_el, ns)
-                if paper is None:
-                    continue
-                # Keyword filter — match query terms against title + abstract
-                searchable = f"{paper.title} {paper.abstract}".lower()
-                if any(term in searchable for term in query_lower.split()):
-                    papers.append(paper)
-                    if len(papers) >= limit:
-                        break
+        response = await self.client.get(settings.AJOL_OAI_URL, params=params)
+        response.raise_for_status()
+        root = ET.fromstring(response.text)
 
-            ajol_logger.info(f"AJOL '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            ajol_logger.warning(f"AJOL search failed for '{query}': {e}")
-            return []
+        query_lower = query.lower()
+        papers: List[PaperBase] = []
+        for record_el in root.findall(".//oai:record", ns):
+            paper = self._parse_oai_record(record_el, ns)
+            if paper is None:
+                continue
+            # Keyword filter — match query terms against title + abstract
+            searchable = f"{paper.title} {paper.abstract}".lower()
+            if any(term in searchable for term in query_lower.split()):
+                papers.append(paper)
+                if len(papers) >= limit:
+                    break
+        return papers
 
 
 _ajol_singleton: Optional[AJOLService] = None
@@ -1077,7 +1012,7 @@ def get_ajol_service(client: Optional[httpx.AsyncClient] = None) -> AJOLService:
 
 africarxiv_logger = get_logger("africarxiv")
 
-class AfricArXivService:
+class AfricArXivService(BaseProvider):
     """
     AfricArXiv preprints via the DataCite REST API (https://api.datacite.org/dois).
     AfricArXiv is hosted on OSF and indexed by DataCite.
@@ -1086,14 +1021,13 @@ class AfricArXivService:
     Filter: client-id=osf.africarxiv
     """
 
-    def __init__(self, client: Optional[httpx.AsyncClient] = None):
-        self._client = client
+    name = "africarxiv"
+    cache_prefix = "africarxiv"
+    rate_limit = (5.0, 5.0)
+    logger = africarxiv_logger
 
-    @property
-    def client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            return httpx.AsyncClient(timeout=15.0)
-        return self._client
+    def upstream_url(self) -> Optional[str]:
+        return settings.AFRICARXIV_API_URL
 
     def _parse_doi(self, item: Dict[str, Any]) -> Optional[PaperBase]:
         attrs = item.get("attributes") or {}
@@ -1138,33 +1072,20 @@ class AfricArXivService:
             authors=authors,
         )
 
-    async def search_papers(self, query: str, limit: int = 10) -> List[PaperBase]:
-        cache_key = f"africarxiv:search:{query}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return [PaperBase(**p) for p in cached]
-
+    async def _fetch(self, query: str, limit: int) -> List[PaperBase]:
         params = {
             "query": query,
             "client-id": "osf.africarxiv",
             "page[size]": min(limit, 25),
             "sort": "-relevance",
         }
-        try:
-            response = await self.client.get(settings.AFRICARXIV_API_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            papers = [
-                p for item in data.get("data", [])
-                if (p := self._parse_doi(item))
-            ]
-            africarxiv_logger.info(f"AfricArXiv '{query}': {len(papers)} papers")
-            if papers:
-                await cache.set(cache_key, [p.dict() for p in papers], ttl=3600)
-            return papers
-        except Exception as e:
-            africarxiv_logger.warning(f"AfricArXiv search failed for '{query}': {e}")
-            return []
+        response = await self.client.get(settings.AFRICARXIV_API_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+        return [
+            p for item in data.get("data", [])
+            if (p := self._parse_doi(item))
+        ]
 
 
 _africarxiv_singleton: Optional[AfricArXivService] = None
@@ -1176,3 +1097,16 @@ def get_africarxiv_service(client: Optional[httpx.AsyncClient] = None) -> AfricA
     if _africarxiv_singleton is None:
         _africarxiv_singleton = AfricArXivService()
     return _africarxiv_singleton
+
+
+# ─── Registry — fan-out order: OpenAlex first (best metadata, wins dedup ties) ──
+
+provider_registry.register("openalex", get_openalex_service)
+provider_registry.register("s2", get_semantic_scholar_service)
+provider_registry.register("arxiv", get_arxiv_service)
+provider_registry.register("core", get_core_service)
+provider_registry.register("elsevier", get_elsevier_service)
+provider_registry.register("pubmed", get_pubmed_service)
+provider_registry.register("doaj", get_doaj_service)
+provider_registry.register("ajol", get_ajol_service)
+provider_registry.register("africarxiv", get_africarxiv_service)
@@ -14,11 +14,11 @@ import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
-import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.config import settings
+from app.core.http_client import http_clients
 from app.core.logger import get_logger
 from app.models.database import (
     User,
@@ -45,18 +45,18 @@ async def exchange_code_for_token(code: str) -> Optional[Dict[str, Any]]:
         "code": code,
         "redirect_uri": f"{settings.FRONTEND_URL}/orcid/callback",
     }
-    async with httpx.AsyncClient(timeout=15) as client:
-        try:
-            resp = await client.post(
-                settings.ORCID_TOKEN_URL,
-                data=data,
-                headers={"Accept": "application/json"},
-            )
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            logger.error(f"ORCID token exchange failed: {e}")
-            return None
+    try:
+        resp = await http_clients.get(settings.ORCID_TOKEN_URL).post(
+            settings.ORCID_TOKEN_URL,
+            data=data,
+            headers={"Accept": "application/json"},
+            timeout=15,
+        )
+        resp.raise_for_status()
+        return resp.json()
+    except Exception as e:
+        logger.error(f"ORCID token exchange failed: {e}")
+        return None
 
 
 # ─── Profile Upsert ───────────────────────────────────────────────────────────
@@ -112,14 +112,13 @@ async def sync_orcid_works(db: AsyncSession, user_id: str, orcid_id: str) -> int
     url = f"{settings.ORCID_API_URL}/{orcid_id}/works"
     headers = {"Accept": "application/json"}
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        try:
-            resp = await client.get(url, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            logger.error(f"ORCID works fetch failed for {orcid_id}: {e}")
-            return 0
+    try:
+        resp = await http_clients.get(url).get(url, headers=headers, timeout=20)
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception as e:
+        logger.error(f"ORCID works fetch failed for {orcid_id}: {e}")
+        return 0
 
     groups = data.get("group") or []
     synced = 0
@@ -224,22 +223,23 @@ async def _create_ghost_profiles_for_doi(
     Best-effort — silently skips on error.
     """
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                "https://api.openalex.org/works",
-                params={
-                    "filter": f"doi:{doi}",
-                    "select": "authorships",
-                    "per_page": 1,
-                },
-            )
-            if resp.status_code != 200:
-                return
-            data = resp.json()
-            results = data.get("results") or []
-            if not results:
-                return
-            authorships = results[0].get("authorships") or []
+        url = "https://api.openalex.org/works"
+        resp = await http_clients.get(url).get(
+            url,
+            params={
+                "filter": f"doi:{doi}",
+                "select": "authorships",
+                "per_page": 1,
+            },
+            timeout=10,
+        )
+        if resp.status_code != 200:
+            return
+        data = resp.json()
+        results = data.get("results") or []
+        if not results:
+            return
+        authorships = results[0].get("authorships") or []
 
         for authorship in authorships:
             author = authorship.get("author") or {}
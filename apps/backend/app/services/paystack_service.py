@@ -1,6 +1,6 @@
-import httpx
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.http_client import http_clients
 from app.core.logger import get_logger
 
 logger = get_logger("paystack_service")
@@ -29,15 +29,15 @@ class PaystackService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, headers=self.headers, json=payload)
-                data = response.json()
-                
-                if response.status_code == 200 and data.get("status"):
-                    return data.get("data")
-                else:
-                    logger.error(f"Paystack initialization failed: {data}")
-                    return None
+            client = http_clients.get(self.base_url)
+            response = await client.post(url, headers=self.headers, json=payload)
+            data = response.json()
+            
+            if response.status_code == 200 and data.get("status"):
+                return data.get("data")
+            else:
+                logger.error(f"Paystack initialization failed: {data}")
+                return None
         except Exception as e:
             logger.error(f"Error initializing Paystack transaction: {e}")
             return None
@@ -49,15 +49,15 @@ class PaystackService:
         url = f"{self.base_url}/transaction/verify/{reference}"
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=self.headers)
-                data = response.json()
-                
-                if response.status_code == 200 and data.get("status"):
-                    return data.get("data")
-                else:
-                    logger.error(f"Paystack verification failed: {data}")
-                    return None
+            client = http_clients.get(self.base_url)
+            response = await client.get(url, headers=self.headers)
+            data = response.json()
+            
+            if response.status_code == 200 and data.get("status"):
+                return data.get("data")
+            else:
+                logger.error(f"Paystack verification failed: {data}")
+                return None
         except Exception as e:
             logger.error(f"Error verifying Paystack transaction: {e}")
             return None
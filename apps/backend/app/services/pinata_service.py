@@ -1,6 +1,6 @@
-import httpx
 from typing import Optional
 from app.core.config import settings
+from app.core.http_client import http_clients
 from app.core.logger import get_logger
 
 logger = get_logger("pinata_service")
@@ -28,19 +28,19 @@ class PinataService:
             headers["pinata_secret_api_key"] = self.api_secret
 
         try:
-            async with httpx.AsyncClient() as client:
-                files = {"file": (filename, file_content)}
-                response = await client.post(
-                    self.base_url,
-                    headers=headers,
-                    files=files,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                cid = data.get("IpfsHash")
-                logger.info(f"File {filename} uploaded to Pinata IPFS. CID: {cid}")
-                return cid
+            client = http_clients.get(self.base_url)
+            files = {"file": (filename, file_content)}
+            response = await client.post(
+                self.base_url,
+                headers=headers,
+                files=files,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            data = response.json()
+            cid = data.get("IpfsHash")
+            logger.info(f"File {filename} uploaded to Pinata IPFS. CID: {cid}")
+            return cid
         except Exception as e:
             logger.error(f"Failed to upload to Pinata: {str(e)}")
             return None
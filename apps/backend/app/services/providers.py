@@ -0,0 +1,362 @@
+"""
+Paper provider registry.
+
+Every academic source (OpenAlex, Semantic Scholar, arXiv, ...) is a
+BaseProvider subclass that only knows how to talk to its upstream API
+(`_fetch`). Cross-cutting concerns — cache lookup/store, per-source
+concurrency limits, single-flight coalescing of identical searches,
+outbound rate pacing, circuit breaking, metrics and error handling — live
+here once.
+
+The search endpoint iterates `provider_registry.enabled()`, so sources can
+be switched on/off per deployment via settings.SEARCH_PROVIDERS. Providers
+built without an explicit client use the pooled per-host client for their
+`upstream_url()` (see app.core.http_client).
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Protocol, Tuple, runtime_checkable
+
+import httpx
+from pydantic import TypeAdapter
+
+from app.core.cache import cache
+from app.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    is_rate_limited,
+    is_upstream_failure,
+    retry_after_seconds,
+)
+from app.core.config import settings
+from app.core.deadline import detach
+from app.core.http_client import http_clients
+from app.core.logger import get_logger
+from app.core.single_flight import single_flight
+from app.core.token_bucket import TokenBucket, UpstreamRateLimited
+from app.models.schemas import PaperBase
+
+logger = get_logger("providers")
+
+
+@runtime_checkable
+class PaperProvider(Protocol):
+    """Anything the search fan-out can query."""
+    name: str
+    primary: bool
+
+    def is_configured(self) -> bool: ...
+
+    async def search_papers(self, query: str, limit: int = 10, **kwargs: Any) -> List[PaperBase]: ...
+
+
+@dataclass
+class ProviderMetrics:
+    calls: int = 0
+    cache_hits: int = 0
+    stale_hits: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    short_circuited: int = 0
+    throttled: int = 0
+    throttle_wait_seconds: float = 0.0
+    papers: int = 0
+    upstream_seconds: float = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = asdict(self)
+        upstream_calls = (
+            self.calls - self.cache_hits - self.coalesced - self.short_circuited - self.throttled
+        )
+        data["avg_upstream_ms"] = (
+            round(self.upstream_seconds / upstream_calls * 1000, 1) if upstream_calls else None
+        )
+        return data
+
+
+# Shared per-source state — factories may build a fresh wrapper per request,
+# but limits and counters must be process-wide.
+_metrics: Dict[str, ProviderMetrics] = {}
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+# One pydantic-core call for the whole list — faster than PaperBase(**p) per paper,
+# and (with pydantic v2) faster than model_construct too; see benchmark_cache_serialization.py
+_paper_list = TypeAdapter(List[PaperBase])
+
+
+def _papers_from_cache(cached: List[Dict[str, Any]]) -> List[PaperBase]:
+    return _paper_list.validate_python(cached)
+
+
+class BaseProvider(ABC):
+    """
+    Shared search pipeline for a single academic source.
+    Subclasses set the class attributes and implement `_fetch`.
+    """
+    name: str = ""
+    cache_prefix: str = ""
+    primary: bool = False            # primary source gets the full limit + filters
+    timeout: float = 15.0
+    cache_ttl: int = 3600            # soft TTL — stale results are refreshed in the background
+    stale_ttl: Optional[int] = None  # extra seconds a stale result may be served (default SEARCH_CACHE_STALE_TTL)
+    max_concurrency: int = 8         # in-flight upstream requests per worker
+    swallow_errors: bool = True      # False → re-raise upstream errors to the caller
+    rate_limit: Optional[Tuple[float, float]] = None  # upstream quota: (requests/second, burst)
+    requests_per_search: int = 1     # upstream calls one search_papers() makes
+    logger: logging.Logger = logger
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Pooled per-host client — shares connections across requests and workers' tasks
+            return http_clients.get(self.upstream_url(), timeout=self.timeout)
+        return self._client
+
+    def upstream_url(self) -> Optional[str]:
+        """Base URL of the upstream API; selects the per-host connection pool."""
+        return None
+
+    @property
+    def metrics(self) -> ProviderMetrics:
+        return _metrics.setdefault(self.name, ProviderMetrics())
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        if self.name not in _breakers:
+            _breakers[self.name] = CircuitBreaker(self.name)
+        return _breakers[self.name]
+
+    @property
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self.name not in _semaphores:
+            _semaphores[self.name] = asyncio.Semaphore(self.max_concurrency)
+        return _semaphores[self.name]
+
+    def is_configured(self) -> bool:
+        """Return False when required credentials are missing."""
+        return True
+
+    def rate_limit_identity(self) -> Optional[str]:
+        """API key the upstream quota is tracked against (None = anonymous pool)."""
+        return None
+
+    async def _pace(self):
+        """Wait for an outbound slot so we stay at the upstream's allowed rate."""
+        if not self.rate_limit or not settings.OUTBOUND_RATE_LIMIT_ENABLED:
+            return
+        rate, burst = self.rate_limit
+        bucket = TokenBucket(self.name, rate, burst, identity=self.rate_limit_identity())
+        waited = await bucket.acquire(
+            tokens=self.requests_per_search,
+            max_wait=settings.OUTBOUND_RATE_LIMIT_MAX_WAIT_SECONDS,
+        )
+        self.metrics.throttle_wait_seconds += waited
+
+    async def _pace_now(self) -> bool:
+        """Take one extra outbound slot only if it is free right now (used for hedges)."""
+        if not self.rate_limit or not settings.OUTBOUND_RATE_LIMIT_ENABLED:
+            return True
+        rate, burst = self.rate_limit
+        bucket = TokenBucket(self.name, rate, burst, identity=self.rate_limit_identity())
+        try:
+            await bucket.acquire(tokens=1, max_wait=0)
+        except UpstreamRateLimited:
+            return False
+        return True
+
+    def cache_key(self, query: str, limit: int, **kwargs: Any) -> str:
+        return cache.make_key(f"{self.cache_prefix}:search", query, limit, **kwargs)
+
+    @property
+    def cache_tag(self) -> str:
+        return f"provider:{self.name}"
+
+    async def invalidate_cache(self) -> int:
+        """Drop every cached search result of this source."""
+        return await cache.invalidate_tags(self.cache_tag)
+
+    @abstractmethod
+    async def _fetch(self, query: str, limit: int, **kwargs: Any) -> List[PaperBase]:
+        """Query the upstream API; no caching, retries or circuit breaking."""
+
+    def search_cache_key(self, query: str, limit: int = 10, **kwargs: Any) -> str:
+        """The cache key search_papers() called with the same arguments reads and writes."""
+        return self.cache_key(query, limit, **kwargs)
+
+    async def search_papers(self, query: str, limit: int = 10, **kwargs: Any) -> List[PaperBase]:
+        return await self._search(query, limit, kwargs)
+
+    async def search_prefetched(
+        self, entry: Tuple[Any, bool], query: str, limit: int = 10, **kwargs: Any
+    ) -> List[PaperBase]:
+        """search_papers() with the cache lookup already done — `entry` comes from cache.get_many_entries()."""
+        return await self._search(query, limit, kwargs, entry)
+
+    async def _search(
+        self, query: str, limit: int, kwargs: Dict[str, Any], entry: Optional[Tuple[Any, bool]] = None
+    ) -> List[PaperBase]:
+        if not self.is_configured():
+            self.logger.warning(f"{self.name} is not configured — skipping search")
+            return []
+
+        metrics = self.metrics
+        metrics.calls += 1
+
+        cache_key = self.cache_key(query, limit, **kwargs)
+        cached, stale = entry if entry is not None else await cache.get_entry(cache_key)
+        if cached:
+            metrics.cache_hits += 1
+            if stale:
+                metrics.stale_hits += 1
+                await self._refresh_in_background(cache_key, query, limit, **kwargs)
+            self.logger.info(f"{self.name} {'stale ' if stale else ''}cache hit for '{query}'")
+            return _papers_from_cache(cached)
+
+        # Identical concurrent searches (here or on another worker) share one upstream call
+        papers, shared = await single_flight.do(
+            cache_key,
+            lambda: self._search_upstream(cache_key, query, limit, **kwargs),
+            load_cached=lambda: self._load_cached(cache_key),
+        )
+        if shared:
+            metrics.coalesced += 1
+            self.logger.info(f"{self.name} coalesced '{query}' with an in-flight search")
+        return papers
+
+    async def _refresh_in_background(self, cache_key: str, query: str, limit: int, **kwargs: Any):
+        """Re-fetch a stale entry without blocking the caller; one refresh per key across workers."""
+        if single_flight.in_flight(cache_key):
+            return
+        if not await cache.try_lock(f"refresh:{cache_key}", settings.CACHE_REFRESH_LOCK_SECONDS):
+            return
+        detach(asyncio.create_task(
+            single_flight.do(cache_key, lambda: self._search_upstream(cache_key, query, limit, **kwargs)),
+            name=f"refresh:{self.name}",
+        ))
+
+    async def _load_cached(self, cache_key: str) -> Optional[List[PaperBase]]:
+        cached = await cache.get(cache_key)
+        if not cached:
+            return None
+        return _papers_from_cache(cached)
+
+    async def _search_upstream(self, cache_key: str, query: str, limit: int, **kwargs: Any) -> List[PaperBase]:
+        metrics = self.metrics
+        breaker = self.breaker
+        if not await breaker.allow():
+            metrics.short_circuited += 1
+            if not self.swallow_errors:
+                raise CircuitOpenError(self.name, breaker.retry_in())
+            self.logger.debug(f"{self.name} circuit open — skipping '{query}'")
+            return []
+
+        try:
+            await self._pace()
+        except UpstreamRateLimited as e:
+            metrics.throttled += 1
+            if not self.swallow_errors:
+                raise
+            self.logger.warning(f"{self.name} skipped for '{query}': {e}")
+            return []
+
+        started = time.perf_counter()
+        try:
+            async with self._semaphore:
+                papers = await self._fetch(query, limit, **kwargs)
+        except Exception as e:
+            metrics.errors += 1
+            if is_upstream_failure(e):
+                await breaker.record_failure(retry_after_seconds(e), trip=is_rate_limited(e))
+            if not self.swallow_errors:
+                self.logger.error(f"{self.name} search failed: {e}")
+                raise
+            self.logger.warning(f"{self.name} search failed for '{query}': {e}")
+            return []
+        finally:
+            metrics.upstream_seconds += time.perf_counter() - started
+
+        await breaker.record_success()
+        metrics.papers += len(papers)
+        self.logger.info(f"{self.name} '{query}': {len(papers)} papers")
+        if papers:
+            await cache.set(
+                cache_key,
+                [p.model_dump() for p in papers],
+                ttl=self.cache_ttl,
+                stale_ttl=self.stale_ttl or settings.SEARCH_CACHE_STALE_TTL,
+                tags=[self.cache_tag],
+            )
+        return papers
+
+
+ProviderFactory = Callable[[Optional[httpx.AsyncClient]], BaseProvider]
+SearchCall = Tuple[BaseProvider, str, Dict[str, Any]]  # (provider, query, search_papers kwargs incl. limit)
+
+
+async def prefetch_searches(calls: List[SearchCall]) -> List[Coroutine[Any, Any, List[PaperBase]]]:
+    """
+    Look up the cache entries of several searches in one round trip and return
+    one search coroutine per call; cached ones complete without touching Redis again.
+    """
+    keys = [provider.search_cache_key(query, **kwargs) for provider, query, kwargs in calls]
+    entries = await cache.get_many_entries(keys)
+    return [
+        provider.search_prefetched(entries[key], query, **kwargs)
+        for (provider, query, kwargs), key in zip(calls, keys)
+    ]
+
+
+class ProviderRegistry:
+    """Ordered name → factory mapping of every known paper source."""
+
+    def __init__(self):
+        self._factories: Dict[str, ProviderFactory] = {}
+
+    def register(self, name: str, factory: ProviderFactory):
+        self._factories[name] = factory
+
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def enabled_names(self) -> List[str]:
+        """Registered sources enabled for this deployment, in fan-out order."""
+        wanted = settings.SEARCH_PROVIDERS
+        if wanted is None:
+            return self.names()
+        unknown = [n for n in wanted if n not in self._factories]
+        if unknown:
+            logger.warning(f"Ignoring unknown SEARCH_PROVIDERS entries: {unknown}")
+        return [n for n in wanted if n in self._factories]
+
+    def get(self, name: str, client: Optional[httpx.AsyncClient] = None) -> BaseProvider:
+        return self._factories[name](client)
+
+    def enabled(self, client: Optional[httpx.AsyncClient] = None) -> List[BaseProvider]:
+        """Instantiate every enabled source that has the credentials it needs."""
+        providers = [self.get(name, client) for name in self.enabled_names()]
+        return [p for p in providers if p.is_configured()]
+
+    def status(self) -> List[Dict[str, Any]]:
+        enabled = set(self.enabled_names())
+        rows = []
+        for name in self.names():
+            provider = self.get(name)
+            rows.append({
+                "name": name,
+                "enabled": name in enabled,
+                "configured": provider.is_configured(),
+                "circuit": provider.breaker.state,
+                "metrics": provider.metrics.snapshot(),
+            })
+        return rows
+
+
+provider_registry = ProviderRegistry()
@@ -0,0 +1,390 @@
+"""
+Bulk re-embedding of the vector store, e.g. after changing EMBEDDING_MODEL.
+
+    python -m app.services.reindex                 # every namespace
+    python -m app.services.reindex papers --batch-size 512
+    python -m app.services.reindex queries --fresh # ignore a saved checkpoint
+
+or the `reindex_vectors` Celery task. For each namespace a new physical
+collection `<name>__<timestamp ms>_<random>` is filled and the logical name
+is then pointed at it with one atomic alias update, so searches never see a
+half-built index. Sources:
+
+    queries    SavedQuery rows
+    papers     SavedPaper rows, then the papers already in the corpus
+    documents  chunks already in the documents collection (their text is
+               stored in the payload; the PDFs themselves are not kept)
+
+Postgres rows are streamed with keyset pagination (WHERE id > last ORDER BY
+id), collections with scroll offsets; each batch is embedded in one call.
+After every batch the cursor is checkpointed in Redis, so a crashed or
+cancelled run resumes where it stopped (same model, target still present).
+
+The app keeps writing to the live collection during a run (uploads, saved
+queries, papers indexed by searches). Before the swap, catch-up passes copy
+every point whose indexed_at is at or after the run's start, repeating
+until a pass finds nothing new; only writes landing in the last moment
+before the swap, and deletions made during the run, are not carried over.
+
+The first reindex of a deployment replaces the original physical
+collection, which must be deleted before its name can become an alias;
+later runs swap atomically and drop the previous collection.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    FieldCondition,
+    Filter,
+    PointStruct,
+    Range,
+)
+from sqlalchemy import func, select
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.models.schemas import PaperBase
+from app.services.vector_service import (
+    VectorStore, paper_payload, paper_point_id, paper_text, query_point_id
+)
+
+logger = get_logger("reindex")
+
+NAMESPACES = ("queries", "papers", "documents")
+_CHECKPOINT_TTL = 7 * 86400
+_CATCH_UP_PASSES = 3
+
+# (point id, text to embed, payload)
+Item = Tuple[str, str, Dict[str, Any]]
+# Batches of items with the cursor to resume after them
+Source = Callable[[VectorStore, Optional[Any], int], AsyncIterator[Tuple[List[Item], Any]]]
+ProgressCallback = Callable[[str, int, int], None]
+
+
+async def _saved_queries(store: VectorStore, cursor: Optional[int], batch_size: int):
+    from app.db.session import AsyncSessionLocal
+    from app.models.database import SavedQuery
+
+    last_id = cursor or 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(
+                    SavedQuery.id, SavedQuery.user_id, SavedQuery.title, SavedQuery.query,
+                    SavedQuery.answer, SavedQuery.tags, SavedQuery.vector_id,
+                )
+                .where(SavedQuery.id > last_id)
+                .order_by(SavedQuery.id)
+                .limit(batch_size)
+            )).all()
+        if not rows:
+            return
+        items = []
+        for row in rows:
+            vector_id = row.vector_id or f"query_{row.id}_{row.user_id}"
+            text = f"{row.query}\n\n{row.answer}"
+            items.append((
+                query_point_id(vector_id),
+                text,
+                {
+                    "query_id": row.id,
+                    "vector_id": vector_id,
+                    "text": text,
+                    "user_id": row.user_id,
+                    "title": row.title,
+                    "tags": ",".join(row.tags or []),
+                    "indexed_at": int(time.time()),
+                },
+            ))
+        last_id = rows[-1].id
+        yield items, last_id
+
+
+async def _saved_papers(store: VectorStore, cursor: Optional[int], batch_size: int):
+    from app.db.session import AsyncSessionLocal
+    from app.models.database import SavedPaper
+
+    last_id = cursor or 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(
+                    SavedPaper.id, SavedPaper.paper_id, SavedPaper.title, SavedPaper.abstract,
+                    SavedPaper.authors, SavedPaper.year, SavedPaper.citations,
+                )
+                .where(SavedPaper.id > last_id)
+                .order_by(SavedPaper.id)
+                .limit(batch_size)
+            )).all()
+        if not rows:
+            return
+        items = []
+        for row in rows:
+            paper = PaperBase(
+                id=row.paper_id, title=row.title, abstract=row.abstract,
+                authors=row.authors or [], year=row.year, citations=row.citations or 0,
+            )
+            items.append((paper_point_id(paper.id), paper_text(paper), paper_payload(paper)))
+        last_id = rows[-1].id
+        yield items, last_id
+
+
+def _scroll(collection: Callable[[VectorStore], str], text_of: Callable[[Dict[str, Any]], str]) -> Source:
+    """Source that re-embeds the points of an existing collection from their payload."""
+    async def source(store: VectorStore, cursor: Optional[Any], batch_size: int):
+        name = collection(store)
+        if not await store._client.collection_exists(name):
+            return
+        offset = cursor
+        while True:
+            records, offset = await store._client.scroll(
+                collection_name=name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            items = [
+                (str(r.id), text_of(r.payload), {**r.payload, "indexed_at": int(time.time())})
+                for r in records
+                if text_of(r.payload).strip()
+            ]
+            if items:
+                yield items, offset
+            if offset is None:
+                return
+    return source
+
+
+def _scroll_papers(payload: Dict[str, Any]) -> str:
+    return f"{payload.get('title', '')}\n\n{payload.get('abstract', '')}"
+
+
+def _payload_text(payload: Dict[str, Any]) -> str:
+    return payload.get("text", "")
+
+
+_SOURCES: Dict[str, List[Tuple[str, Source]]] = {
+    "queries": [("saved_queries", _saved_queries)],
+    "papers": [
+        ("saved_papers", _saved_papers),
+        ("corpus", _scroll(lambda s: s.papers_collection, _scroll_papers)),
+    ],
+    "documents": [
+        ("documents", _scroll(lambda s: s.documents_collection, _payload_text)),
+    ],
+}
+
+# Embedding text of a point in each namespace's live collection, for catch-up
+_TEXT_OF: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "queries": _payload_text,
+    "papers": _scroll_papers,
+    "documents": _payload_text,
+}
+
+
+def _alias_name(store: VectorStore, namespace: str) -> str:
+    return {
+        "queries": store.collection_name,
+        "papers": store.papers_collection,
+        "documents": store.documents_collection,
+    }[namespace]
+
+
+async def _total(store: VectorStore, namespace: str) -> int:
+    """Rough item count for progress reporting."""
+    total = 0
+    alias = _alias_name(store, namespace)
+    if namespace in ("papers", "documents") and await store._client.collection_exists(alias):
+        total += (await store._client.count(alias)).count
+    if namespace in ("queries", "papers"):
+        from app.db.session import AsyncSessionLocal
+        from app.models.database import SavedPaper, SavedQuery
+
+        model = SavedQuery if namespace == "queries" else SavedPaper
+        async with AsyncSessionLocal() as db:
+            total += await db.scalar(select(func.count(model.id))) or 0
+    return total
+
+
+async def _write(store: VectorStore, target: str, items: List[Item], keyword_vector: bool):
+    vectors = await store.embed([text for _, text, _ in items])
+    await store._client.upsert(
+        collection_name=target,
+        points=[
+            PointStruct(id=point_id, vector=store.paper_vector(vector, text, keyword_vector), payload=payload)
+            for (point_id, text, payload), vector in zip(items, vectors)
+        ],
+    )
+
+
+async def _catch_up(
+    store: VectorStore, namespace: str, target: str, since: int, batch_size: int, keyword_vector: bool
+) -> int:
+    """Copy points written to the live collection at or after `since` into `target`."""
+    alias = _alias_name(store, namespace)
+    if not await store._client.collection_exists(alias):
+        return 0
+    text_of = _TEXT_OF[namespace]
+    changed = Filter(must=[FieldCondition(key="indexed_at", range=Range(gte=since))])
+    copied, offset = 0, None
+    while True:
+        records, offset = await store._client.scroll(
+            collection_name=alias,
+            scroll_filter=changed,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        items = [(str(r.id), text_of(r.payload), r.payload) for r in records if text_of(r.payload).strip()]
+        if items:
+            await _write(store, target, items, keyword_vector)
+            copied += len(items)
+        if offset is None:
+            return copied
+
+
+async def swap_alias(store: VectorStore, alias: str, target: str, keep_old: bool = False):
+    """Point `alias` at `target` atomically; drop the collection it pointed to unless keep_old."""
+    client = store._client
+    aliases = (await client.get_aliases()).aliases
+    previous = next((a.collection_name for a in aliases if a.alias_name == alias), None)
+
+    operations = []
+    if previous:
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    elif await client.collection_exists(alias):
+        # First migration: the logical name is still a physical collection
+        logger.warning(f"Replacing physical collection '{alias}' with an alias to '{target}'")
+        await client.delete_collection(alias)
+    operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias)))
+    await client.update_collection_aliases(change_aliases_operations=operations)
+    logger.info(f"Alias '{alias}' now points to '{target}'")
+
+    if previous and previous != target and not keep_old:
+        await client.delete_collection(previous)
+        logger.info(f"Dropped previous collection '{previous}'")
+
+
+async def reindex_namespace(
+    store: VectorStore,
+    namespace: str,
+    batch_size: int = None,
+    fresh: bool = False,
+    keep_old: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    await store._ensure_initialized()
+    batch_size = batch_size or settings.REINDEX_BATCH_SIZE
+    alias = _alias_name(store, namespace)
+    checkpoint_key = f"reindex:{namespace}"
+
+    state = None if fresh else await cache.get(checkpoint_key)
+    if state and (
+        state.get("model") != settings.EMBEDDING_MODEL
+        or not await store._client.collection_exists(state["target"])
+    ):
+        state = None
+    if state:
+        logger.info(f"Resuming {namespace} reindex into '{state['target']}' after {state['done']} items")
+    else:
+        state = {
+            # Unique even for runs started in the same millisecond
+            "target": f"{alias}__{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}",
+            "model": settings.EMBEDDING_MODEL,
+            "started_at": int(time.time()),
+            "stage": 0,
+            "cursor": None,
+            "done": 0,
+        }
+    target = state["target"]
+    keyword_vector = namespace == "papers"
+    await store.ensure_collection(target, store.collection_schemas()[alias], keyword_vector=keyword_vector)
+
+    total = await _total(store, namespace)
+    started = time.time()
+    sources = _SOURCES[namespace]
+    for stage in range(state["stage"], len(sources)):
+        label, source = sources[stage]
+        async for items, cursor in source(store, state["cursor"], batch_size):
+            if stage > 0:
+                # Later sources overlap earlier ones (saved papers are also in the corpus)
+                written = {
+                    str(r.id) for r in await store._client.retrieve(
+                        target, ids=[point_id for point_id, _, _ in items], with_payload=False
+                    )
+                }
+                items = [item for item in items if item[0] not in written]
+            if items:
+                await _write(store, target, items, keyword_vector)
+            state["cursor"] = cursor
+            state["done"] += len(items)
+            await cache.set(checkpoint_key, state, ttl=_CHECKPOINT_TTL)
+
+            rate = state["done"] / max(time.time() - started, 1e-6)
+            logger.info(f"[{namespace}/{label}] {state['done']}/{total} items ({rate:.0f}/s)")
+            if progress:
+                progress(namespace, state["done"], total)
+        state["stage"] = stage + 1
+        state["cursor"] = None
+        await cache.set(checkpoint_key, state, ttl=_CHECKPOINT_TTL)
+
+    # Uploads, saves and indexed papers that reached the live collection meanwhile
+    since, caught_up = state.get("started_at", 0), 0
+    for _ in range(_CATCH_UP_PASSES):
+        pass_started = int(time.time())
+        copied = await _catch_up(store, namespace, target, since, batch_size, keyword_vector)
+        if not copied:
+            break
+        caught_up += copied
+        logger.info(f"[{namespace}/catch-up] copied {copied} points written during the run")
+        since = pass_started
+
+    await swap_alias(store, alias, target, keep_old=keep_old)
+    await cache.delete(checkpoint_key)
+    return {"namespace": namespace, "collection": target, "indexed": state["done"], "caught_up": caught_up}
+
+
+async def reindex(
+    namespaces=NAMESPACES,
+    batch_size: int = None,
+    fresh: bool = False,
+    keep_old: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """Reindex the given namespaces with a dedicated store and cache connection (CLI / Celery)."""
+    store = VectorStore()
+    await cache.connect()
+    try:
+        return [
+            await reindex_namespace(store, ns, batch_size, fresh, keep_old, progress)
+            for ns in namespaces
+        ]
+    finally:
+        await store.aclose()
+        await cache.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed the vector store into fresh collections")
+    parser.add_argument("namespaces", nargs="*", choices=NAMESPACES, default=list(NAMESPACES))
+    parser.add_argument("--batch-size", type=int, default=settings.REINDEX_BATCH_SIZE)
+    parser.add_argument("--fresh", action="store_true", help="ignore saved checkpoints")
+    parser.add_argument("--keep-old", action="store_true", help="keep the previous collections")
+    args = parser.parse_args()
+
+    for result in asyncio.run(reindex(args.namespaces, args.batch_size, args.fresh, args.keep_old)):
+        print(f"{result['namespace']}: {result['indexed']} items → {result['collection']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Multi-source paper search fan-out shared by /research/search and
+/research/search/stream.
+
+    tasks = [asyncio.create_task(timed_search(label, coro, deadline_at)) for label, coro in sources]
+    return StreamingResponse(search_events(tasks, query, user_id, start_time), ...)
+
+Each source runs within its own soft budget (settings.SEARCH_PROVIDER_BUDGETS),
+capped by the overall search deadline. search_events yields one SSE event per
+source in completion order, carrying only papers not already sent, then a
+summary. A client that disconnects mid-stream cancels the sources still
+running, and the search history row is written with a session of its own:
+the request-scoped one from get_db is closed by the time a StreamingResponse
+body runs.
+"""
+import asyncio
+import json
+import time
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.deadline import run_with_budget
+from app.core.logger import get_logger
+from app.db.session import AsyncSessionLocal
+
+logger = get_logger("search_stream")
+
+
+def source_budget(label: str, deadline_at: float) -> float:
+    """Per-source soft budget, capped by what is left of the overall search deadline."""
+    budget = settings.SEARCH_PROVIDER_BUDGETS.get(label, settings.SEARCH_DEFAULT_PROVIDER_BUDGET)
+    return max(0.0, min(budget, deadline_at - time.perf_counter()))
+
+
+async def timed_search(label: str, coro, deadline_at: float) -> tuple:
+    """
+    Await one source search within its budget, returning
+    (label, result_or_exception, elapsed_seconds). A source that misses its
+    budget yields DeadlineExceeded and keeps running to warm the cache.
+    """
+    started = time.perf_counter()
+    try:
+        result = await run_with_budget(coro, source_budget(label, deadline_at), name=f"search:{label}")
+    except Exception as e:
+        result = e
+    return label, result, time.perf_counter() - started
+
+
+async def record_search_history(db: AsyncSession, user_id: str, query: str, results_count: int):
+    from app.models.database import SearchHistory
+
+    try:
+        history = SearchHistory(
+            user_id=user_id,
+            query=query,
+            results_count=results_count
+        )
+        db.add(history)
+        await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to record search history: {e}")
+        await db.rollback()
+
+
+async def search_events(tasks: List[asyncio.Task], query: str, user_id: str, start_time: float):
+    """SSE events for /search/stream (see the module docstring)."""
+    seen_ids = set()
+    source_counts: dict = {}
+    timings_ms: dict = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            label, batch, elapsed = await next_done
+            timings_ms[label] = round(elapsed * 1000, 1)
+
+            if isinstance(batch, Exception):
+                logger.warning(f"{label} source error: {batch}")
+                source_counts[label] = 0
+                yield f"data: {json.dumps({'source': label, 'error': str(batch), 'elapsed_ms': timings_ms[label]})}\n\n"
+                continue
+
+            fresh = []
+            for p in batch:
+                if p.id not in seen_ids:
+                    seen_ids.add(p.id)
+                    fresh.append(p)
+            source_counts[label] = len(fresh)
+            event = {
+                'source': label,
+                'papers': [p.model_dump() for p in fresh],
+                'count': len(fresh),
+                'received': len(batch),
+                'elapsed_ms': timings_ms[label],
+            }
+            yield f"data: {json.dumps(event, default=str)}\n\n"
+    finally:
+        # Client disconnected mid-stream: don't leave provider calls running
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    elapsed = time.time() - start_time
+    total = len(seen_ids)
+    logger.info(
+        f"Streaming paper search for '{query}' completed in {elapsed:.4f}s | "
+        + " + ".join(f"{v} {k}" for k, v in source_counts.items())
+        + f" = {total} total"
+    )
+    async with AsyncSessionLocal() as db:
+        await record_search_history(db, user_id, query, total)
+
+    summary = {
+        'total': total,
+        'source_counts': source_counts,
+        'timings_ms': timings_ms,
+        'elapsed_ms': round(elapsed * 1000, 1),
+    }
+    yield f"data: {json.dumps({'summary': summary})}\n\n"
+    yield "data: [DONE]\n\n"
@@ -1,95 +1,512 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, SparseVectorParams, SparseVector, Modifier,
+    Filter, FieldCondition, MatchAny, MatchValue, PayloadSchemaType,
+    KeywordIndexParams, KeywordIndexType, IntegerIndexParams, IntegerIndexType,
+    Range, IsEmptyCondition, PayloadField, FilterSelector, PointIdsList,
+)
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
+import numpy as np
+import asyncio
+import hashlib
 import uuid
 import time
 import os
 
 from app.core.config import settings
 from app.core.logger import get_logger
+from app.services import hybrid_retrieval
+from app.services.chunking import chunk_text
+from app.services.embedding_batcher import EmbeddingBatcher
 
 logger = get_logger("vector_store")
 
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Named sparse vector holding a paper's BM25 term weights (see hybrid_retrieval)
+KEYWORD_VECTOR = "bm25"
+
+
+def load_embedding_model(backend: Optional[str] = None, model_name: Optional[str] = None):
+    """
+    Load EMBEDDING_MODEL as a SentenceTransformer on the given backend:
+    "torch" (default), "onnx" (ONNX Runtime) or "onnx-int8" (dynamically
+    quantized ONNX weights from EMBEDDING_ONNX_INT8_FILE). The returned
+    object has the same encode() interface whichever backend is used.
+    ONNX needs sentence-transformers[onnx]; without it we fall back to torch.
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+    model_name = model_name or settings.EMBEDDING_MODEL
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    # Imported here: pulling in torch costs seconds and the store is initialized lazily anyway
+    import sentence_transformers
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    try:
+        import onnxruntime  # noqa: F401
+        import optimum  # noqa: F401
+    except ImportError:
+        logger.warning(f"Embedding backend '{backend}' needs sentence-transformers[onnx] — using torch")
+        return SentenceTransformer(model_name)
+    if tuple(int(p) for p in sentence_transformers.__version__.split(".")[:2]) < (3, 2):
+        logger.warning(f"Embedding backend '{backend}' needs sentence-transformers>=3.2 — using torch")
+        return SentenceTransformer(model_name)
+
+    model_kwargs = {"file_name": settings.EMBEDDING_ONNX_INT8_FILE} if backend == "onnx-int8" else None
+    return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs)
+
+
+def query_point_id(query_id: str) -> str:
+    """Deterministic point id of a saved query (its SavedQuery.vector_id)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, query_id))
+
+
+def paper_point_id(paper_id: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, paper_id))
+
+
+def paper_text(paper: Any) -> str:
+    """Embedding text of a PaperBase-like object."""
+    return f"{paper.title}\n\n{paper.abstract or ''}"
+
+
+def paper_payload(paper: Any) -> Dict[str, Any]:
+    return {
+        "paper_id": paper.id,
+        "title": paper.title,
+        "abstract": paper.abstract or "",
+        "authors": paper.authors if paper.authors else [],
+        "year": paper.year,
+        "citations": paper.citations,
+        "content_hash": hashlib.sha256(paper_text(paper).encode()).hexdigest(),
+        "source": "rag_index",
+        "indexed_at": int(time.time()),
+    }
+
+
+class EmbeddingQueueFull(Exception):
+    """Raised when the embedding pool is saturated for longer than EMBEDDING_QUEUE_TIMEOUT_SECONDS."""
+
+
 class VectorStore:
+    """
+    Async Qdrant store. Encoding runs on a dedicated thread pool (torch
+    releases the GIL during the forward pass) and at most
+    EMBEDDING_MAX_PENDING encode jobs may be queued or running at once;
+    callers beyond that wait, then get EmbeddingQueueFull. Small requests
+    from concurrent callers are coalesced into shared forward passes by an
+    EmbeddingBatcher.
+    """
+
     def __init__(self):
-        self._client = None
+        self._client: Optional[AsyncQdrantClient] = None
         self._embedding_model = None
         self.collection_name = settings.QDRANT_COLLECTION
+        self.papers_collection = settings.QDRANT_PAPERS_COLLECTION
+        self.documents_collection = settings.QDRANT_DOCUMENTS_COLLECTION
         self._initialized = False
+        # Collections known to carry KEYWORD_VECTOR (older ones need a reindex)
+        self._keyword_collections = set()
+        self._warm = False
+        self._warmup_error: Optional[str] = None
+        self._warmup_seconds: Optional[float] = None
+        self._init_lock = asyncio.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.EMBEDDING_WORKERS, thread_name_prefix="embedding"
+        )
+        self._pending = asyncio.Semaphore(settings.EMBEDDING_MAX_PENDING)
+        self._batcher = EmbeddingBatcher(
+            self._encode_on_pool,
+            max_batch_size=settings.EMBEDDING_MICROBATCH_MAX_SIZE,
+            max_wait_ms=settings.EMBEDDING_MICROBATCH_MAX_WAIT_MS,
+        )
 
-    def _ensure_initialized(self):
+    async def _ensure_initialized(self):
         if self._initialized:
             return
-        logger.info(f"Initializing VectorStore with collection: {self.collection_name}")
-        try:
-            if settings.HF_TOKEN:
-                os.environ["HF_TOKEN"] = settings.HF_TOKEN
-                logger.info("HF_TOKEN set for authenticated requests.")
+        async with self._init_lock:
+            if self._initialized:
+                return
+            logger.info(f"Initializing VectorStore with collection: {self.collection_name}")
+            try:
+                if settings.HF_TOKEN:
+                    os.environ["HF_TOKEN"] = settings.HF_TOKEN
+                    logger.info("HF_TOKEN set for authenticated requests.")
+
+                if self._client is None:  # kept across retries after a failed model load
+                    self._client = AsyncQdrantClient(
+                        url=settings.QDRANT_URL,
+                        api_key=settings.QDRANT_API_KEY
+                    )
+                logger.info(f"Loading embedding model ({settings.EMBEDDING_BACKEND})...")
+                loop = asyncio.get_running_loop()
+                self._embedding_model = await loop.run_in_executor(self._executor, load_embedding_model)
+                await self._init_collections()
+                self._initialized = True
+                logger.info("VectorStore initialization complete.")
+            except Exception as e:
+                logger.error(f"Failed to initialize VectorStore: {str(e)}")
+                raise
 
-            self._client = QdrantClient(
-                url=settings.QDRANT_URL,
-                api_key=settings.QDRANT_API_KEY
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self._embedding_model.encode(
+            texts,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts on the embedding pool. Returns a (len(texts), dim)
+        float32 array of L2-normalized rows. Requests smaller than
+        EMBEDDING_MICROBATCH_MAX_SIZE are coalesced with concurrent ones.
+        """
+        await self._ensure_initialized()
+        if settings.EMBEDDING_MICROBATCH_MAX_WAIT_MS > 0 and len(texts) < self._batcher.max_batch_size:
+            return await self._batcher.submit(texts)
+        return await self._encode_on_pool(texts)
+
+    async def _encode_on_pool(self, texts: List[str]) -> np.ndarray:
+        try:
+            await asyncio.wait_for(
+                self._pending.acquire(), timeout=settings.EMBEDDING_QUEUE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            raise EmbeddingQueueFull(
+                f"{settings.EMBEDDING_MAX_PENDING} embedding jobs already pending"
             )
-            logger.info("Loading embedding model...")
-            self._embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
-            self._init_collection()
-            self._initialized = True
-            logger.info("VectorStore initialization complete.")
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._encode, texts)
+        finally:
+            self._pending.release()
+
+    async def warm_up(self) -> bool:
+        """
+        Load the model, run one encode (the first forward pass is much
+        slower than the rest) and check the collection is reachable, so the
+        first real request doesn't pay for it. Errors are recorded for
+        status() and logged; the store still initializes lazily later.
+        Only a successful warm-up marks the store ready, and it may be
+        called again after a failure (main.py retries it with backoff).
+        """
+        start = time.time()
+        try:
+            await self._ensure_initialized()
+            await self._encode_on_pool(["warm-up"])
+            for name in self.collection_schemas():
+                await self._client.get_collection(name)
         except Exception as e:
-            logger.error(f"Failed to initialize VectorStore: {str(e)}")
-            raise
+            self._warm = False
+            self._warmup_error = str(e)
+            logger.error(f"Vector store warm-up failed: {e}")
+            return False
+        self._warm = True
+        self._warmup_error = None
+        self._warmup_seconds = round(time.time() - start, 2)
+        logger.info(f"Vector store warm in {self._warmup_seconds}s")
+        return True
 
-    @property
-    def client(self):
-        self._ensure_initialized()
-        return self._client
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self._warm,
+            "model_loaded": self._initialized,
+            "backend": settings.EMBEDDING_BACKEND,
+            "warmup_seconds": self._warmup_seconds,
+            "error": self._warmup_error,
+        }
 
-    @property
-    def embedding_model(self):
-        self._ensure_initialized()
-        return self._embedding_model
-    
-    def _init_collection(self):
-        """Initialize collection if it doesn't exist."""
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def collection_schemas(self) -> Dict[str, Dict[str, Any]]:
+        """Collection → payload indexes; filters on these fields use the index instead of a scan."""
+        tenant = KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+        return {
+            # Private saved queries, partitioned by user
+            self.collection_name: {
+                "user_id": tenant,
+                "indexed_at": IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=False, range=True),
+            },
+            # Shared paper corpus behind RAG; keyword ranking uses its KEYWORD_VECTOR
+            self.papers_collection: {
+                "paper_id": PayloadSchemaType.KEYWORD,
+                "year": IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=True, range=True),
+                "indexed_at": IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=False, range=True),
+            },
+            # Uploaded documents, private to the uploader or shared with a project
+            self.documents_collection: {
+                "user_id": tenant,
+                "project_id": IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=True, range=False),
+                "document_id": PayloadSchemaType.KEYWORD,
+                "indexed_at": IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=False, range=True),
+            },
+        }
+
+    def _vector_size(self) -> int:
+        get_dimension = getattr(self._embedding_model, "get_sentence_embedding_dimension", None)
+        return (get_dimension() if get_dimension else None) or 384  # all-MiniLM-L6-v2 dimension
+
+    async def ensure_collection(self, name: str, indexes: Dict[str, Any], keyword_vector: bool = False):
+        """
+        Create `name` if missing (a collection or an alias) and any missing
+        payload indexes. With keyword_vector, new collections also get the
+        IDF-weighted sparse KEYWORD_VECTOR; an existing collection without
+        it keeps working dense-only until it is reindexed.
+        """
+        if not await self._client.collection_exists(name):
+            logger.info(f"Creating collection: {name}")
+            await self._client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(size=self._vector_size(), distance=Distance.COSINE),
+                sparse_vectors_config=(
+                    {KEYWORD_VECTOR: SparseVectorParams(modifier=Modifier.IDF)} if keyword_vector else None
+                ),
+            )
+        info = await self._client.get_collection(name)
+        if keyword_vector and not await self._has_keyword_vector(name, info):
+            logger.warning(
+                f"Collection '{name}' has no '{KEYWORD_VECTOR}' vector; keyword ranking is off "
+                f"until it is reindexed (python -m app.services.reindex papers)"
+            )
+        existing = info.payload_schema or {}
+        for field, schema in indexes.items():
+            if field not in existing:
+                logger.info(f"Creating payload index {name}.{field}")
+                await self._client.create_payload_index(
+                    collection_name=name, field_name=field, field_schema=schema
+                )
+
+    async def _init_collections(self):
+        """Create missing collections and payload indexes (existing points are indexed in place)."""
+        for name, indexes in self.collection_schemas().items():
+            try:
+                await self.ensure_collection(name, indexes, keyword_vector=name == self.papers_collection)
+            except Exception as e:
+                logger.error(f"Error checking/creating collection {name}: {str(e)}")
+
+    async def _has_keyword_vector(self, name: str, info: Any = None) -> bool:
+        # Only positive answers are cached: a reindex can add the vector behind an alias
+        if name in self._keyword_collections:
+            return True
         try:
-            collections = self._client.get_collections().collections
-            if not any(c.name == self.collection_name for c in collections):
-                logger.info(f"Creating collection: {self.collection_name}")
-                self._client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=384,  # all-MiniLM-L6-v2 dimension
-                        distance=Distance.COSINE
+            info = info or await self._client.get_collection(name)
+        except Exception as e:
+            logger.debug(f"Could not read config of '{name}': {e}")
+            return False
+        if KEYWORD_VECTOR in (info.config.params.sparse_vectors or {}):
+            self._keyword_collections.add(name)
+            return True
+        return False
+
+    @staticmethod
+    def paper_vector(embedding: np.ndarray, text: str, keyword_vector: bool = True) -> Any:
+        """Vector(s) of a paper point: the dense embedding, plus its BM25 weights when the collection has them."""
+        if not keyword_vector:
+            return embedding.tolist()
+        indices, values = hybrid_retrieval.bm25_document_vector(text)
+        return {"": embedding.tolist(), KEYWORD_VECTOR: SparseVector(indices=indices, values=values)}
+
+    @staticmethod
+    def _dense_vector(point: Any) -> np.ndarray:
+        vector = point.vector.get("") if isinstance(point.vector, dict) else point.vector
+        return np.asarray(vector, dtype=np.float32)
+
+    @staticmethod
+    def _document_filter(user_id: str, project_id: Optional[int] = None) -> Filter:
+        """Documents the user uploaded, plus the project's shared material when a project is given."""
+        owner = FieldCondition(key="user_id", match=MatchValue(value=str(user_id)))
+        if project_id is None:
+            return Filter(must=[owner])
+        return Filter(should=[owner, FieldCondition(key="project_id", match=MatchValue(value=project_id))])
+
+    async def index_document(
+        self,
+        user_id: str,
+        document_id: str,
+        filename: str,
+        text: str,
+        project_id: Optional[int] = None,
+    ) -> int:
+        """
+        Chunk an uploaded document (token-aware, overlapping), embed the
+        chunks in batches and store them in the documents collection under
+        the uploader's user_id and `document_id` (the file's CID), shared
+        with `project_id` when given. Calling it again only embeds chunks
+        that are missing or were indexed from different text or chunk
+        settings (e.g. after a crash mid-way), and adds a new project_id to
+        the projects the document is already shared with. Returns the number
+        of chunks stored.
+        """
+        await self._ensure_initialized()
+        target = self.documents_collection
+
+        chunks = chunk_text(
+            text,
+            max_tokens=settings.DOCUMENT_CHUNK_TOKENS,
+            overlap=settings.DOCUMENT_CHUNK_OVERLAP,
+            tokenizer=getattr(self._embedding_model, "tokenizer", None),
+        )
+        if not chunks:
+            return 0
+
+        content_hash = hashlib.sha256(
+            f"{settings.DOCUMENT_CHUNK_TOKENS}/{settings.DOCUMENT_CHUNK_OVERLAP}\n{text}".encode()
+        ).hexdigest()
+        point_ids = [
+            str(uuid.uuid5(uuid.NAMESPACE_URL, f"{user_id}/{document_id}#{i}")) for i in range(len(chunks))
+        ]
+        stored = {
+            str(r.id): r.payload or {}
+            for r in await self._client.retrieve(
+                collection_name=target,
+                ids=point_ids,
+                with_payload=["content_hash", "project_id"],
+                with_vectors=False,
+            )
+        }
+        current = [pid for pid in point_ids if stored.get(pid, {}).get("content_hash") == content_hash]
+        missing = [i for i, pid in enumerate(point_ids) if pid not in current]
+
+        # project_id holds every project the document is shared with (a match on any one hits)
+        projects = {project_id} if project_id is not None else set()
+        for pid in current:
+            value = stored[pid].get("project_id")
+            projects.update(value if isinstance(value, list) else [value] if value is not None else [])
+        projects = sorted(projects)
+        if current and any(stored[pid].get("project_id") != projects for pid in current):
+            await self._client.set_payload(
+                collection_name=target,
+                payload={"project_id": projects, "indexed_at": int(time.time())},
+                points=current,
+            )
+        if not missing:
+            logger.info(f"Document {document_id} already indexed ({len(chunks)} chunks)")
+            return len(chunks)
+
+        start_time = time.time()
+        batch = settings.EMBEDDING_BATCH_SIZE
+        for offset in range(0, len(missing), batch):
+            part = missing[offset:offset + batch]
+            embeddings = await self.embed([chunks[i] for i in part])
+            await self._client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(
+                        id=point_ids[i],
+                        vector=embedding.tolist(),
+                        payload={
+                            "user_id": str(user_id),
+                            "project_id": projects,
+                            "document_id": document_id,
+                            "filename": filename,
+                            "chunk_index": i,
+                            "text": chunks[i],
+                            "content_hash": content_hash,
+                            "indexed_at": int(time.time()),
+                        },
                     )
-                )
+                    for i, embedding in zip(part, embeddings)
+                ],
+            )
+        # Chunks left over from a different text or chunking (e.g. a longer previous version)
+        await self._client.delete(
+            collection_name=target,
+            points_selector=FilterSelector(filter=Filter(
+                must=[
+                    FieldCondition(key="user_id", match=MatchValue(value=str(user_id))),
+                    FieldCondition(key="document_id", match=MatchValue(value=document_id)),
+                ],
+                must_not=[FieldCondition(key="content_hash", match=MatchValue(value=content_hash))],
+            )),
+        )
+        logger.info(
+            f"Indexed {len(missing)} of {len(chunks)} chunks of {filename} ({document_id}) "
+            f"for user {user_id} in {time.time() - start_time:.2f}s"
+        )
+        return len(chunks)
+
+    async def retrieve_document_context(
+        self,
+        user_id: str,
+        document_ids: List[str],
+        query: str,
+        k: int = None,
+        project_id: Optional[int] = None,
+    ) -> str:
+        """
+        Most relevant chunks of the given uploaded documents, formatted for
+        the chat prompt. Only the user's own documents match, plus the
+        project's shared ones when the caller has checked membership of
+        `project_id`. By default as many chunks as fit the
+        DOCUMENT_CHAT_CONTEXT_TOKENS budget are returned, so callers should
+        not truncate the result.
+        """
+        if not document_ids:
+            return ""
+        await self._ensure_initialized()
+        try:
+            embedding = (await self.embed([query]))[0].tolist()
+            hits = (await self._client.query_points(
+                collection_name=self.documents_collection,
+                query=embedding,
+                query_filter=Filter(must=[
+                    FieldCondition(key="document_id", match=MatchAny(any=list(document_ids))),
+                    self._document_filter(user_id, project_id),
+                ]),
+                limit=k or max(1, settings.DOCUMENT_CHAT_CONTEXT_TOKENS // settings.DOCUMENT_CHUNK_TOKENS),
+            )).points
         except Exception as e:
-            logger.error(f"Error checking/creating collection: {str(e)}")
+            logger.warning(f"Document retrieval failed for user {user_id}: {e}")
+            return ""
+        # Present chunks in reading order rather than score order
+        hits.sort(key=lambda h: (h.payload.get("filename", ""), h.payload.get("chunk_index", 0)))
+        return "\n\n".join(
+            f"[{h.payload.get('filename', 'document')} — part {h.payload.get('chunk_index', 0) + 1}]\n"
+            f"{h.payload.get('text', '')}"
+            for h in hits
+        )
     
-    def add_query(
+    async def add_query(
         self,
         query_id: str,
         query_text: str,
         answer: str,
         metadata: Dict[str, Any]
     ) -> str:
+        """
+        Embed and upsert a saved query; saving the same query_id again replaces it.
+        The string id is stored as `vector_id`; `metadata` cannot override it,
+        `text` or `indexed_at`.
+        """
         start_time = time.time()
         combined_text = f"{query_text}\n\n{answer}"
         
         try:
-            embedding = self.embedding_model.encode(combined_text).tolist()
+            embedding = (await self.embed([combined_text]))[0].tolist()
             
             point = PointStruct(
-                id=str(uuid.uuid4()),
+                id=query_point_id(query_id),
                 vector=embedding,
                 payload={
-                    "query_id": query_id,
+                    **metadata,
+                    "vector_id": query_id,
                     "text": combined_text,
-                    **metadata
+                    "indexed_at": int(time.time()),
                 }
             )
             
-            self.client.upsert(
+            await self._client.upsert(
                 collection_name=self.collection_name,
                 points=[point]
             )
@@ -101,36 +518,35 @@ class VectorStore:
             logger.error(f"Failed to add query {query_id} to vector store: {str(e)}")
             raise
     
-    def search_similar(
+    async def search_similar(
         self,
         query: str,
         k: int = 5,
-        user_id: Optional[int] = None
+        user_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         start_time = time.time()
         logger.info(f"Searching for similar queries to: '{query}'")
         
         try:
-            embedding = self.embedding_model.encode(query).tolist()
+            embedding = (await self.embed([query]))[0].tolist()
             
             query_filter = None
             if user_id:
-                from qdrant_client.models import Filter, FieldCondition, MatchValue
                 query_filter = Filter(
                     must=[FieldCondition(key="user_id", match=MatchValue(value=user_id))]
                 )
             
-            results = self.client.search(
+            results = (await self._client.query_points(
                 collection_name=self.collection_name,
-                query_vector=embedding,
+                query=embedding,
                 limit=k,
                 query_filter=query_filter
-            )
+            )).points
             
             similar_queries = []
             for result in results:
                 similar_queries.append({
-                    'id': result.payload.get('query_id'),
+                    'id': result.payload.get('vector_id'),
                     'distance': 1 - result.score,  # Convert similarity to distance
                     'metadata': result.payload,
                     'document': result.payload.get('text', '')
@@ -143,15 +559,12 @@ class VectorStore:
             logger.error(f"Vector search failed: {str(e)}")
             return []
     
-    def delete_query(self, query_id: str) -> bool:
+    async def delete_query(self, query_id: str) -> bool:
         try:
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
-            
-            self.client.delete(
+            await self._ensure_initialized()
+            await self._client.delete(
                 collection_name=self.collection_name,
-                points_selector=Filter(
-                    must=[FieldCondition(key="query_id", match=MatchValue(value=query_id))]
-                )
+                points_selector=PointIdsList(points=[query_point_id(query_id)])
             )
             logger.info(f"Deleted query {query_id} from vector store")
             return True
@@ -159,7 +572,7 @@ class VectorStore:
             logger.error(f"Failed to delete query {query_id} from vector store: {str(e)}")
             return False
     
-    def update_query(
+    async def update_query(
         self,
         query_id: str,
         query_text: str,
@@ -168,56 +581,135 @@ class VectorStore:
     ) -> bool:
         try:
             logger.info(f"Updating query {query_id} in vector store")
-            self.delete_query(query_id)
-            self.add_query(query_id, query_text, answer, metadata)
+            # Same point id, so the upsert replaces the old vector in one call
+            await self.add_query(query_id, query_text, answer, metadata)
             return True
         except Exception as e:
             logger.error(f"Failed to update query {query_id} in vector store: {str(e)}")
             return False
     
-    def index_papers(self, papers: List[Any], collection_name: str = None) -> int:
+    async def update_query_metadata(self, query_id: str, metadata: Dict[str, Any]) -> bool:
+        """Patch payload fields (title, tags) of a saved query without re-embedding it."""
+        try:
+            await self._ensure_initialized()
+            await self._client.set_payload(
+                collection_name=self.collection_name,
+                payload={**metadata, "indexed_at": int(time.time())},
+                points=[query_point_id(query_id)],
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update metadata of query {query_id} in vector store: {str(e)}")
+            return False
+
+    async def _existing_hashes(self, target: str, point_ids: List[str]) -> Dict[str, str]:
+        """point id → content_hash for the ids already stored in `target`."""
+        try:
+            records = await self._client.retrieve(
+                collection_name=target,
+                ids=point_ids,
+                with_payload=["content_hash"],
+                with_vectors=False,
+            )
+        except Exception as e:
+            logger.warning(f"Qdrant lookup of existing papers failed, re-embedding all: {e}")
+            return {}
+        return {str(r.id): (r.payload or {}).get("content_hash") for r in records}
+
+    async def _touch(self, target: str, point_ids: List[str]):
+        try:
+            await self._client.set_payload(
+                collection_name=target, payload={"indexed_at": int(time.time())}, points=point_ids
+            )
+        except Exception as e:
+            logger.debug(f"Could not refresh indexed_at in '{target}': {e}")
+
+    async def cleanup_stale_papers(self, days: int) -> int:
+        """
+        Delete papers not indexed or re-requested for `days` days from the
+        shared corpus (private queries and documents are never aged out),
+        plus pre-namespace rag_index points left in the queries collection.
+        Returns the number of points deleted.
+        """
+        await self._ensure_initialized()
+        cutoff = int(time.time()) - days * 86400
+        stale = Filter(should=[
+            FieldCondition(key="indexed_at", range=Range(lt=cutoff)),
+            IsEmptyCondition(is_empty=PayloadField(key="indexed_at")),
+        ])
+        legacy = Filter(must=[FieldCondition(key="source", match=MatchValue(value="rag_index"))])
+        deleted = 0
+        for target, condition in ((self.papers_collection, stale), (self.collection_name, legacy)):
+            count = (await self._client.count(target, count_filter=condition, exact=True)).count
+            if count:
+                await self._client.delete(collection_name=target, points_selector=FilterSelector(filter=condition))
+                logger.info(f"Deleted {count} stale points from '{target}'")
+            deleted += count
+        return deleted
+
+    async def index_papers(self, papers: List[Any], collection_name: str = None) -> int:
         """
         Embed and upsert a list of PaperBase objects into Qdrant.
-        Returns the number of successfully indexed papers.
+        Returns the number of papers present in the collection afterwards.
         Uses the paper's abstract + title as the embedding text.
-        Idempotent — uses paper.id as the point ID prefix so re-indexing is safe.
+        Idempotent — point IDs are uuid5(paper.id), and papers whose stored
+        content_hash matches the current title + abstract are not re-embedded.
         """
-        self._ensure_initialized()
-        target = collection_name or self.collection_name
-        indexed = 0
-        points = []
-        for paper in papers:
-            try:
-                text = f"{paper.title}\n\n{paper.abstract or ''}"
-                embedding = self.embedding_model.encode(text).tolist()
-                authors = paper.authors if paper.authors else []
-                point = PointStruct(
-                    id=str(uuid.uuid5(uuid.NAMESPACE_URL, paper.id)),
-                    vector=embedding,
-                    payload={
-                        "paper_id": paper.id,
-                        "title": paper.title,
-                        "abstract": paper.abstract or "",
-                        "authors": authors,
-                        "year": paper.year,
-                        "citations": paper.citations,
-                        "source": "rag_index",
-                    },
-                )
-                points.append(point)
-                indexed += 1
-            except Exception as e:
-                logger.warning(f"Failed to embed paper {getattr(paper, 'id', '?')}: {e}")
-        if points:
-            try:
-                self.client.upsert(collection_name=target, points=points)
-                logger.info(f"Indexed {len(points)} papers into '{target}'")
-            except Exception as e:
-                logger.error(f"Qdrant upsert failed: {e}")
-                return 0
-        return indexed
+        await self._ensure_initialized()
+        target = collection_name or self.papers_collection
+        # Last occurrence wins for duplicate ids, as it would with upsert
+        by_id = {paper_point_id(paper.id): paper for paper in papers}
+        if not by_id:
+            return 0
 
-    def retrieve_rag_context(
+        payloads = {pid: paper_payload(paper) for pid, paper in by_id.items()}
+        existing = await self._existing_hashes(target, list(by_id))
+        missing = [pid for pid in by_id if existing.get(pid) != payloads[pid]["content_hash"]]
+        present = [pid for pid in by_id if pid not in missing]
+        if present:
+            # Keep papers that are still being used from aging out (cleanup_stale_papers)
+            await self._touch(target, present)
+        if not missing:
+            logger.info(f"All {len(by_id)} papers already indexed in '{target}'")
+            return len(by_id)
+
+        texts = [paper_text(by_id[pid]) for pid in missing]
+        try:
+            embeddings = await self.embed(texts)
+        except Exception as e:
+            logger.warning(f"Failed to embed {len(missing)} papers: {e}")
+            return len(by_id) - len(missing)
+        keyword_vector = await self._has_keyword_vector(target)
+        points = [
+            PointStruct(id=pid, vector=self.paper_vector(embedding, text, keyword_vector), payload=payloads[pid])
+            for pid, embedding, text in zip(missing, embeddings, texts)
+        ]
+        try:
+            await self._client.upsert(collection_name=target, points=points)
+            logger.info(
+                f"Indexed {len(points)} papers into '{target}' "
+                f"({len(by_id) - len(points)} already present)"
+            )
+        except Exception as e:
+            logger.error(f"Qdrant upsert failed: {e}")
+            return len(by_id) - len(missing)
+        return len(by_id)
+
+    async def _keyword_candidates(self, target: str, query: str, limit: int) -> List[Any]:
+        """Best BM25 matches for the query across the whole collection (empty before a reindex)."""
+        indices, values = hybrid_retrieval.bm25_query_vector(query)
+        if not indices or not await self._has_keyword_vector(target):
+            return []
+        return (await self._client.query_points(
+            collection_name=target,
+            query=SparseVector(indices=indices, values=values),
+            using=KEYWORD_VECTOR,
+            limit=limit,
+            with_payload=True,
+            with_vectors=True,
+        )).points
+
+    async def retrieve_rag_context(
         self,
         query: str,
         k: int = 5,
@@ -227,41 +719,70 @@ class VectorStore:
         """
         Retrieve top-k most relevant paper chunks for a query and return
         them as a formatted context string ready to prepend to synthesis.
+
+        The nearest dense neighbours (above score_threshold) and the best BM25
+        matches in the collection form a candidate pool that is ranked by
+        reciprocal rank fusion of the two orders, then diversified with MMR
+        (see hybrid_retrieval).
         """
-        self._ensure_initialized()
-        target = collection_name or self.collection_name
+        await self._ensure_initialized()
+        target = collection_name or self.papers_collection
         try:
-            embedding = self.embedding_model.encode(query).tolist()
-            results = self.client.search(
-                collection_name=target,
-                query_vector=embedding,
-                limit=k,
-                score_threshold=score_threshold,
+            query_vector = (await self.embed([query]))[0]
+            pool = max(k, settings.RAG_CANDIDATES)
+            dense, keyword = await asyncio.gather(
+                self._client.query_points(
+                    collection_name=target,
+                    query=query_vector.tolist(),
+                    limit=pool,
+                    score_threshold=score_threshold,
+                    with_vectors=True,
+                ),
+                self._keyword_candidates(target, query, pool),
             )
-            if not results:
+            candidates = {str(hit.id): hit for hit in dense.points}
+            for hit in keyword:
+                candidates.setdefault(str(hit.id), hit)
+            if not candidates:
                 return ""
+
+            ids = list(candidates)
+            vectors = {pid: self._dense_vector(candidates[pid]) for pid in ids}
+            cosine = {pid: float(vectors[pid] @ query_vector) for pid in ids}
+            fused = hybrid_retrieval.reciprocal_rank_fusion(
+                [[str(hit.id) for hit in dense.points], [str(hit.id) for hit in keyword]],
+                k=settings.RAG_RRF_K,
+            )
+            ranked = sorted(fused, key=lambda pid: (fused[pid], cosine[pid]), reverse=True)
+            chosen = hybrid_retrieval.mmr(ranked, fused, vectors, k, settings.RAG_MMR_LAMBDA)
+
             context_parts = []
-            for i, hit in enumerate(results, 1):
-                p = hit.payload
+            for i, pid in enumerate(chosen, 1):
+                p = candidates[pid].payload
                 authors = ", ".join(p.get("authors", [])[:3]) or "Unknown"
                 context_parts.append(
                     f"[RAG-{i}] {p.get('title', 'Untitled')} "
                     f"({p.get('year', '?')}) — {authors}\n"
                     f"{p.get('abstract', '')[:800]}"
                 )
-            logger.info(f"RAG retrieved {len(results)} chunks for query '{query[:60]}'")
+            logger.info(
+                f"RAG retrieved {len(chosen)} of {len(candidates)} candidates "
+                f"({len(dense.points)} dense, {len(keyword)} keyword) for query '{query[:60]}'"
+            )
             return "\n\n".join(context_parts)
         except Exception as e:
             logger.warning(f"RAG retrieval failed: {e}")
             return ""
 
-    def get_collection_stats(self) -> Dict[str, Any]:
+    async def get_collection_stats(self) -> Dict[str, Any]:
         try:
-            info = self.client.get_collection(self.collection_name)
+            await self._ensure_initialized()
+            info = await self._client.get_collection(self.collection_name)
             return {
                 "total_queries": info.points_count,
                 "embedding_dimension": 384,
-                "model": settings.EMBEDDING_MODEL
+                "model": settings.EMBEDDING_MODEL,
+                "backend": settings.EMBEDDING_BACKEND,
             }
         except Exception as e:
             logger.error(f"Failed to get collection stats: {str(e)}")
@@ -0,0 +1,68 @@
+"""
+Compare cache codecs on a 50-paper search result.
+
+    python benchmark_cache_serialization.py
+
+Reports bytes stored in Redis, encode/decode time per codec, and the cost of
+rebuilding PaperBase objects from cached dicts (per-paper validation,
+model_construct, and one TypeAdapter call for the whole list — the path
+providers use).
+"""
+import os
+import time
+from typing import List
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENALEX_EMAIL", "benchmark@example.com")
+
+from app.core.serialization import Codec, available_serializers, zstandard
+from app.models.schemas import PaperBase
+from pydantic import TypeAdapter
+
+ITERATIONS = 2000
+
+PAPERS = [
+    PaperBase(
+        id=f"https://openalex.org/W{4000000000 + i}",
+        title=f"Community health worker interventions for malaria control in East Africa ({i})",
+        year=2015 + i % 10,
+        citations=i * 7,
+        abstract=("Background: Malaria remains a leading cause of morbidity in sub-Saharan Africa. " * 19)[:1500],
+        authors=["Achieng Otieno", "Baraka Mwangi", "Chinwe Okafor", "Dawit Bekele"],
+    ).model_dump()
+    for i in range(50)
+]
+
+
+def bench(fn):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    codecs = [Codec(name) for name in available_serializers()]
+    if zstandard is not None:
+        codecs += [Codec(name, compression="zstd") for name in available_serializers()]
+
+    print(f"{'codec':<16}{'bytes':>10}{'encode µs':>12}{'decode µs':>12}")
+    for codec in codecs:
+        payload = codec.dumps(PAPERS)
+        encode = bench(lambda: codec.dumps(PAPERS))
+        decode = bench(lambda: codec.loads(payload))
+        print(f"{codec.name:<16}{len(payload):>10}{encode:>12.1f}{decode:>12.1f}")
+
+    adapter = TypeAdapter(List[PaperBase])
+    print()
+    print(f"{'rebuild 50 papers':<36}{'µs':>8}")
+    for label, fn in [
+        ("PaperBase(**p)", lambda: [PaperBase(**p) for p in PAPERS]),
+        ("PaperBase.model_construct(**p)", lambda: [PaperBase.model_construct(**p) for p in PAPERS]),
+        ("TypeAdapter(List[PaperBase])", lambda: adapter.validate_python(PAPERS)),
+    ]:
+        print(f"{label:<36}{bench(fn):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
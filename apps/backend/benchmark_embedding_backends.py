@@ -0,0 +1,91 @@
+"""
+Compare embedding backends (EMBEDDING_BACKEND) on a fixed set of abstracts.
+
+    pip install "sentence-transformers[onnx]"
+    python benchmark_embedding_backends.py
+
+For each of torch / onnx / onnx-int8 reports load time, single-query latency,
+throughput for the whole corpus in one batch, and accuracy against the torch
+embeddings: mean and worst cosine similarity of the same text across
+backends, and how many of each query's top-3 abstracts match torch's top-3.
+"""
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENALEX_EMAIL", "benchmark@example.com")
+
+import numpy as np
+
+from app.services.vector_service import EMBEDDING_BACKENDS, load_embedding_model
+
+REPEATS = 20
+
+ABSTRACTS = [
+    "Community health workers delivered rapid diagnostic tests and artemisinin combination therapy in rural Kenya, reducing malaria mortality in children under five by 31%.",
+    "Insecticide-treated bed nets remain effective despite emerging pyrethroid resistance in Anopheles gambiae populations across West Africa.",
+    "We evaluate mobile money adoption among smallholder farmers in Tanzania and its effect on household consumption smoothing after weather shocks.",
+    "A randomized trial of unconditional cash transfers in Uganda shows persistent gains in business assets and earnings four years after disbursement.",
+    "Drought-tolerant maize varieties increased yields by 15% in semi-arid Ethiopia, with larger effects on plots managed by female farmers.",
+    "Satellite imagery and machine learning predict village-level poverty in Nigeria with accuracy comparable to household surveys.",
+    "Solar mini-grids in rural Rwanda raised evening study time for secondary school students but had no measurable effect on test scores.",
+    "Transformer language models fine-tuned on Swahili news improve named-entity recognition over multilingual baselines by eight F1 points.",
+    "We characterise antimicrobial resistance in Klebsiella pneumoniae isolates from neonatal intensive care units in Ghana and Malawi.",
+    "Tuberculosis case finding with portable chest X-ray and computer-aided detection doubled diagnoses in informal settlements of Nairobi.",
+    "Groundwater depletion in the Nile Delta is linked to expanding irrigation and rising salinity, threatening rice production.",
+    "An agent-based model of urban informal transport in Lagos reproduces observed congestion patterns and evaluates bus rapid transit scenarios.",
+    "Maternal HIV viral suppression during breastfeeding under Option B+ reduced vertical transmission to below 1% in Zimbabwe.",
+    "Cassava brown streak disease spreads via whitefly vectors; resistant cultivars limit yield losses in Mozambique field trials.",
+    "Deforestation in the Congo Basin accelerated after 2015, driven primarily by smallholder agriculture rather than industrial logging.",
+    "Teacher coaching combined with structured lesson plans improved early-grade reading fluency in Kenyan public schools at scale.",
+]
+
+QUERIES = [
+    "malaria prevention in children",
+    "cash transfers and household income",
+    "crop yields under drought",
+    "tuberculosis screening",
+    "natural language processing for African languages",
+    "literacy interventions in primary schools",
+]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def encode(model, texts):
+    return model.encode(texts, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False)
+
+
+def top3(query_vectors, doc_vectors):
+    return [set(np.argsort(-scores)[:3]) for scores in query_vectors @ doc_vectors.T]
+
+
+def main():
+    reference = None
+    print(f"{'backend':<12}{'load s':>8}{'query ms':>10}{'docs/s':>9}{'mean cos':>10}{'min cos':>9}{'top-3':>8}")
+    for backend in EMBEDDING_BACKENDS:
+        model, load = timed(lambda: load_embedding_model(backend))
+        encode(model, QUERIES)  # warm-up
+
+        _, single = timed(lambda: [encode(model, [QUERIES[0]]) for _ in range(REPEATS)])
+        docs, batch = timed(lambda: encode(model, ABSTRACTS))
+        queries = encode(model, QUERIES)
+
+        if reference is None:
+            reference = (docs, top3(queries, docs))
+        ref_docs, ref_top = reference
+        cosines = np.sum(docs * ref_docs, axis=1)
+        overlap = sum(len(a & b) for a, b in zip(top3(queries, docs), ref_top)) / (3 * len(QUERIES))
+
+        print(
+            f"{backend:<12}{load:>8.2f}{single / REPEATS * 1000:>10.2f}{len(ABSTRACTS) / batch:>9.1f}"
+            f"{cosines.mean():>10.4f}{cosines.min():>9.4f}{overlap:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Per-paper vs batched embedding throughput for VectorStore.index_papers.
+
+    python benchmark_embeddings.py [--batch-size 64]
+
+Encodes 10, 50 and 500 synthetic papers (title + ~1500-char abstract, the
+text index_papers embeds) with EMBEDDING_MODEL on CPU, once with one
+encode() call per paper (the old loop) and once with a single batched call
+(VectorStore.embed), and reports papers/sec for each.
+
+It then fires 200 concurrent single-query embed requests (the shape of
+search_similar / retrieve_rag_context traffic) at a 2-thread pool, once
+directly and once through EmbeddingBatcher, and reports requests/sec.
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENALEX_EMAIL", "benchmark@example.com")
+
+from sentence_transformers import SentenceTransformer
+
+from app.core.config import settings
+from app.services.embedding_batcher import EmbeddingBatcher
+
+SIZES = [10, 50, 500]
+CONCURRENT_REQUESTS = 200
+
+TEXTS = [
+    f"Community health worker interventions for malaria control in East Africa ({i})\n\n"
+    + ("Background: Malaria remains a leading cause of morbidity in sub-Saharan Africa. " * 19)[:1500]
+    for i in range(max(SIZES))
+]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    model = SentenceTransformer(settings.EMBEDDING_MODEL, device="cpu")
+    model.encode(TEXTS[:8])  # warm-up: first call pays for lazy initialisation
+
+    print(f"model={settings.EMBEDDING_MODEL} batch_size={args.batch_size}")
+    print(f"{'papers':>8}{'loop p/s':>12}{'batched p/s':>14}{'speedup':>10}")
+    for n in SIZES:
+        texts = TEXTS[:n]
+        loop = timed(lambda: [model.encode(t) for t in texts])
+        batched = timed(lambda: model.encode(
+            texts, batch_size=args.batch_size, normalize_embeddings=True, show_progress_bar=False
+        ))
+        print(f"{n:>8}{n / loop:>12.1f}{n / batched:>14.1f}{loop / batched:>9.1f}x")
+
+    print()
+    print(f"{CONCURRENT_REQUESTS} concurrent single-query requests")
+    print(f"{'mode':<14}{'req/s':>10}{'forward passes':>16}")
+    for mode, req_s, passes in asyncio.run(concurrent_queries(model)):
+        print(f"{mode:<14}{req_s:>10.1f}{passes:>16}")
+
+
+async def concurrent_queries(model):
+    executor = ThreadPoolExecutor(max_workers=2)
+    loop = asyncio.get_running_loop()
+    passes = 0
+
+    async def encode(texts):
+        nonlocal passes
+        passes += 1
+        return await loop.run_in_executor(
+            executor, lambda: model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+        )
+
+    queries = [f"malaria vector control strategy {i}" for i in range(CONCURRENT_REQUESTS)]
+    batcher = EmbeddingBatcher(
+        encode,
+        max_batch_size=settings.EMBEDDING_MICROBATCH_MAX_SIZE,
+        max_wait_ms=settings.EMBEDDING_MICROBATCH_MAX_WAIT_MS,
+    )
+    results = []
+    for mode, submit in [("direct", encode), ("micro-batch", batcher.submit)]:
+        passes = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(submit([q]) for q in queries))
+        results.append((mode, len(queries) / (time.perf_counter() - start), passes))
+    executor.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    main()
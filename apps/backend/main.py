@@ -1,19 +1,11 @@
-import httpx
 import time
 import traceback
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import Depends, FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
-try:
-    from slowapi import Limiter, _rate_limit_exceeded_handler
-    from slowapi.util import get_remote_address
-    from slowapi.errors import RateLimitExceeded
-    _slowapi_available = True
-except ImportError:
-    _slowapi_available = False
 
 from app.core.config import settings
 from app.core.logger import setup_logging, get_logger
@@ -24,6 +16,9 @@ from app.api import (
 )
 from app.api import ghost_profiles, bounties, sandboxes, anchors
 from app.core.cache import cache
+from app.core.http_client import http_clients
+from app.services.vector_service import vector_store
+from app.core.quotas import request_quota
 from app.db.session import AsyncSessionLocal
 from app.models.database import User
 from sqlalchemy import update
@@ -32,12 +27,6 @@ from sqlalchemy import update
 setup_logging()
 logger = get_logger("main")
 
-# Rate limiter — gracefully degraded if slowapi not installed
-if _slowapi_available:
-    limiter = Limiter(key_func=get_remote_address, default_limits=["60/minute"])
-else:
-    limiter = None
-
 
 async def _expire_subscriptions():
     """Background loop: mark expired subscriptions every hour."""
@@ -70,6 +59,15 @@ async def _expire_subscriptions():
         await asyncio.sleep(3600)  # run every hour
 
 
+async def _warm_up_vectors():
+    """Background: warm the vector store, retrying with exponential backoff until it succeeds."""
+    delay = settings.VECTOR_WARMUP_RETRY_SECONDS
+    while not await vector_store.warm_up():
+        logger.info(f"Retrying vector store warm-up in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, settings.VECTOR_WARMUP_RETRY_MAX_SECONDS)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -85,12 +83,17 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Redis cache connection failed: {e}")
 
-    # Initialize shared httpx client
-    app.state.http_client = httpx.AsyncClient(
-        timeout=httpx.Timeout(15.0),
-        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
-    )
-    logger.info("Shared HTTP client initialized.")
+    # Shared outbound HTTP pools (one per upstream host); the default pool is
+    # exposed on app.state for handlers that don't target a specific host
+    app.state.http_client = http_clients.get()
+    logger.info("Shared HTTP client pool initialized.")
+
+    # Load the embedding model and check the Qdrant collection off the request
+    # path; /ready reports 503 until this finishes
+    warmup_task = None
+    if settings.VECTOR_WARMUP_ON_STARTUP:
+        warmup_task = asyncio.create_task(_warm_up_vectors())
+        logger.info("Vector store warm-up started in the background.")
 
     # Start subscription expiry background task
     expiry_task = asyncio.create_task(_expire_subscriptions())
@@ -98,17 +101,21 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    expiry_task.cancel()
-    try:
-        await expiry_task
-    except asyncio.CancelledError:
-        pass
+    for task in (expiry_task, warmup_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
     # Shutdown
     logger.info("Shutting down application services...")
-    await app.state.http_client.aclose()
+    await http_clients.aclose()
+    await vector_store.aclose()
     await cache.disconnect()
-    logger.info("Shared HTTP client closed.")
+    logger.info("Shared HTTP client pool closed.")
 
 
 app = FastAPI(
@@ -119,11 +126,6 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# Rate limiting via slowapi
-if _slowapi_available and limiter:
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # GZip compression — compresses JSON/text responses ≥ 1 KB by ~60-80%
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
@@ -147,6 +149,9 @@ async def add_process_time_header(request: Request, call_next):
         response = await call_next(request)
         process_time = time.time() - start_time
         response.headers["X-Process-Time"] = str(process_time)
+        # Remaining quota budget recorded by app.core.quotas
+        for name, value in getattr(request.state, "quota_headers", {}).items():
+            response.headers[name] = value
         logger.info(f"Processed {request.method} {request.url} in {process_time:.4f}s - Status: {response.status_code}")
         return response
     except Exception as e:
@@ -160,7 +165,8 @@ async def add_process_time_header(request: Request, call_next):
 async def custom_http_exception_handler(request: Request, exc):
     return JSONResponse(
         status_code=exc.status_code if hasattr(exc, 'status_code') else 404,
-        content={"detail": exc.detail if hasattr(exc, 'detail') else "Resource not found"}
+        content={"detail": exc.detail if hasattr(exc, 'detail') else "Resource not found"},
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -197,26 +203,41 @@ async def health_check():
     return {
         "status": "healthy",
         "version": settings.VERSION,
-        "timestamp": time.time()
+        "timestamp": time.time(),
+        "cache": cache.stats(),
+        "vectors": vector_store.status(),
     }
 
 
-# API routes
-app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["Authentication"])
-app.include_router(research.router, prefix=f"{settings.API_V1_PREFIX}/research", tags=["Research"])
-app.include_router(recommendation.router, prefix=f"{settings.API_V1_PREFIX}/research", tags=["Recommendations"])
-app.include_router(queries.router, prefix=f"{settings.API_V1_PREFIX}/queries", tags=["Saved Queries"])
-app.include_router(notes.router, prefix=f"{settings.API_V1_PREFIX}/notes", tags=["Research Notes"])
-app.include_router(uploads.router, prefix=f"{settings.API_V1_PREFIX}/uploads", tags=["File Uploads"])
+@app.get("/ready")
+async def readiness_check():
+    """Load-balancer readiness: 503 until the vector store warm-up has finished."""
+    vectors = vector_store.status()
+    ready = vectors["ready"] or not settings.VECTOR_WARMUP_ON_STARTUP
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "warming_up", "vectors": vectors},
+    )
+
+
+# API routes — every request spends one unit of the caller's per-tier request
+# budget; billing is exempt so Paystack webhooks are never throttled
+_quota = [Depends(request_quota)]
+app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["Authentication"], dependencies=_quota)
+app.include_router(research.router, prefix=f"{settings.API_V1_PREFIX}/research", tags=["Research"], dependencies=_quota)
+app.include_router(recommendation.router, prefix=f"{settings.API_V1_PREFIX}/research", tags=["Recommendations"], dependencies=_quota)
+app.include_router(queries.router, prefix=f"{settings.API_V1_PREFIX}/queries", tags=["Saved Queries"], dependencies=_quota)
+app.include_router(notes.router, prefix=f"{settings.API_V1_PREFIX}/notes", tags=["Research Notes"], dependencies=_quota)
+app.include_router(uploads.router, prefix=f"{settings.API_V1_PREFIX}/uploads", tags=["File Uploads"], dependencies=_quota)
 app.include_router(billing.router, prefix=f"{settings.API_V1_PREFIX}/billing", tags=["Billing & Subscription"])
-app.include_router(social.router, prefix=f"{settings.API_V1_PREFIX}/social", tags=["Social Networking"])
-app.include_router(collaboration.router, prefix=f"{settings.API_V1_PREFIX}/collaboration", tags=["Collaboration"])
-app.include_router(feedback.router, prefix=f"{settings.API_V1_PREFIX}/feedback", tags=["Feedback"])
-app.include_router(ghost_profiles.router, prefix=f"{settings.API_V1_PREFIX}/ghost-profiles", tags=["Ghost Profiles"])
-app.include_router(bounties.router, prefix=f"{settings.API_V1_PREFIX}/bounties", tags=["Micro-Bounties"])
-app.include_router(sandboxes.router, prefix=f"{settings.API_V1_PREFIX}/sandboxes", tags=["Institutional Sandboxes"])
-app.include_router(anchors.router, prefix=f"{settings.API_V1_PREFIX}/anchors", tags=["Cryptographic Anchoring"])
-app.include_router(export.router, prefix=f"{settings.API_V1_PREFIX}/export", tags=["PDF Export"])
+app.include_router(social.router, prefix=f"{settings.API_V1_PREFIX}/social", tags=["Social Networking"], dependencies=_quota)
+app.include_router(collaboration.router, prefix=f"{settings.API_V1_PREFIX}/collaboration", tags=["Collaboration"], dependencies=_quota)
+app.include_router(feedback.router, prefix=f"{settings.API_V1_PREFIX}/feedback", tags=["Feedback"], dependencies=_quota)
+app.include_router(ghost_profiles.router, prefix=f"{settings.API_V1_PREFIX}/ghost-profiles", tags=["Ghost Profiles"], dependencies=_quota)
+app.include_router(bounties.router, prefix=f"{settings.API_V1_PREFIX}/bounties", tags=["Micro-Bounties"], dependencies=_quota)
+app.include_router(sandboxes.router, prefix=f"{settings.API_V1_PREFIX}/sandboxes", tags=["Institutional Sandboxes"], dependencies=_quota)
+app.include_router(anchors.router, prefix=f"{settings.API_V1_PREFIX}/anchors", tags=["Cryptographic Anchoring"], dependencies=_quota)
+app.include_router(export.router, prefix=f"{settings.API_V1_PREFIX}/export", tags=["PDF Export"], dependencies=_quota)
 
 
 @app.get("/")
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from app.core import cache as cache_module, deadline
+from app.core.cache import LocalCache, cache, cached
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(cache, "redis", client)
+    monkeypatch.setattr(cache, "raw", fakeredis.FakeAsyncRedis(server=server))
+    cache.local.clear()
+    yield client
+    cache.local.clear()
+
+
+@pytest.mark.asyncio
+async def test_entry_turns_stale_after_soft_ttl(redis, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(cache_module.time, "time", lambda: now)
+    await cache.set("s2:search:q:5", [{"id": "1"}], ttl=60, stale_ttl=600)
+
+    assert await cache.get_entry("s2:search:q:5") == ([{"id": "1"}], False)
+    assert await redis.ttl("s2:search:q:5") == 660
+
+    now += 61
+    assert await cache.get_entry("s2:search:q:5") == ([{"id": "1"}], True)
+    assert await cache.get("s2:search:q:5") == [{"id": "1"}]
+
+
+@pytest.mark.asyncio
+async def test_cached_serves_stale_and_refreshes_once(redis, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(cache_module.time, "time", lambda: now)
+    calls = []
+
+    @cached("trending", ttl=60, stale_ttl=600)
+    async def trending(field):
+        calls.append(field)
+        return len(calls)
+
+    assert await trending("health") == 1
+    now += 61
+    assert await trending("health") == 1   # stale value, refresh kicked off
+    assert await trending("health") == 1   # refresh already claimed
+    await asyncio.gather(*deadline._background_tasks)
+    assert calls == ["health", "health"]
+    assert await cache.get_entry(cache.make_key("trending", "health")) == (2, False)
+
+
+@pytest.mark.asyncio
+async def test_l1_serves_repeat_reads_and_counts_per_tier(redis):
+    await cache.set("trending:health", [1, 2, 3], ttl=60)
+    cache.local.clear()
+    before = dict(cache.counters)
+
+    assert await cache.get("trending:health") == [1, 2, 3]
+    assert await cache.get("trending:health") == [1, 2, 3]
+    assert await cache.get("missing") is None
+
+    delta = {k: cache.counters[k] - before[k] for k in before}
+    assert delta == {"l1_hits": 1, "l1_misses": 2, "l2_hits": 1, "l2_misses": 1}
+
+
+@pytest.mark.asyncio
+async def test_peer_invalidation_drops_l1_copies(redis):
+    await cache.set("openalex:search:a:10", ["a"], ttl=60)
+    await cache.set("s2:search:b:5", ["b"], ttl=60)
+
+    cache._apply_invalidation('{"origin": "other-worker", "keys": [], "pattern": "openalex:*"}')
+    assert cache.local.get("openalex:search:a:10") is None
+    assert cache.local.get("s2:search:b:5") is not None
+
+    # Our own announcements are ignored
+    cache._apply_invalidation(
+        '{"origin": "%s", "keys": ["s2:search:b:5"], "pattern": null}' % cache._instance_id
+    )
+    assert cache.local.get("s2:search:b:5") is not None
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, ttl=30)
+    local.set("a", 1, None, 60)
+    local.set("b", 2, None, 60)
+    local.get("a")
+    local.set("c", 3, None, 60)
+
+    assert local.get("b") is None
+    assert local.get("a") == (1, None)
+    assert local.get("c") == (3, None)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_removes_only_tagged_keys(redis):
+    await cache.set("s2:search:a:5", ["a"], ttl=60, tags=["provider:s2"])
+    await cache.set("s2:search:b:5", ["b"], ttl=60, tags=["provider:s2"])
+    await cache.set("arxiv:search:a:5", ["c"], ttl=60, tags=["provider:arxiv"])
+
+    assert await cache.invalidate_tags("provider:s2") == 2
+    assert await cache.get("s2:search:a:5") is None
+    assert await cache.get("s2:search:b:5") is None
+    assert await cache.get("arxiv:search:a:5") == ["c"]
+    assert not await redis.exists("tag:provider:s2")
+
+
+@pytest.mark.asyncio
+async def test_clear_pattern_scans_instead_of_keys(redis, monkeypatch):
+    for i in range(1200):
+        await redis.set(f"openalex:search:q{i}:10", "[]")
+    await redis.set("s2:search:q:5", "[]")
+
+    async def forbidden(*args, **kwargs):
+        raise AssertionError("KEYS must not be used")
+
+    monkeypatch.setattr(redis, "keys", forbidden)
+    await cache.clear_pattern("openalex:*")
+
+    assert await redis.dbsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_get_many_uses_one_round_trip_for_l1_misses(redis, monkeypatch):
+    await cache.set_many({"a": 1, "b": [2]}, ttl=60, tags=["batch"])
+    cache.local.clear()
+    await cache.get("a")  # a → L1
+
+    mget_calls = []
+    original = cache.raw.mget
+
+    async def counting_mget(keys):
+        mget_calls.append(list(keys))
+        return await original(keys)
+
+    monkeypatch.setattr(cache.raw, "mget", counting_mget)
+    assert await cache.get_many(["a", "b", "c"]) == {"a": 1, "b": [2]}
+    assert mget_calls == [["b", "c"]]
+    assert await redis.smembers("tag:batch") == {"a", "b"}
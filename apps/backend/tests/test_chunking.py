@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.chunking import chunk_text
+
+
+def test_chunks_overlap_and_cover_the_text():
+    text = " ".join(f"w{i}" for i in range(100))
+    chunks = chunk_text(text, max_tokens=30, overlap=10)
+
+    assert [c.split()[0] for c in chunks] == ["w0", "w20", "w40", "w60", "w80"]
+    assert all(len(c.split()) <= 30 for c in chunks)
+    assert chunks[0].split()[-10:] == chunks[1].split()[:10]
+    assert chunks[-1].endswith("w99")
+
+
+def test_short_and_empty_text():
+    assert chunk_text("just a few words", max_tokens=30, overlap=10) == ["just a few words"]
+    assert chunk_text("   ", max_tokens=30, overlap=10) == []
+    with pytest.raises(ValueError):
+        chunk_text("x", max_tokens=10, overlap=10)
+
+
+def test_uses_tokenizer_offsets_when_available():
+    class CharTokenizer:
+        """One token per character — windows are measured in tokens, not words."""
+
+        def __call__(self, text, **kwargs):
+            return {"offset_mapping": [(i, i + 1) for i in range(len(text))]}
+
+    chunks = chunk_text("abcdefghij", max_tokens=4, overlap=1, tokenizer=CharTokenizer())
+    assert chunks == ["abcd", "defg", "ghij"]
@@ -0,0 +1,88 @@
+import time
+
+import httpx
+import pytest
+
+from app.core.circuit_breaker import (
+    CircuitBreaker,
+    CLOSED,
+    OPEN,
+    HALF_OPEN,
+    retry_after_seconds,
+    is_upstream_failure,
+)
+
+
+def _status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.example.org/search")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    params = dict(failure_rate=0.5, window_seconds=60, min_calls=4, open_seconds=30, max_open_seconds=600)
+    params.update(kwargs)
+    return CircuitBreaker("test", **params)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_when_failure_rate_exceeded():
+    breaker = _breaker()
+    await breaker.record_success()
+    await breaker.record_failure()
+    await breaker.record_failure()
+    assert breaker.state == CLOSED  # below min_calls
+
+    await breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not await breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_half_open_admits_one_probe_and_closes_on_success():
+    breaker = _breaker(min_calls=1)
+    await breaker.record_failure()
+    breaker._open_until = time.time() - 1  # open period elapsed
+
+    assert breaker.state == HALF_OPEN
+    assert await breaker.allow()
+    assert not await breaker.allow()
+
+    await breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_consecutive_trips_back_off_exponentially():
+    breaker = _breaker(min_calls=1)
+    await breaker.record_failure()
+    first = breaker.retry_in()
+
+    breaker._open_until = time.time() - 1
+    assert await breaker.allow()
+    await breaker.record_failure()  # failed probe
+    assert breaker.retry_in() > first * 1.5
+
+
+@pytest.mark.asyncio
+async def test_retry_after_opens_for_exact_duration():
+    breaker = _breaker()
+    exc = _status_error(429, {"Retry-After": "120"})
+    await breaker.record_failure(retry_after_seconds(exc), trip=True)
+
+    assert breaker.state == OPEN
+    assert 119 <= breaker.retry_in() <= 120
+
+
+def test_failure_classification():
+    assert is_upstream_failure(_status_error(503))
+    assert is_upstream_failure(_status_error(429))
+    assert not is_upstream_failure(_status_error(404))
+    assert is_upstream_failure(httpx.ReadTimeout("slow"))
+    assert retry_after_seconds(_status_error(500, {"Retry-After": "5"})) is None
+
+
+def test_explicit_zero_is_not_replaced_by_settings_default():
+    breaker = CircuitBreaker("test", min_calls=0, failure_rate=0.0)
+    assert breaker.min_calls == 0
+    assert breaker.failure_rate == 0.0
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.core.deadline import run_with_budget, hedged, DeadlineExceeded
+
+
+@pytest.mark.asyncio
+async def test_run_with_budget_returns_fast_result():
+    async def fast():
+        return "ok"
+
+    assert await run_with_budget(fast(), budget=1.0) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_run_with_budget_detaches_slow_work():
+    finished = asyncio.Event()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        finished.set()
+        return "late"
+
+    with pytest.raises(DeadlineExceeded):
+        await run_with_budget(slow(), budget=0.01)
+
+    # The slow call is not cancelled — it keeps running to warm the cache
+    await asyncio.wait_for(finished.wait(), timeout=1.0)
+
+
+@pytest.mark.asyncio
+async def test_hedged_uses_second_attempt_when_first_is_slow():
+    calls = []
+
+    async def attempt():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(1.0)
+            return "first"
+        return "second"
+
+    assert await hedged(attempt, hedge_after=0.01) == "second"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_hedged_skips_hedge_for_fast_attempt():
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        return "only"
+
+    assert await hedged(attempt, hedge_after=0.5) == "only"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_waits_alone_when_hedge_is_not_allowed():
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        await asyncio.sleep(0.03)
+        return "first"
+
+    async def no_capacity():
+        return False
+
+    assert await hedged(attempt, hedge_after=0.01, may_hedge=no_capacity) == "first"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_fast_failure_loses_to_slow_success():
+    calls = []
+
+    async def attempt():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            return "slow ok"
+        raise RuntimeError("429")
+
+    assert await hedged(attempt, hedge_after=0.01) == "slow ok"
+    assert len(calls) == 2
@@ -0,0 +1,55 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return np.array([[float(t)] for t in texts])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward_pass():
+    encode = Recorder()
+    batcher = EmbeddingBatcher(encode, max_batch_size=32, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        batcher.submit(["1"]), batcher.submit(["2", "3"]), batcher.submit(["4"])
+    )
+
+    assert encode.calls == [["1", "2", "3", "4"]]
+    assert [r[:, 0].tolist() for r in results] == [[1.0], [2.0, 3.0], [4.0]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting():
+    encode = Recorder()
+    batcher = EmbeddingBatcher(encode, max_batch_size=2, max_wait_ms=10_000)
+
+    # Two full batches go out immediately; the leftover one waits for its window
+    tasks = [asyncio.create_task(batcher.submit([str(i)])) for i in range(5)]
+    await asyncio.sleep(0.01)
+    assert encode.calls == [["0", "1"], ["2", "3"]]
+    assert all(t.done() for t in tasks[:4]) and not tasks[4].done()
+    tasks[4].cancel()
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    batcher = EmbeddingBatcher(Recorder(fail=True), max_batch_size=8, max_wait_ms=1)
+
+    results = await asyncio.gather(
+        batcher.submit(["1"]), batcher.submit(["2"]), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
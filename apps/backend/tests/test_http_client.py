@@ -0,0 +1,31 @@
+import pytest
+
+from app.core.config import settings
+from app.core.http_client import HTTPClientManager
+
+
+@pytest.mark.asyncio
+async def test_one_pooled_client_per_host():
+    manager = HTTPClientManager()
+    a = manager.get("https://api.openalex.org/works")
+    b = manager.get("https://api.openalex.org/works/W1")
+    c = manager.get("https://export.arxiv.org/api/query")
+
+    assert a is b
+    assert a is not c
+    assert manager.get() is manager.get()
+    await manager.aclose()
+    assert a.is_closed and c.is_closed
+
+
+@pytest.mark.asyncio
+async def test_closed_client_is_replaced(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_HOST_MAX_CONNECTIONS", {"example.org": 3})
+    manager = HTTPClientManager()
+    first = manager.get("https://example.org/a")
+    await first.aclose()
+
+    second = manager.get("https://example.org/b")
+    assert second is not first and not second.is_closed
+    assert manager._limits_for("example.org").max_connections == 3
+    await manager.aclose()
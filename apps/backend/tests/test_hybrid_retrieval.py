@@ -0,0 +1,39 @@
+import numpy as np
+
+from app.services.hybrid_retrieval import (
+    bm25_document_vector, bm25_query_vector, mmr, reciprocal_rank_fusion, term_index, tokenize
+)
+
+
+def test_tokenize_keeps_identifiers_and_drops_stopwords():
+    assert tokenize("The role of IL-6 in BRCA1 carriers") == ["role", "il-6", "il", "6", "brca1", "carriers"]
+
+
+def test_bm25_vectors_saturate_term_frequency_and_normalise_length():
+    indices, values = bm25_document_vector("BRCA1 BRCA1 BRCA1 carriers")
+    weights = dict(zip(indices, values))
+    assert weights[term_index("brca1")] > weights[term_index("carriers")]
+    assert weights[term_index("brca1")] < 3 * weights[term_index("carriers")]
+
+    short = dict(zip(*bm25_document_vector("BRCA1 carriers")))
+    long = dict(zip(*bm25_document_vector("BRCA1 carriers " + "cohort " * 200)))
+    assert short[term_index("brca1")] > long[term_index("brca1")]
+
+    assert bm25_query_vector("the BRCA1 brca1") == ([term_index("brca1")], [1.0])
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    assert max(fused, key=fused.get) == "b"
+    assert fused["d"] < fused["a"]
+
+
+def test_mmr_skips_near_duplicates():
+    vectors = {
+        "a": np.array([1.0, 0.0]),
+        "a-copy": np.array([1.0, 0.0]),
+        "b": np.array([0.0, 1.0]),
+    }
+    relevance = {"a": 1.0, "a-copy": 0.95, "b": 0.6}
+    assert mmr(["a", "a-copy", "b"], relevance, vectors, k=2, lambda_=0.5) == ["a", "b"]
+    assert mmr(["a", "a-copy", "b"], relevance, vectors, k=2, lambda_=1.0) == ["a", "a-copy"]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import PaperBase
+from app.services.providers import BaseProvider, ProviderRegistry, prefetch_searches
+
+
+class FakeProvider(BaseProvider):
+    name = "fake"
+    cache_prefix = "fake"
+
+    def __init__(self, client=None, papers=None, error=None, configured=True):
+        super().__init__(client)
+        self._papers = papers or []
+        self._error = error
+        self._configured = configured
+
+    def is_configured(self) -> bool:
+        return self._configured
+
+    async def _fetch(self, query, limit, **kwargs):
+        if self._error:
+            raise self._error
+        return self._papers[:limit]
+
+
+def _paper(pid: str) -> PaperBase:
+    return PaperBase(id=pid, title=f"Paper {pid}")
+
+
+@pytest.mark.asyncio
+async def test_provider_swallows_upstream_errors_and_counts_them():
+    provider = FakeProvider(error=RuntimeError("boom"))
+    before = provider.metrics.errors
+
+    assert await provider.search_papers("malaria vaccines") == []
+    assert provider.metrics.errors == before + 1
+
+
+@pytest.mark.asyncio
+async def test_provider_reraises_when_configured_to():
+    provider = FakeProvider(error=RuntimeError("boom"))
+    provider.swallow_errors = False
+
+    with pytest.raises(RuntimeError):
+        await provider.search_papers("malaria vaccines")
+
+
+@pytest.mark.asyncio
+async def test_unconfigured_provider_returns_nothing():
+    provider = FakeProvider(papers=[_paper("1")], configured=False)
+    assert await provider.search_papers("malaria vaccines") == []
+
+
+def test_registry_respects_enabled_list_and_configuration(monkeypatch):
+    registry = ProviderRegistry()
+    registry.register("a", lambda client: FakeProvider(client))
+    registry.register("b", lambda client: FakeProvider(client, configured=False))
+    registry.register("c", lambda client: FakeProvider(client))
+
+    monkeypatch.setattr(settings, "SEARCH_PROVIDERS", ["c", "b", "unknown"])
+    assert registry.enabled_names() == ["c", "b"]
+    assert len(registry.enabled()) == 1
+
+    monkeypatch.setattr(settings, "SEARCH_PROVIDERS", None)
+    assert registry.enabled_names() == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_searches_hit_upstream_once():
+    class SlowProvider(FakeProvider):
+        name = "slow_fake"
+        cache_prefix = "slow_fake"
+        fetches = 0
+
+        async def _fetch(self, query, limit, **kwargs):
+            SlowProvider.fetches += 1
+            await asyncio.sleep(0.01)
+            return self._papers[:limit]
+
+    provider = SlowProvider(papers=[_paper("1")])
+    results = await asyncio.gather(*(provider.search_papers("malaria vaccines") for _ in range(3)))
+
+    assert SlowProvider.fetches == 1
+    assert all(r[0].id == "1" for r in results)
+    assert provider.metrics.coalesced == 2
+
+
+@pytest.mark.asyncio
+async def test_prefetched_hit_skips_upstream():
+    provider = FakeProvider(error=RuntimeError("should not be called"))
+    cached = [PaperBase(id="9", title="Cached").model_dump()]
+
+    [coro] = await prefetch_searches([(provider, "malaria vaccines", {"limit": 5})])
+    assert await coro == []  # no Redis: plain miss, upstream error swallowed
+
+    papers = await provider.search_prefetched((cached, False), "malaria vaccines", limit=5)
+    assert [p.id for p in papers] == ["9"]
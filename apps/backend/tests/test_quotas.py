@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.quotas import compute_quota, request_quota, tier_for
+
+
+def _request(ip: str) -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (ip, 1234)})
+
+
+def _user(status="trialing", trial_days=3, superuser=False):
+    return SimpleNamespace(
+        is_superuser=superuser,
+        subscription_status=status,
+        trial_ends_at=datetime.utcnow() + timedelta(days=trial_days),
+    )
+
+
+def test_tiers_follow_subscription_status():
+    assert tier_for(_user(superuser=True)) == "superuser"
+    assert tier_for(_user(status="active")) == "active"
+    assert tier_for(_user()) == "trialing"
+    assert tier_for(_user(trial_days=-1)) == "free"
+    assert tier_for(None) == "free"
+
+
+@pytest.mark.asyncio
+async def test_compute_cost_is_weighted_and_reported(monkeypatch):
+    monkeypatch.setitem(settings.QUOTA_LIMITS, "anonymous", {"requests": 30, "compute": 12})
+    request = _request("10.0.0.1")
+
+    await request_quota(request)
+    await compute_quota(10)(request)
+    headers = request.state.quota_headers
+    assert headers["X-RateLimit-Remaining-Compute"] == "2"
+    assert headers["X-RateLimit-Remaining-Requests"] == "29"
+    assert headers["X-RateLimit-Tier"] == "anonymous"
+
+    with pytest.raises(HTTPException) as exc:
+        await compute_quota(5)(_request("10.0.0.1"))
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) > 0
+
+    # Other callers have their own budget
+    await compute_quota(5)(_request("10.0.0.2"))
+
+
+@pytest.mark.asyncio
+async def test_token_is_verified_once_per_request(monkeypatch):
+    from app.core import quotas, rate_limit
+    from app.core.security import get_current_user
+
+    calls = []
+
+    async def fake_verify(token):
+        calls.append(token)
+        return {"user_id": "u1", "username": "u1", "email": None}
+
+    async def fake_tier(user_id):
+        return "active"
+
+    monkeypatch.setattr(rate_limit, "verify_token", fake_verify)
+    monkeypatch.setattr(quotas, "_user_tier", fake_tier)
+    request = Request({
+        "type": "http", "method": "POST", "path": "/",
+        "headers": [(b"authorization", b"Bearer tok")], "client": ("10.0.0.9", 1234),
+    })
+
+    await request_quota(request)
+    user = await get_current_user(request, credentials=None)
+
+    assert user["user_id"] == "u1"
+    assert request.state.quota_headers["X-RateLimit-Tier"] == "active"
+    assert calls == ["tok"]
+
+
+@pytest.mark.asyncio
+async def test_cost_above_whole_budget_is_refused_without_retry_after(monkeypatch):
+    monkeypatch.setitem(settings.QUOTA_LIMITS, "anonymous", {"requests": 30, "compute": 10})
+
+    with pytest.raises(HTTPException) as exc:
+        await compute_quota(20)(_request("10.0.0.3"))
+    assert exc.value.status_code == 403
+    assert "Retry-After" not in exc.value.headers
+
+    # Nothing was charged for the refused call
+    await compute_quota(10)(_request("10.0.0.3"))
@@ -0,0 +1,51 @@
+import pytest
+
+from app.core.cache import cache
+from app.core.rate_limit import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_burst_up_to_limit_then_denied():
+    limiter = RateLimiter()
+    results = [await limiter.hit("user:a:search", limit=3, period=60) for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results[:3]] == [2, 1, 0]
+    assert 19 < results[3].retry_after <= 20
+
+
+@pytest.mark.asyncio
+async def test_cost_weighted_hits_and_denials_spend_nothing():
+    limiter = RateLimiter()
+    assert (await limiter.hit("user:b:llm", limit=10, period=60, cost=8)).remaining == 2
+    denied = await limiter.hit("user:b:llm", limit=10, period=60, cost=5)
+    assert not denied.allowed and denied.remaining == 2
+    assert (await limiter.hit("user:b:llm", limit=10, period=60, cost=2)).allowed
+
+
+@pytest.mark.asyncio
+async def test_lua_script_matches_local_algorithm(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    monkeypatch.setattr(cache, "redis", fakeredis.FakeAsyncRedis(decode_responses=True))
+    limiter = RateLimiter()
+
+    results = [await limiter.hit("user:c:search", limit=2, period=60) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert 29 < results[2].retry_after <= 30
+    assert await cache.redis.pttl("ratelimit:user:c:search") > 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["local", "redis"])
+async def test_remaining_is_exact_when_period_does_not_divide(monkeypatch, backend):
+    if backend == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        monkeypatch.setattr(cache, "redis", fakeredis.FakeAsyncRedis(decode_responses=True))
+    limiter = RateLimiter()
+
+    # 60s / 7 is not a whole number of milliseconds
+    results = [await limiter.hit("user:d:search", limit=7, period=60) for _ in range(8)]
+    assert [r.remaining for r in results[:7]] == [6, 5, 4, 3, 2, 1, 0]
+    assert [r.allowed for r in results] == [True] * 7 + [False]
@@ -14,7 +14,7 @@ async def test_search_papers(client: AsyncClient, test_user_data):
     token = register_response.json()["access_token"]
     
     # Mock OpenAlex service
-    with patch('app.services.openalex_service.OpenAlexService.search_papers') as mock_search:
+    with patch('app.services.openalex_service.OpenAlexService.search_prefetched') as mock_search:
         mock_search.return_value = [
             {
                 "id": "W123",
@@ -96,3 +96,61 @@ async def test_synthesize_no_papers(client: AsyncClient, test_user_data):
     
     assert response.status_code == 400
     assert "No papers" in response.json()["detail"]
+
+
+def _sse_events(body: str) -> list:
+    return [line[len("data: "):] for line in body.splitlines() if line.startswith("data: ")]
+
+
+@pytest.mark.asyncio
+async def test_search_stream_event_order(client: AsyncClient, db_session, test_user_data, test_paper_data):
+    """Sources are streamed as they finish, followed by the summary and [DONE]"""
+    import asyncio
+    import json
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.models.schemas import PaperBase
+
+    register_response = await client.post(
+        "/api/v1/auth/register",
+        json=test_user_data
+    )
+    token = register_response.json()["access_token"]
+
+    paper = PaperBase(**test_paper_data)
+    other = PaperBase(**{**test_paper_data, "id": "W2"})
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return [paper, other]
+
+    async def fast():
+        return [paper]
+
+    async def fake_sources(search_request):
+        return [("slow", slow()), ("fast", fast())]
+
+    with patch('app.api.research._source_searches', fake_sources), \
+            patch('app.services.search_stream.AsyncSessionLocal', async_sessionmaker(db_session.bind, expire_on_commit=False)):
+        response = await client.post(
+            "/api/v1/research/search/stream",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"query": "machine learning", "limit": 5}
+        )
+
+    assert response.status_code == 200
+    events = _sse_events(response.text)
+    assert events[-1] == "[DONE]"
+    first, second, summary = (json.loads(e) for e in events[:-1])
+    assert first["source"] == "fast" and first["count"] == 1
+    # The paper already sent by the faster source is not repeated
+    assert second["source"] == "slow" and second["count"] == 1 and second["received"] == 2
+    assert summary["summary"]["total"] == 2
+    assert summary["summary"]["source_counts"] == {"fast": 1, "slow": 1}
+
+    history = await client.get(
+        "/api/v1/research/history",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert [h["query"] for h in history.json()] == ["machine learning"]
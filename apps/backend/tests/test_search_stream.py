@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.models.schemas import PaperBase
+from app.services import search_stream
+from app.services.search_stream import search_events, timed_search
+
+
+class FakeSession:
+    def __init__(self):
+        self.open = False
+
+    async def __aenter__(self):
+        self.open = True
+        return self
+
+    async def __aexit__(self, *exc):
+        self.open = False
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """Records (session was open, user_id, query, count) for each history write."""
+    sessions, rows = [], []
+
+    def session_factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    async def record(db, user_id, query, results_count):
+        rows.append((db.open, user_id, query, results_count))
+
+    monkeypatch.setattr(search_stream, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(search_stream, "record_search_history", record)
+    return rows
+
+
+def _paper(paper_id):
+    return PaperBase(id=paper_id, title=f"Paper {paper_id}", authors=["A"])
+
+
+def _tasks(**searches):
+    deadline_at = time.perf_counter() + 60
+    return [asyncio.create_task(timed_search(label, coro, deadline_at)) for label, coro in searches.items()]
+
+
+@pytest.mark.asyncio
+async def test_events_arrive_in_completion_order_then_summary(history):
+    async def slow():
+        await asyncio.sleep(0.05)
+        return [_paper("W1"), _paper("W2")]
+
+    async def fast():
+        return [_paper("W1")]
+
+    async def broken():
+        raise RuntimeError("upstream down")
+
+    events = [e async for e in search_events(_tasks(slow=slow(), fast=fast(), broken=broken()), "malaria", "u1", time.time())]
+    payloads = [json.loads(e[len("data: "):]) for e in events[:-1]]
+
+    assert events[-1] == "data: [DONE]\n\n"
+    assert [p.get("source") for p in payloads[:3]] == ["fast", "broken", "slow"]
+    assert payloads[1]["error"] == "upstream down"
+    # W1 was already sent by the faster source
+    assert payloads[2]["count"] == 1 and payloads[2]["received"] == 2
+    assert payloads[3]["summary"]["total"] == 2
+    # Written through a session opened by the generator itself, after the sources finished
+    assert history == [(True, "u1", "malaria", 2)]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_pending_sources_and_skips_history(history):
+    async def fast():
+        return [_paper("W1")]
+
+    async def hung():
+        await asyncio.sleep(60)
+
+    tasks = _tasks(fast=fast(), hung=hung())
+    events = search_events(tasks, "malaria", "u1", time.time())
+
+    assert '"source": "fast"' in await events.__anext__()
+    await events.aclose()
+    await asyncio.sleep(0)
+
+    assert tasks[1].cancelled()
+    assert history == []
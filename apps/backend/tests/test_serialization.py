@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from app.core.serialization import Codec, available_serializers
+
+PAPERS = [
+    {"id": f"W{i}", "title": "Malaria vaccine trial", "year": 2023, "citations": i,
+     "abstract": "Plasmodium falciparum " * 60, "authors": ["A. Mwangi", "B. Otieno"]}
+    for i in range(20)
+]
+
+
+@pytest.mark.parametrize("serializer", available_serializers())
+def test_round_trip(serializer):
+    codec = Codec(serializer)
+    assert codec.loads(codec.dumps(PAPERS)) == PAPERS
+
+
+def test_plain_json_entries_stay_readable():
+    legacy = json.dumps(PAPERS).encode()
+    assert Codec("json").dumps(PAPERS) == legacy
+    for serializer in available_serializers():
+        assert Codec(serializer).loads(legacy) == PAPERS
+
+
+def test_entries_survive_a_serializer_switch():
+    written = Codec(available_serializers()[-1]).dumps(PAPERS)
+    assert Codec("json").loads(written) == PAPERS
+
+
+def test_zstd_compresses_large_payloads_only():
+    pytest.importorskip("zstandard")
+    codec = Codec("json", compression="zstd", compress_min_bytes=1024)
+
+    large = codec.dumps(PAPERS)
+    assert len(large) < len(json.dumps(PAPERS))
+    assert codec.loads(large) == PAPERS
+    assert codec.loads(codec.dumps({"a": 1})) == {"a": 1}
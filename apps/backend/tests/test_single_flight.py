@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["paper"]
+
+    results = await asyncio.gather(*(flight.do("openalex:search:q:10", fetch) for _ in range(5)))
+
+    assert calls == 1
+    assert [value for value, _ in results] == [["paper"]] * 5
+    assert sum(shared for _, shared in results) == 4
+    assert not flight.in_flight("openalex:search:q:10")
+
+
+@pytest.mark.asyncio
+async def test_followers_see_the_leaders_error_and_next_call_retries():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return 42
+
+    assert await flight.do("k", ok) == (42, False)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_does_not_cancel_the_shared_fetch():
+    flight = SingleFlight()
+    done = asyncio.Event()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        done.set()
+        return "ok"
+
+    leader = asyncio.create_task(flight.do("k", fetch))
+    follower = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    follower.cancel()
+
+    assert await leader == ("ok", False)
+    assert done.is_set()
@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.token_bucket import TokenBucket, UpstreamRateLimited
+
+
+@pytest.mark.asyncio
+async def test_burst_is_served_without_waiting():
+    bucket = TokenBucket("test-burst", rate=1.0, capacity=3)
+    for _ in range(3):
+        assert await bucket.acquire() == 0
+
+
+@pytest.mark.asyncio
+async def test_callers_beyond_burst_are_paced():
+    bucket = TokenBucket("test-paced", rate=50.0, capacity=1)
+    assert await bucket.acquire() == 0
+    waited = await bucket.acquire()
+    assert 0 < waited <= 0.05
+
+
+@pytest.mark.asyncio
+async def test_wait_beyond_max_is_rejected_without_consuming():
+    bucket = TokenBucket("test-reject", rate=0.1, capacity=1)
+    await bucket.acquire()
+    with pytest.raises(UpstreamRateLimited):
+        await bucket.acquire(max_wait=1.0)
+
+
+def test_buckets_are_keyed_per_api_key():
+    anonymous = TokenBucket("pubmed", rate=3, capacity=3)
+    keyed = TokenBucket("pubmed", rate=10, capacity=10, identity="secret-key")
+    assert anonymous.key != keyed.key
+    assert "secret-key" not in keyed.key
@@ -0,0 +1,356 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+pytest.importorskip("qdrant_client")
+from qdrant_client import AsyncQdrantClient
+
+from app.core.config import settings
+from app.models.schemas import PaperBase
+from app.services.vector_service import (
+    EmbeddingQueueFull, VectorStore, load_embedding_model, paper_point_id, query_point_id
+)
+
+
+class FakeModel:
+    """Counts encode() calls; returns deterministic unnormalized vectors."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False, **kwargs):
+        self.calls.append((list(texts), batch_size))
+        vectors = np.array([[len(t), 1.0, 2.0, 3.0] for t in texts], dtype=np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+@pytest_asyncio.fixture
+async def store():
+    store = VectorStore()
+    store._client = AsyncQdrantClient(":memory:")
+    store._embedding_model = FakeModel()
+    await store._init_collections()
+    store._initialized = True
+    yield store
+    await store.aclose()
+
+
+def _papers(n):
+    return [PaperBase(id=f"W{i}", title=f"Paper {i}", abstract="x" * i, authors=["A"]) for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_index_papers_encodes_in_one_batched_call(store):
+    assert await store.index_papers(_papers(20)) == 20
+
+    assert len(store._embedding_model.calls) == 1
+    texts, batch_size = store._embedding_model.calls[0]
+    assert len(texts) == 20
+    assert batch_size == settings.EMBEDDING_BATCH_SIZE
+    assert (await store._client.count(store.papers_collection)).count == 20
+
+
+@pytest.mark.asyncio
+async def test_embed_returns_normalized_rows(store):
+    vectors = await store.embed(["a", "bbbb"])
+    assert vectors.shape == (2, 4)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+
+@pytest.mark.asyncio
+async def test_index_papers_empty_list_skips_model(store):
+    assert await store.index_papers([]) == 0
+    assert store._embedding_model.calls == []
+
+
+
+@pytest.mark.asyncio
+async def test_index_papers_skips_papers_already_embedded(store):
+    await store.index_papers(_papers(5))
+    store._embedding_model.calls.clear()
+
+    assert await store.index_papers(_papers(5)) == 5
+    assert store._embedding_model.calls == []
+
+    # One new paper and one with an updated abstract are embedded; the rest are not
+    papers = _papers(6)
+    papers[2] = papers[2].model_copy(update={"abstract": "revised"})
+    assert await store.index_papers(papers) == 6
+    texts, _ = store._embedding_model.calls[0]
+    assert texts == ["Paper 2\n\nrevised", "Paper 5\n\nxxxxx"]
+    assert (await store._client.count(store.papers_collection)).count == 6
+
+
+@pytest.mark.asyncio
+async def test_embedding_runs_off_the_event_loop_with_backpressure(store, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_QUEUE_TIMEOUT_SECONDS", 0.05)
+    store._pending = asyncio.Semaphore(1)
+    release = threading.Event()
+    loop_thread = threading.get_ident()
+    encode_threads = []
+
+    def blocking_encode(texts):
+        encode_threads.append(threading.get_ident())
+        release.wait(5)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    store._encode = blocking_encode
+    first = asyncio.create_task(store.embed(["a"]))
+    await asyncio.sleep(0.01)  # loop stays responsive while the encode blocks a worker
+
+    with pytest.raises(EmbeddingQueueFull):
+        await store.embed(["b"])
+
+    release.set()
+    assert (await first).shape == (1, 4)
+    assert encode_threads and encode_threads[0] != loop_thread
+
+
+def test_unknown_embedding_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_embedding_model("tensorflow")
+
+
+@pytest.mark.asyncio
+async def test_warm_up_marks_store_ready(store):
+    assert store.status()["ready"] is False
+
+    assert await store.warm_up() is True
+    status = store.status()
+    assert status["ready"] is True and status["error"] is None
+    assert store._embedding_model.calls[0][0] == ["warm-up"]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_reports_missing_collection_until_a_retry_succeeds(store):
+    await store._client.delete_collection(store.papers_collection)
+
+    assert await store.warm_up() is False
+    assert store.status()["ready"] is False
+    assert store.status()["error"]
+
+    # Encoding works, but the store is still not ready while Qdrant is broken
+    await store.embed(["query"])
+    assert store.status()["ready"] is False
+
+    # A later retry succeeds once the collection is back
+    await store._init_collections()
+    assert await store.warm_up() is True
+    assert store.status()["ready"] is True and store.status()["error"] is None
+
+
+@pytest.mark.asyncio
+async def test_rag_context_includes_exact_term_matches(store):
+    papers = [
+        PaperBase(id=f"W{i}", title=f"Breast cancer screening study {i}", abstract="Mammography outcomes.")
+        for i in range(8)
+    ] + [PaperBase(id="WB", title="BRCA1 carriers", abstract="Risk in BRCA1 mutation carriers.")]
+    await store.index_papers(papers)
+
+    context = await store.retrieve_rag_context("BRCA1", k=2, score_threshold=0.0)
+
+    assert context.count("[RAG-") == 2
+    assert "BRCA1 carriers" in context
+
+
+@pytest.mark.asyncio
+async def test_rag_keyword_candidates_are_ranked_over_the_whole_corpus(store, monkeypatch):
+    monkeypatch.setattr(settings, "RAG_CANDIDATES", 10)
+    papers = [
+        PaperBase(id=f"W{i}", title=f"Breast cancer screening study {i}", abstract="Mammography outcomes in breast cancer.")
+        for i in range(40)
+    ]
+    # Far from the query in the fake embedding space, so only BM25 can surface it
+    papers.append(PaperBase(id="WB", title="BRCA1 carriers", abstract="Risk in BRCA1 mutation carriers. " * 50))
+    await store.index_papers(papers)
+
+    keyword = await store._keyword_candidates(store.papers_collection, "BRCA1 breast cancer", 10)
+    assert keyword[0].payload["paper_id"] == "WB"
+
+    context = await store.retrieve_rag_context("BRCA1 breast cancer", k=3, score_threshold=0.0)
+    assert "BRCA1 carriers" in context
+
+
+@pytest.mark.asyncio
+async def test_rag_works_dense_only_on_collections_without_keyword_vector(store):
+    # A collection created before keyword vectors existed
+    await store._client.delete_collection(store.papers_collection)
+    store._keyword_collections.clear()
+    await store.ensure_collection(store.papers_collection, {})
+    await store.index_papers(_papers(3))
+
+    assert await store._keyword_candidates(store.papers_collection, "Paper", 5) == []
+    assert (await store.retrieve_rag_context("Paper", k=2, score_threshold=0.0)).count("[RAG-") == 2
+
+
+@pytest.mark.asyncio
+async def test_documents_are_chunked_per_user_and_retrieved_by_id(store, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_CHUNK_TOKENS", 20)
+    monkeypatch.setattr(settings, "DOCUMENT_CHUNK_OVERLAP", 5)
+    text = " ".join(f"word{i}" for i in range(100))
+
+    assert await store.index_document("u1", "cid-a", "a.pdf", text) == 7
+    assert await store.index_document("u1", "cid-b", "b.pdf", "other document") == 1
+    store._embedding_model.calls.clear()
+    assert await store.index_document("u1", "cid-a", "a.pdf", text) == 7
+    assert store._embedding_model.calls == []
+
+    context = await store.retrieve_document_context("u1", ["cid-b"], "anything", k=3)
+    assert context == "[b.pdf — part 1]\nother document"
+    assert await store.retrieve_document_context("u2", ["cid-b"], "anything") == ""
+
+
+@pytest.mark.asyncio
+async def test_reindexing_a_document_completes_it_and_adds_projects(store, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_CHUNK_TOKENS", 20)
+    monkeypatch.setattr(settings, "DOCUMENT_CHUNK_OVERLAP", 5)
+    text = " ".join(f"word{i}" for i in range(100))
+    assert await store.index_document("u1", "cid-a", "a.pdf", text, project_id=7) == 7
+
+    # Simulate a crash part-way through the first indexing run
+    records, _ = await store._client.scroll(store.documents_collection, limit=100)
+    await store._client.delete(store.documents_collection, points_selector=[r.id for r in records[:3]])
+    store._embedding_model.calls.clear()
+
+    assert await store.index_document("u1", "cid-a", "a.pdf", text, project_id=8) == 7
+    assert len(store._embedding_model.calls[0][0]) == 3
+    assert (await store._client.count(store.documents_collection)).count == 7
+    for project in (7, 8):
+        assert await store.retrieve_document_context("u2", ["cid-a"], "word", project_id=project)
+
+
+@pytest.mark.asyncio
+async def test_document_context_fills_the_prompt_budget(store, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_CHUNK_TOKENS", 20)
+    monkeypatch.setattr(settings, "DOCUMENT_CHUNK_OVERLAP", 5)
+    monkeypatch.setattr(settings, "DOCUMENT_CHAT_CONTEXT_TOKENS", 60)
+    await store.index_document("u1", "cid-a", "a.pdf", " ".join(f"word{i}" for i in range(100)))
+
+    context = await store.retrieve_document_context("u1", ["cid-a"], "anything")
+    assert context.count("[a.pdf — part") == 3
+
+
+@pytest.mark.asyncio
+async def test_namespaces_are_separate(store):
+    await store.index_papers(_papers(3))
+    await store.add_query("q1", "malaria", "answer", {"user_id": "u1", "title": "t"})
+    await store.index_document("u1", "cid", "notes.pdf", "private notes", project_id=7)
+
+    assert (await store._client.count(store.collection_name)).count == 1
+    assert (await store._client.count(store.papers_collection)).count == 3
+    assert (await store._client.count(store.documents_collection)).count == 1
+
+    assert [r["id"] for r in await store.search_similar("malaria", user_id="u1")] == ["q1"]
+    assert await store.search_similar("malaria", user_id="u2") == []
+
+    # Project members see shared material; others don't
+    assert "private notes" in await store.retrieve_document_context("u2", ["cid"], "notes", project_id=7)
+    assert await store.retrieve_document_context("u2", ["cid"], "notes", project_id=8) == ""
+
+
+@pytest.mark.asyncio
+async def test_filtered_fields_get_payload_indexes(store, monkeypatch):
+    created = []
+
+    async def record(collection_name, field_name, field_schema):
+        created.append((collection_name, field_name))
+
+    monkeypatch.setattr(store._client, "create_payload_index", record)
+    await store._init_collections()
+
+    assert {
+        (store.collection_name, "user_id"),
+        (store.papers_collection, "year"),
+        (store.documents_collection, "user_id"),
+        (store.documents_collection, "project_id"),
+    } <= set(created)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_removes_only_stale_corpus_papers(store):
+    await store.index_papers(_papers(3))
+    await store.add_query("q1", "malaria", "answer", {"user_id": "u1", "title": "t"})
+    old = int(time.time()) - 100 * 86400
+    await store._client.set_payload(store.papers_collection, {"indexed_at": old}, points=[paper_point_id("W0")])
+
+    assert await store.cleanup_stale_papers(days=90) == 1
+    assert (await store._client.count(store.papers_collection)).count == 2
+    assert (await store._client.count(store.collection_name)).count == 1
+
+    # Re-requesting a paper refreshes it
+    await store._client.set_payload(store.papers_collection, {"indexed_at": old}, points=[paper_point_id("W1")])
+    await store.index_papers(_papers(3)[1:2])
+    assert await store.cleanup_stale_papers(days=90) == 0
+
+
+@pytest.mark.asyncio
+async def test_reindex_swaps_alias_to_a_new_collection(store):
+    from app.services.reindex import reindex_namespace
+
+    await store.index_document("u1", "cid", "a.pdf", "some uploaded text")
+    progress = []
+
+    first = await reindex_namespace(store, "documents", batch_size=10, fresh=True,
+                                    progress=lambda ns, done, total: progress.append((done, total)))
+    assert first["indexed"] == 1 and progress == [(1, 1)]
+    aliases = {a.alias_name: a.collection_name for a in (await store._client.get_aliases()).aliases}
+    assert aliases[store.documents_collection] == first["collection"]
+    assert "some uploaded text" in await store.retrieve_document_context("u1", ["cid"], "text")
+
+    second = await reindex_namespace(store, "documents", batch_size=10, fresh=True)
+    names = {c.name for c in (await store._client.get_collections()).collections}
+    assert second["collection"] in names and first["collection"] not in names
+
+
+@pytest.mark.asyncio
+async def test_reindex_catches_up_on_uploads_made_during_the_run(store, monkeypatch):
+    from app.services import reindex
+
+    await store.index_document("u1", "cid-old", "old.pdf", "indexed before the run")
+    scroll_documents = reindex._SOURCES["documents"][0][1]
+
+    async def upload_midway(store_, cursor, batch_size):
+        async for batch in scroll_documents(store_, cursor, batch_size):
+            yield batch
+            # The app keeps writing to the live collection while the run copies it
+            await store.index_document("u1", "cid-new", "new.pdf", "uploaded during the run")
+
+    monkeypatch.setitem(reindex._SOURCES, "documents", [("documents", upload_midway)])
+    result = await reindex.reindex_namespace(store, "documents", batch_size=10, fresh=True)
+
+    assert result["caught_up"] >= 1
+    assert "uploaded during the run" in await store.retrieve_document_context("u1", ["cid-new"], "run")
+
+
+@pytest.mark.asyncio
+async def test_saved_query_points_are_keyed_by_query_id(store):
+    metadata = {"user_id": "u1", "title": "Malaria", "tags": "a"}
+    await store.add_query("query_1_u1", "malaria", "first answer", metadata)
+    await store.add_query("query_1_u1", "malaria", "first answer", metadata)
+    assert (await store._client.count(store.collection_name)).count == 1
+
+    assert await store.update_query("query_1_u1", "malaria", "revised answer", metadata)
+    assert await store.update_query_metadata("query_1_u1", {"title": "Renamed"})
+    [record] = await store._client.retrieve(store.collection_name, [query_point_id("query_1_u1")])
+    assert record.payload["text"] == "malaria\n\nrevised answer"
+    assert record.payload["title"] == "Renamed"
+
+    # Caller metadata cannot clobber the fields add_query sets itself
+    await store.add_query("query_1_u1", "malaria", "answer", {**metadata, "query_id": 1, "text": "x", "vector_id": "y"})
+    [record] = await store._client.retrieve(store.collection_name, [query_point_id("query_1_u1")])
+    assert record.payload["vector_id"] == "query_1_u1"
+    assert record.payload["query_id"] == 1
+    assert record.payload["text"] == "malaria\n\nanswer"
+    assert (await store.search_similar("malaria", user_id="u1"))[0]["id"] == "query_1_u1"
+
+    assert await store.delete_query("query_1_u1")
+    assert (await store._client.count(store.collection_name)).count == 0